@@ -0,0 +1,173 @@
+# batch.py
+"""
+Audyt wielu domen w jednym uruchomieniu: plik z domenami (+ nadpisania config.py per domena),
+audyty w puli procesów (--processes = globalny limit równoległych audytów), raport i log per
+domena w reports/<domena>/, na końcu zbiorcze podsumowanie i przepustowość (domeny/min).
+
+Format pliku (jedna domena w linii, # = komentarz):
+
+    example.com
+    sklep.example.pl BLOG_POST=/blog/wpis/ PRODUCT_URL=/p/buty/ CRAWL_LIMIT=200
+    inna.pl CUSTOM_SITEMAPS='["/sitemap_index.xml"]' SHEET_ID=abc123 WORKSHEET_GID=0
+
+Wartości to literały Pythona (liczby, listy, True/None), a jeśli się nie parsują — napisy.
+
+Nadpisania trafiają do AuditContext audytu (context.load_settings: config.py wykonany
+z nadpisaniami, więc wartości pochodne, np. SCHEMA_EXTRA_PATHS z BLOG_POST, też się zgadzają).
+Procesy puli są ciepłe — kolejne domeny korzystają z już załadowanych bibliotek i sesji HTTP;
+w procesie działa jeden audyt naraz (stdout audytu idzie do jego batch_<nr>.log, nr = pozycja w pliku).
+
+Użycie: python batch.py domains.txt [--processes 4] [--sheets] [opcje jak w runner.py]
+"""
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import shlex
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import runner
+from config import BATCH_PROCESSES
+
+# ładowane raz w serwerze forkserver (brakujące są pomijane)
+PRELOAD = ["requests", "lxml.html", "bs4", "cachetools", "dotenv", "gspread", "google.oauth2.service_account",
+           "runner"]
+
+
+def _value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_overrides(tokens):
+    """{NAZWA: wartość} z tokenów NAZWA=wartość."""
+    overrides = {}
+    for tok in tokens:
+        key, sep, val = tok.partition("=")
+        if not sep or not key.isidentifier():
+            raise ValueError(f"oczekiwano NAZWA=wartość, jest {tok!r}")
+        overrides[key] = _value(val)
+    return overrides
+
+
+def parse_domains(path):
+    """[(domena, {NAZWA: wartość})] z pliku domen."""
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            tokens = shlex.split(line, comments=True)
+            if not tokens:
+                continue
+            try:
+                jobs.append((tokens[0], parse_overrides(tokens[1:])))
+            except ValueError as e:
+                raise ValueError(f"{path}:{lineno}: {e}") from None
+    return jobs
+
+
+def _audit_one(nr, domain, overrides, options):
+    """Audyt jednej domeny w procesie puli; zwraca krótkie podsumowanie (pełny wynik jest w raporcie)."""
+    root = runner.ensure_root(domain)
+    output_dir = os.path.join("reports", urlsplit(root).netloc)
+    os.makedirs(output_dir, exist_ok=True)
+    # pozycja w pliku w nazwie — ta sama domena może być w nim kilka razy (z innymi nadpisaniami)
+    log_path = os.path.join(output_dir, f"batch_{nr}.log")
+    t0 = time.time()
+    with open(log_path, "w", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        results, report = runner.audit(domain, overrides=overrides, **options)
+    return {
+        "domain": domain,
+        "exit_code": runner.exit_code(results),
+        "seconds": round(time.time() - t0, 2),
+        "checks": {r["name"]: r.get("status") for r in results},
+        "report": report,
+        "log": log_path,
+        "error": None,
+    }
+
+
+def _pool(processes):
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(PRELOAD)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=processes, mp_context=ctx)
+
+
+def summarize(done, wall):
+    """Zbiorcze podsumowanie: statusy per check na wszystkich domenach + przepustowość."""
+    checks = {}
+    for res in done:
+        for name, status in res["checks"].items():
+            checks.setdefault(name, Counter())[status] += 1
+    return {
+        "domains": len(done),
+        "failed_audits": sum(1 for res in done if res["error"]),
+        "wall_seconds": round(wall, 2),
+        "domains_per_minute": round(len(done) / wall * 60, 2) if wall > 0 else None,
+        "exit_codes": dict(Counter(res["exit_code"] for res in done)),
+        "checks": {name: dict(counts) for name, counts in checks.items()},
+        "results": sorted(done, key=lambda res: res["domain"]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SEO Checker — audyt wielu domen")
+    ap.add_argument("domains_file", help="plik: domena [NAZWA=wartość ...] w każdej linii")
+    ap.add_argument("--processes", type=int, default=BATCH_PROCESSES, help="ile domen audytujemy jednocześnie")
+    ap.add_argument("--sheets", action="store_true", help="aktualizuj Google Sheet po każdej domenie (jak runner.py)")
+    runner.add_audit_args(ap)
+    args = ap.parse_args()
+
+    jobs = parse_domains(args.domains_file)
+    options = {
+        "workers": args.workers, "pretty": args.pretty, "no_cache": args.no_cache,
+        "incremental": args.incremental, "crawl_backend": args.crawl_backend, "crawl_mode": args.crawl_mode,
+        "parser": args.parser, "sheets": args.sheets,
+    }
+    print(f"[BATCH] domen: {len(jobs)}, procesy: {args.processes}")
+
+    done = []
+    t_start = time.time()
+    with _pool(args.processes) as pool:
+        futures = {pool.submit(_audit_one, nr, domain, overrides, options): domain
+                   for nr, (domain, overrides) in enumerate(jobs, start=1)}
+        for fut in as_completed(futures):
+            domain = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                res = {"domain": domain, "exit_code": 3, "seconds": None, "checks": {},
+                       "report": None, "log": None, "error": f"{type(e).__name__}: {e}"}
+            done.append(res)
+            statuses = Counter(res["checks"].values())
+            detail = res["error"] or ", ".join(f"{k}={v}" for k, v in sorted(statuses.items()))
+            took = f"{res['seconds']}s" if res["seconds"] is not None else "-"
+            print(f"[BATCH] {len(done)}/{len(jobs)} {domain} -> kod {res['exit_code']} ({took}) {detail}")
+
+    summary = summarize(done, time.time() - t_start)
+    print(f"\n[BATCH] domen: {summary['domains']}, nieudanych audytów: {summary['failed_audits']}, "
+          f"czas: {summary['wall_seconds']:.1f}s, przepustowość: {summary['domains_per_minute']} domen/min")
+    for name, counts in summary["checks"].items():
+        print(f" - {name}: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items(), key=str)))
+
+    os.makedirs("reports", exist_ok=True)
+    fname = os.path.join("reports", f"batch_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.json")
+    with open(fname, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Podsumowanie zapisane do pliku: {fname}")
+    sys.exit(max((res["exit_code"] for res in done), default=0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# bench.py
+"""
+Benchmark parserów HTML (parsing.BACKENDS) na stronach, które faktycznie sprawdzają checki:
+zasoby z planu (Resource z dom=True) + pierwsze strony z sitemapy (crawl).
+
+--records N: pamięć na stronę crawla — N rekordów (crawl.PageRecord) zbudowanych z wyników
+prawdziwego crawla domeny, z unikalnymi URL-ami; assert na RECORD_BUDGET_BYTES.
+
+--psi N: szczytowe RSS przy N zapytaniach PSI o stronę (PSI_CONCURRENCY naraz) — pełny r.json()
+kontra strumieniowe wyciąganie wyników (pagespeed._get); każdy wariant w osobnym procesie.
+Zapytania idą do PSI_ENDPOINT (albo --psi-endpoint) i liczą się do dziennego budżetu.
+
+Użycie: python bench.py https://example.com/ [--pages 10] [--repeat 5] [--records 50000]
+        python bench.py https://example.com/ --psi 8 [--psi-endpoint http://127.0.0.1:8790/]
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import context
+import pagespeed
+from checks import ALL_CHECKS
+from config import CRAWL_LIMIT
+from crawl import PAGE_ANALYZERS, PageRecord, crawl_site
+from parsing import BACKENDS, parse_html
+from plan import build_plan
+from runner import ensure_root
+from utils import fetch, collect_urls
+
+# typowe zapytania checków (selektory i wyszukiwania z checks/*.py)
+_SELECTORS = [
+    'script[type="application/ld+json"]',
+    '[aria-label*="breadcrumb" i], nav.breadcrumb, .breadcrumb',
+    "[id*='faq'], [class*='faq']",
+    "footer, .footer, #footer",
+    '[itemscope][itemtype*="AggregateRating" i]',
+    '.author, .post-author, .byline, .entry-author, a[rel~="author"], [itemprop="author"]',
+    ".related.products a, .products a, [data-product-id] a",
+    "img[src]",
+    "source[srcset]",
+]
+
+
+def _workload(soup):
+    """Zapytania jak w checkach — żeby porównać nie tylko samo parsowanie."""
+    n = 0
+    for sel in _SELECTORS:
+        n += len(soup.select(sel))
+    for a in soup.find_all("a", href=True):
+        n += len(a.get_text(" ", strip=True))
+        a.get("rel")
+    for h in ("h1", "h2", "h3"):
+        n += len(soup.find_all(h))
+    n += len(soup.find_all("img"))
+    n += len(soup.find_all(attrs={"itemscope": True}))
+    soup.find("meta", attrs={"name": "description"})
+    soup.find("link", rel=lambda v: v and "canonical" in v)
+    n += len([p.get_text(" ", strip=True) for p in (soup.find("main") or soup).find_all("p")])
+    n += len(soup.get_text(" ", strip=True))
+    return n
+
+
+def _pages(ctx, crawl_pages):
+    root = ctx.root
+    plan = build_plan(ctx, ALL_CHECKS)
+    urls = [e["resource"].url for e in plan["resources"] if e["resource"].dom]
+    if crawl_pages:
+        urls += [urljoin(root, u) for u in collect_urls(root, limit=crawl_pages)]
+    pages = []
+    for u in dict.fromkeys(urls):
+        try:
+            r = fetch(u)
+        except Exception as e:
+            print(f"[bench] pominięto {u}: {e}")
+            continue
+        if r.status_code == 200 and r.content:
+            pages.append((u, r.content, r.encoding))
+    return pages
+
+
+# budżet pamięci na jedną stronę crawla (rekord + wyniki analizatorów + napisy)
+RECORD_BUDGET_BYTES = 1024
+
+
+def _clone(page, i):
+    """Kopia rekordu pod nowym URL-em — z tymi samymi współdzieleniami co w crawl._analyze."""
+    url = f"{page.url}?bench={i}"
+    rec = PageRecord(url, page.lastmod)
+    rec.final = sys.intern(url if page.final == page.url else f"{page.final}?bench={i}")
+    rec.status, rec.bytes, rec.elapsed = page.status, page.bytes, page.elapsed
+    rec.hash = bytes(bytearray(page.hash)) if page.hash else None
+    values = {}
+    for name in PAGE_ANALYZERS:
+        v = page.finding(name)
+        if isinstance(v, str):  # canonical: ten sam URL co strona -> ten sam (zinternowany) obiekt
+            v = sys.intern(url) if v == page.url else v + f"?bench={i}"
+        elif isinstance(v, tuple):
+            v = type(v)(*v)
+        values[name] = v
+    rec.set_findings(values)
+    return rec
+
+
+def _records_memory(ctx, n):
+    pages = [p for p in crawl_site(ctx) if p.findings is not None]
+    if not pages:
+        print("[bench] crawl nie zwrócił żadnej przeanalizowanej strony")
+        return
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [_clone(pages[i % len(pages)], i) for i in range(n)]
+    per_page = (tracemalloc.get_traced_memory()[0] - before) / n
+    tracemalloc.stop()
+    print(f"[bench] rekordy crawla: {len(records)}, {per_page:.0f} B/stronę "
+          f"(budżet {RECORD_BUDGET_BYTES} B, {per_page * 100_000 / 2**20:.0f} MB na 100k stron)")
+    assert per_page <= RECORD_BUDGET_BYTES, f"rekord crawla: {per_page:.0f} B > {RECORD_BUDGET_BYTES} B"
+
+
+def _psi_worker(mode, url, n, overrides):
+    """(RSS przed, szczytowe RSS) procesu przy n zapytaniach PSI — mode: "json" albo "stream"."""
+    import resource  # tylko Unix — jak cały pomiar RSS
+
+    ctx = context.AuditContext(url, overrides=overrides)
+    cfg = ctx.config
+
+    def one(i):
+        strategy = ("mobile", "desktop")[i % 2]
+        if mode == "stream":
+            return pagespeed.extract_scores(pagespeed._get(url, strategy, cfg))
+        params = {"url": url, "strategy": strategy}
+        if cfg.PSI_API_KEY:
+            params["key"] = cfg.PSI_API_KEY
+        with pagespeed._http_get(cfg.PSI_ENDPOINT, params, cfg) as r:
+            r.raise_for_status()
+            return pagespeed.extract_scores(r.json())
+
+    with context.activate(ctx):
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with ThreadPoolExecutor(max_workers=max(1, cfg.PSI_CONCURRENCY)) as pool:
+            results = list(pool.map(context.wrap(one), range(n)))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    assert all(r["scores"]["performance"] is not None for r in results), "PSI: brak wyniku performance"
+    return before * 1024, peak * 1024, results[0]
+
+
+def _psi_memory(url, n, overrides):
+    in_flight = min(n, max(1, context.AuditContext(url, overrides=overrides).config.PSI_CONCURRENCY))
+    print(f"[bench] PSI: {n} zapytań o {url}, {in_flight} naraz\n")
+    print(f"{'wariant':<8} {'RSS przed':>10} {'szczyt':>10} {'przyrost':>10} {'na wynik':>10}")
+    results = {}
+    for mode in ("json", "stream"):
+        # świeży proces na wariant — ru_maxrss nie da się wyzerować
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            before, peak, results[mode] = pool.submit(_psi_worker, mode, url, n, overrides).result()
+        grown = max(peak - before, 0)
+        print(f"{mode:<8} {before / 2**20:>8.1f}MB {peak / 2**20:>8.1f}MB {grown / 2**20:>8.1f}MB "
+              f"{grown / in_flight / 2**20:>8.1f}MB")
+    assert results["json"] == results["stream"], "PSI: strumieniowe wyniki różnią się od r.json()"
+
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Porównanie parserów HTML na stronach z audytu")
+    ap.add_argument("domain_or_url")
+    ap.add_argument("--pages", type=int, default=min(10, CRAWL_LIMIT), help="ile stron z sitemapy dołożyć")
+    ap.add_argument("--repeat", type=int, default=5, help="ile powtórzeń (bierzemy najlepszy czas)")
+    ap.add_argument("--records", type=int, default=0, help="zamiast parserów: pamięć N rekordów crawla")
+    ap.add_argument("--psi", type=int, default=0, help="zamiast parserów: szczytowe RSS przy N zapytaniach PSI")
+    ap.add_argument("--psi-endpoint", help="adres API PSI (domyślnie PSI_ENDPOINT z config.py)")
+    args = ap.parse_args()
+
+    if args.psi:
+        overrides = {"PSI_ENDPOINT": args.psi_endpoint} if args.psi_endpoint else None
+        _psi_memory(ensure_root(args.domain_or_url), args.psi, overrides)
+        return
+
+    ctx = context.AuditContext(args.domain_or_url, root=ensure_root(args.domain_or_url),
+                               overrides={"HTTP_CACHE_ENABLED": False})
+    with context.activate(ctx):
+        if args.records:
+            _records_memory(ctx, args.records)
+            return
+        pages = _pages(ctx, args.pages)
+    total_kb = sum(len(body) for _, body, _ in pages) / 1024
+    print(f"[bench] stron: {len(pages)}, łącznie {total_kb:.0f} KB, powtórzeń: {args.repeat}\n")
+    if not pages:
+        return
+
+    results = {}
+    for backend in BACKENDS:
+        parse_s = _time(lambda: [parse_html(body, enc, backend) for _, body, enc in pages], args.repeat)
+        trees = [parse_html(body, enc, backend) for _, body, enc in pages]
+        query_s = _time(lambda: [_workload(t) for t in trees], args.repeat)
+        results[backend] = (parse_s, query_s)
+
+    base = sum(results["bs4"])
+    print(f"{'parser':<8} {'parsowanie':>12} {'zapytania':>12} {'razem':>10} {'vs bs4':>8}")
+    for backend, (parse_s, query_s) in results.items():
+        total = parse_s + query_s
+        print(f"{backend:<8} {parse_s * 1000:>10.1f}ms {query_s * 1000:>10.1f}ms {total * 1000:>8.1f}ms "
+              f"{base / total:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# charset.py
+"""
+Kodowanie odpowiedzi bez pełnej detekcji statystycznej `requests` (r.apparent_encoding).
+
+Kolejność: charset z Content-Type -> BOM -> <meta charset> / http-equiv w pierwszych
+SNIFF_BYTES bajtach -> poprawne UTF-8 -> dopiero na końcu detekcja na całej treści.
+Wynik ustawiamy w r.encoding, więc r.text też już nie zgaduje.
+"""
+import codecs
+import re
+import time
+
+import metrics
+
+SNIFF_BYTES = 4096
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+
+def _known(name):
+    try:
+        return codecs.lookup(name.decode("ascii", "ignore") if isinstance(name, bytes) else name).name
+    except LookupError:
+        return None
+
+
+def sniff(content_type: str, body: bytes):
+    """(kodowanie, źródło) albo (None, None), jeśli potrzebna pełna detekcja."""
+    m = _HEADER_CHARSET.search(content_type or "")
+    if m and _known(m.group(1)):
+        return _known(m.group(1)), "header"
+    for bom, name in _BOMS:
+        if body.startswith(bom):
+            return name, "bom"
+    m = _META_CHARSET.search(body[:SNIFF_BYTES])
+    if m and _known(m.group(1)):
+        return _known(m.group(1)), "meta"
+    try:
+        body.decode("utf-8")
+        return "utf-8", "utf8"
+    except UnicodeDecodeError:
+        return None, None
+
+
+def apply_encoding(r):
+    """Ustala r.encoding dla odpowiedzi z treścią (tanio, pełna detekcja tylko w ostateczności)."""
+    body = r.content or b""
+    if not body:
+        return r
+    t0 = time.perf_counter()
+    enc, source = sniff(r.headers.get("Content-Type", ""), body)
+    if enc is None:
+        enc, source = r.apparent_encoding or "utf-8", "detected"
+    r.encoding = enc
+    r.charset_source = source
+    metrics.incr(f"charset.{source}")
+    metrics.incr("charset.sniff_seconds", time.perf_counter() - t0)  # samo wykrycie; dekodowanie jest w parse_seconds
+    return r
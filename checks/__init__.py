@@ -1,3 +1,6 @@
+from crawl import crawl_site
+from pagespeed import start as psi_start
+
 from .meta_tags import run as meta_tags
 from .headings import run as headings
 from .canonical import run as canonical
@@ -5,6 +8,7 @@ from .redirects import run as redirects
 from .trailing_slash import run as trailing_slash
 from .breadcrumbs_schema import run as breadcrumbs_schema
 from .images_basic import run as images_basic
+from .images_sitewide import run as images_sitewide
 from .schema import run as schema_pages
 from .blogpost_headings import run as blogpost_headings
 from .home_paragraphs import run as home_paragraphs
@@ -34,6 +38,7 @@ ALL_CHECKS = [
     ("trailing_slash_consistency", trailing_slash),
     ("breadcrumbs_presence", breadcrumbs_schema),
     ("images_weight_webp", images_basic),
+    ("images_sitewide", images_sitewide),
     ("schema_pages", schema_pages),
     ("blogpost_headings", blogpost_headings),
     ("home_paragraphs", home_paragraphs),
@@ -60,3 +65,15 @@ ALL_CHECKS = [
     # ===========================
 
 ]
+
+# Etapy wspólne dla wielu checków — scheduler uruchamia je raz, przed checkami zależnymi
+STAGES = [
+    ("crawl", crawl_site),
+    ("psi_start", psi_start),  # zapytania PSI w tle — nakładają się na pozostałe checki
+]
+CHECK_DEPENDS = {
+    "meta_tags_coverage": ("crawl",),
+    "headings_h1": ("crawl",),
+    "canonical_self_reference": ("crawl",),
+    "images_sitewide": ("crawl",),
+}
@@ -1,8 +1,8 @@
 # checks/alt_tags.py
 import re
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import PRODUCT_URL, BLOG_POST
+from utils import fetch, get_document
+from plan import Resource
 
 # Heurystyki wykrywania "auto-altów"
 AUTO_ALT_PATTERNS = [
@@ -45,19 +45,25 @@ def _is_abs(u: str) -> bool:
         return False
 
 
-def _target_url(root):
+def _target_url(ctx):
     """Zwraca pełny URL do sprawdzenia: produkt > blogpost, inaczej SKIP."""
-    if PRODUCT_URL:
-        return PRODUCT_URL if _is_abs(PRODUCT_URL) else urljoin(root, PRODUCT_URL), "product"
-    if BLOG_POST:
-        return BLOG_POST if _is_abs(BLOG_POST) else urljoin(root, BLOG_POST), "blogpost"
+    product_url, blog_post = ctx.config.PRODUCT_URL, ctx.config.BLOG_POST
+    if product_url:
+        return product_url if _is_abs(product_url) else urljoin(ctx.root, product_url), "product"
+    if blog_post:
+        return blog_post if _is_abs(blog_post) else urljoin(ctx.root, blog_post), "blogpost"
     return None, None
 
 
+def resources(ctx):
+    url, _ = _target_url(ctx)
+    return [Resource(url)] if url else []
+
+
 def _is_decorative(img):
     # alt="" jest OK tylko dla obrazów czysto dekoracyjnych
-    role = (img.get("role") or "").lower()
-    aria_hidden = (img.get("aria-hidden") or "").lower()
+    role = (img.role or "").lower()
+    aria_hidden = (img.aria_hidden or "").lower()
     return role in ("presentation", "none") or aria_hidden in ("true", "1")
 
 
@@ -90,26 +96,22 @@ def _is_noise_image(img, src_low: str) -> bool:
 
     # 2) bardzo małe piksele (jeśli width/height atrybuty są znane)
     try:
-        w = int(img.get("width") or 0)
-        h = int(img.get("height") or 0)
+        w = int(img.width or 0)
+        h = int(img.height or 0)
         if (w and w <= 2) or (h and h <= 2):
             return True
     except Exception:
         pass
 
     # 3) po klasach (np. "icon", "flag", "spinner")
-    try:
-        cls = " ".join(img.get("class", [])) if isinstance(img.get("class"), list) else (img.get("class") or "")
-        if any(r.search(cls) for r in _noise_cls_re):
-            return True
-    except Exception:
-        pass
+    if any(r.search(img.cls) for r in _noise_cls_re):
+        return True
 
     return False
 
 
-def run(root):
-    url, page_type = _target_url(root)
+def run(ctx):
+    url, page_type = _target_url(ctx)
     if not url:
         return {
             "name": "alt_tags",
@@ -123,9 +125,7 @@ def run(root):
 
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
-
-        imgs = soup.find_all("img")
+        imgs = get_document(r).facts.images
         total = len(imgs)
 
         missing_alt = []       # brak atrybutu alt
@@ -134,7 +134,7 @@ def run(root):
         skipped   = 0          # pominięte przez filtry "noise"
 
         for img in imgs:
-            src = img.get("src") or img.get("data-src") or img.get("data-lazy") or ""
+            src = img.src or img.data_src or img.data_lazy or ""
             s_low = (src or "").strip().lower()
 
             # ❗️Pomijamy SVG, data-uri, loadery/spinnery, flagi, piksele, itp.
@@ -142,7 +142,7 @@ def run(root):
                 skipped += 1
                 continue
 
-            alt = img.get("alt")
+            alt = img.alt
 
             # brak alt jako atrybut
             if alt is None:
@@ -1,8 +1,7 @@
 # checks/blog_author.py
-import json
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import BLOG_POST
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_abs(u: str) -> bool:
     try:
@@ -19,38 +18,34 @@ def _add(name_set, val):
     if v:
         name_set.add(v)
 
-def _jsonld_authors(soup):
+def _jsonld_authors(sd):
     names = set()
-    for tag in soup.select('script[type="application/ld+json"]'):
-        try:
-            data = json.loads(tag.string)
-        except Exception:
+    # author na dowolnym węźle (Article / BlogPosting / WebPage, także w @graph);
+    # {"@id": ...} wskazuje na Person zdefiniowaną gdzie indziej w grafie
+    for node in sd.nodes:
+        author = node.get("author")
+        if not author:
             continue
-        items = data if isinstance(data, list) else [data]
-        for it in items:
-            if not isinstance(it, dict):
-                continue
-            # author może być na poziomie Article / BlogPosting lub zagnieżdżony
-            for node in (it, *([it.get("mainEntityOfPage")] if isinstance(it.get("mainEntityOfPage"), dict) else [])):
-                if not isinstance(node, dict):
-                    continue
-                author = node.get("author")
-                if not author:
-                    continue
-                if isinstance(author, list):
-                    for a in author:
-                        if isinstance(a, dict):
-                            _add(names, a.get("name"))
-                        else:
-                            _add(names, str(a))
-                elif isinstance(author, dict):
-                    _add(names, author.get("name"))
-                else:
-                    _add(names, str(author))
+        for a in (author if isinstance(author, list) else [author]):
+            a = sd.resolve(a)
+            if isinstance(a, dict):
+                _add(names, a.get("name"))
+            else:
+                _add(names, str(a))
     return names
 
-def run(root):
-    if not BLOG_POST:
+def _target_url(ctx):
+    blog_post = ctx.config.BLOG_POST
+    if not blog_post:
+        return None
+    return blog_post if _is_abs(blog_post) else urljoin(ctx.root, blog_post)
+
+def resources(ctx):
+    url = _target_url(ctx)
+    return [Resource(url)] if url else []
+
+def run(ctx):
+    if not ctx.config.BLOG_POST:
         return {
             "name": "blog_author",
             "status": "SKIP",
@@ -59,12 +54,13 @@ def run(root):
             "fix_hint": "Ustaw BLOG_POST (ścieżka względna lub pełny URL) wpisu do sprawdzenia."
         }
 
-    url = BLOG_POST if _is_abs(BLOG_POST) else urljoin(root, BLOG_POST)
+    url = _target_url(ctx)
     print(f"[blog_author] Checking {url}")
 
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
+        doc = get_document(r)
+        soup = doc.soup
 
         authors = set()
 
@@ -95,7 +91,7 @@ def run(root):
             _add(authors, meta.get("content"))
 
         # 5) JSON-LD (Article/BlogPosting/CreativeWork z polem author)
-        authors |= _jsonld_authors(soup)
+        authors |= _jsonld_authors(doc.structured_data)
 
         status = "PASS" if authors else "FAIL"
 
@@ -1,19 +1,23 @@
 # checks/blog_exists.py
-from utils import fetch, get_soup
-from config import BLOG_HINTS
+from utils import fetch, get_document
+from plan import Resource
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def run(ctx):
+    root = ctx.root
     print(f"[blog_exists] Checking blog presence on: {root}")
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        facts = get_document(r).facts
 
         found_links = []
-        for a in soup.find_all("a", href=True):
-            href = a["href"].lower()
-            text = (a.get_text() or "").lower()
+        for a in facts.links:
+            href = a.href.lower()
+            text = a.raw_text.lower()
 
-            for hint in BLOG_HINTS:
+            for hint in ctx.config.BLOG_HINTS:
                 if hint in href or hint in text:
                     found_links.append({"href": href, "text": text.strip()})
                     break
@@ -1,7 +1,7 @@
 # checks/blogpost_headings.py
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import BLOG_POST
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_absolute(u: str) -> bool:
     try:
@@ -9,9 +9,19 @@ def _is_absolute(u: str) -> bool:
     except Exception:
         return False
 
-def run(root):
+def _target_url(ctx):
+    blog_post = ctx.config.BLOG_POST
+    if not blog_post:
+        return None
+    return blog_post if _is_absolute(blog_post) else urljoin(ctx.root, blog_post)
+
+def resources(ctx):
+    url = _target_url(ctx)
+    return [Resource(url)] if url else []
+
+def run(ctx):
     # zbuduj pełny URL blogposta
-    if not BLOG_POST:
+    if not ctx.config.BLOG_POST:
         return {
             "name": "blogpost_headings",
             "status": "SKIP",
@@ -20,18 +30,13 @@ def run(root):
             "fix_hint": "Nie ustawiono BLOG_POST w config.py"
         }
 
-    url = BLOG_POST if _is_absolute(BLOG_POST) else urljoin(root, BLOG_POST)
+    url = _target_url(ctx)
     print(f"[blogpost_headings] Checking {url}")
 
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
-
-        headings = []
-        for level in range(1, 7):
-            for h in soup.find_all(f"h{level}"):
-                text = h.get_text(strip=True)[:80]
-                headings.append((level, text))
+        # facts.headings są już ułożone poziomami (H1…, potem H2…), jak kolejne find_all
+        headings = [(h.level, h.text[:80]) for h in get_document(r).facts.headings]
 
         # sprawdzanie kolejności
         errors = []
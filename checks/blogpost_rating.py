@@ -1,9 +1,9 @@
 # checks/blogpost_rating.py
-import json
 import re
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import BLOG_POST
+from utils import fetch, get_document
+from plan import Resource
+from structured_data import short_type
 
 def _is_abs(u: str) -> bool:
     try:
@@ -28,56 +28,37 @@ RATING_TEXT_RE = re.compile(
     re.I
 )
 
-def _find_jsonld_ratings(soup):
+def _is_rating(node):
+    t = node.get("@type") if isinstance(node, dict) else None
+    return any(x and short_type(x) == "AggregateRating" for x in (t if isinstance(t, list) else [t]))
+
+def _find_jsonld_ratings(sd):
+    # tylko oceny wpisu: AggregateRating na najwyższym poziomie (także w @graph) i aggregateRating
+    # z Article/BlogPosting/CreativeWork (także przez @id) — nie z Product/Organization (np. widget sklepu)
+    ratings = [node for node in sd.roots if _is_rating(node)]
+    for post in sd.of_type("Article", "BlogPosting", "CreativeWork"):
+        value = post.get("aggregateRating")
+        for ar in (value if isinstance(value, list) else [value]):
+            ar = sd.resolve(ar)
+            if _is_rating(ar) and not any(ar is seen for seen in ratings):
+                ratings.append(ar)
+    return [{
+        "type": "AggregateRating",
+        "ratingValue": ar.get("ratingValue"),
+        "ratingCount": ar.get("ratingCount") or ar.get("reviewCount"),
+    } for ar in ratings]
+
+def _find_microdata_rdfa_ratings(facts):
     found = []
-    for s in soup.select('script[type="application/ld+json"]'):
-        try:
-            data = json.loads(s.string)
-        except Exception:
-            continue
-        items = data if isinstance(data, list) else [data]
-        for it in items:
-            # bezpośrednie AggregateRating
-            if isinstance(it, dict) and it.get("@type") == "AggregateRating":
-                found.append({
-                    "type": "AggregateRating",
-                    "ratingValue": it.get("ratingValue"),
-                    "ratingCount": it.get("ratingCount") or it.get("reviewCount"),
-                })
-            # zagnieżdżone w Article/BlogPosting
-            if isinstance(it, dict) and it.get("@type") in ("Article","BlogPosting","CreativeWork"):
-                ar = it.get("aggregateRating")
-                if isinstance(ar, dict) and ar.get("@type") == "AggregateRating":
-                    found.append({
-                        "type": "AggregateRating",
-                        "ratingValue": ar.get("ratingValue"),
-                        "ratingCount": ar.get("ratingCount") or ar.get("reviewCount"),
-                    })
-    return found
-
-def _find_microdata_rdfa_ratings(soup):
-    found = []
-    # Microdata AggregateRating
-    for agg in soup.select('[itemscope][itemtype*="AggregateRating" i]'):
-        rv = None; rc = None
-        rv_el = agg.find(attrs={"itemprop": "ratingValue"})
-        rc_el = agg.find(attrs={"itemprop": "ratingCount"}) or agg.find(attrs={"itemprop": "reviewCount"})
-        if rv_el:
-            rv = rv_el.get("content") or rv_el.get_text(strip=True)
-        if rc_el:
-            rc = rc_el.get("content") or rc_el.get_text(strip=True)
-        found.append({"type": "AggregateRating", "ratingValue": rv, "ratingCount": rc})
-
-    # RDFa typeof AggregateRating
-    for agg in soup.select('[typeof*="AggregateRating" i]'):
-        rv = None; rc = None
-        rv_el = agg.find(attrs={"property": "ratingValue"})
-        rc_el = agg.find(attrs={"property": "ratingCount"}) or agg.find(attrs={"property": "reviewCount"})
-        if rv_el:
-            rv = rv_el.get("content") or rv_el.get_text(strip=True)
-        if rc_el:
-            rc = rc_el.get("content") or rc_el.get_text(strip=True)
-        found.append({"type": "AggregateRating", "ratingValue": rv, "ratingCount": rc})
+    # Microdata ([itemscope][itemtype*=AggregateRating i]), potem RDFa ([typeof*=AggregateRating i])
+    for kind in ("microdata", "rdfa"):
+        for agg in facts.items:
+            if agg.kind != kind or "aggregaterating" not in (agg.type or "").lower():
+                continue
+            rc = agg.props.get("ratingCount")
+            if "ratingCount" not in agg.props:
+                rc = agg.props.get("reviewCount")
+            found.append({"type": "AggregateRating", "ratingValue": agg.props.get("ratingValue"), "ratingCount": rc})
     return found
 
 def _find_widget_ui(soup):
@@ -108,8 +89,18 @@ def _find_widget_ui(soup):
             unique.append(w); seen.add(key)
     return unique
 
-def run(root):
-    if not BLOG_POST:
+def _target_url(ctx):
+    blog_post = ctx.config.BLOG_POST
+    if not blog_post:
+        return None
+    return blog_post if _is_abs(blog_post) else urljoin(ctx.root, blog_post)
+
+def resources(ctx):
+    url = _target_url(ctx)
+    return [Resource(url)] if url else []
+
+def run(ctx):
+    if not ctx.config.BLOG_POST:
         return {
             "name": "blogpost_rating",
             "status": "SKIP",
@@ -118,16 +109,16 @@ def run(root):
             "fix_hint": "Ustaw BLOG_POST (ścieżka względna lub pełny URL) wpisu do sprawdzenia."
         }
 
-    url = BLOG_POST if _is_abs(BLOG_POST) else urljoin(root, BLOG_POST)
+    url = _target_url(ctx)
     print(f"[blogpost_rating] Checking {url}")
 
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
+        doc = get_document(r)
 
-        jsonld = _find_jsonld_ratings(soup)
-        micro  = _find_microdata_rdfa_ratings(soup)
-        ui     = _find_widget_ui(soup)
+        jsonld = _find_jsonld_ratings(doc.structured_data)
+        micro  = _find_microdata_rdfa_ratings(doc.facts)
+        ui     = _find_widget_ui(doc.soup)
 
         has_schema = bool(jsonld or micro)
         has_ui     = bool(ui)
@@ -1,21 +1,17 @@
-import json
-from utils import fetch, get_soup
+from utils import fetch, get_document
+from plan import Resource
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def run(ctx):
+    root = ctx.root
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        doc = get_document(r)
+        soup = doc.soup
         has_html_breadcrumbs = bool(soup.select('[aria-label*="breadcrumb" i], nav.breadcrumb, .breadcrumb'))
-        has_jsonld = False
-        for s in soup.select('script[type="application/ld+json"]'):
-            try:
-                data = json.loads(s.string)
-                items = data if isinstance(data, list) else [data]
-                if any(isinstance(i, dict) and i.get("@type") == "BreadcrumbList" for i in items):
-                    has_jsonld = True
-                    break
-            except:
-                continue
+        has_jsonld = doc.structured_data.has_type("BreadcrumbList")
         status = "PASS" if (has_html_breadcrumbs or has_jsonld) else "FAIL"
         return {
             "name": "breadcrumbs_presence",
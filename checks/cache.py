@@ -1,5 +1,6 @@
 # checks/cache.py
 from utils import fetch
+from plan import Resource
 
 CACHE_HEADERS = [
     "x-cache",
@@ -10,7 +11,11 @@ CACHE_HEADERS = [
     "x-varnish",
 ]
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root, dom=False)]
+
+def run(ctx):
+    root = ctx.root
     print(f"[cache_headers] Checking cache headers for: {root}")
     try:
         r = fetch(root)
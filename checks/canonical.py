@@ -1,31 +1,35 @@
-from utils import fetch, extract_basic_meta, canonicalize_compare, throttle, collect_urls
-from config import CRAWL_LIMIT
+from utils import canonicalize_compare
+from crawl import crawl_site, page_analyzer
 
-def run(root):
-    urls = collect_urls(root, limit=CRAWL_LIMIT)
+
+@page_analyzer("canonical_self_reference", head_only=True)
+def analyze(r, doc):
+    _, _, _, canonical = doc.basic_meta()
+    return canonical  # crawl internuje — zwykle ten sam obiekt co URL strony
+
+
+def run(ctx):
+    pages = crawl_site(ctx)
 
     not_self = []
     missing = []
 
-    for u in urls:
-        try:
-            r = fetch(u, allow_redirects=True)
-            final_url = r.url
-            _, _, _, canonical = extract_basic_meta(r.text)
-            if not canonical:
-                missing.append(u)
-            else:
-                if not canonicalize_compare(final_url, canonical):
-                    not_self.append({"url": u, "final": final_url, "canonical": canonical})
-        except:
+    for page in pages:
+        canonical = page.finding("canonical_self_reference")
+        if canonical is None:
             continue
-        throttle()
+        u, final_url = page.url, page.final
+        if not canonical:
+            missing.append(u)
+        else:
+            if not canonicalize_compare(final_url, canonical):
+                not_self.append({"url": u, "final": final_url, "canonical": canonical})
 
     status = "PASS" if not missing and not not_self else "FAIL"
     return {
         "name": "canonical_self_reference",
         "status": status,
-        "metrics": {"checked_pages": len(urls), "missing": len(missing), "mismatch": len(not_self)},
+        "metrics": {"checked_pages": len(pages), "missing": len(missing), "mismatch": len(not_self)},
         "samples": {"missing": missing[:10], "mismatch": not_self[:10]},
         "fix_hint": "Ustaw self-referencing canonical na każdej unikalnej stronie. Unikaj kanoników wskazujących na inną wersję URL."
     }
@@ -1,7 +1,7 @@
 # checks/clickable_elements.py
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import CLICKABLE_PATHS
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_absolute(u: str) -> bool:
     try:
@@ -9,14 +9,22 @@ def _is_absolute(u: str) -> bool:
     except Exception:
         return False
 
-def run(root):
+def _targets(ctx):
+    root, paths = ctx.root, ctx.config.CLICKABLE_PATHS
     targets = []
-    if not CLICKABLE_PATHS:
+    if not paths:
         targets = [root]
     else:
-        for p in CLICKABLE_PATHS:
+        for p in paths:
             full = p if _is_absolute(p) else urljoin(root, p)
             targets.append(full)
+    return targets
+
+def resources(ctx):
+    return [Resource(u) for u in _targets(ctx)]
+
+def run(ctx):
+    targets = _targets(ctx)
 
     found_tel = []
     found_mail = []
@@ -27,9 +35,9 @@ def run(root):
     for url in targets:
         try:
             r = fetch(url)
-            soup = get_soup(r.text)
-            for a in soup.find_all("a", href=True):
-                href = a["href"].strip().lower()
+            facts = get_document(r).facts
+            for a in facts.links:
+                href = a.href.strip().lower()
                 if href.startswith("tel:"):
                     found_tel.append({"url": url, "href": href})
                 elif href.startswith("mailto:"):
@@ -1,7 +1,7 @@
 # checks/contact_form_under_post.py
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import BLOG_POST
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_abs(u: str) -> bool:
     try:
@@ -10,13 +10,18 @@ def _is_abs(u: str) -> bool:
     except Exception:
         return False
 
-def _target_url(root):
-    if BLOG_POST:
-        return BLOG_POST if _is_abs(BLOG_POST) else urljoin(root, BLOG_POST)
+def _target_url(ctx):
+    blog_post = ctx.config.BLOG_POST
+    if blog_post:
+        return blog_post if _is_abs(blog_post) else urljoin(ctx.root, blog_post)
     return None
 
-def run(root):
-    url = _target_url(root)
+def resources(ctx):
+    url = _target_url(ctx)
+    return [Resource(url)] if url else []
+
+def run(ctx):
+    url = _target_url(ctx)
     if not url:
         return {
             "name": "contact_form_under_post",
@@ -30,17 +35,15 @@ def run(root):
 
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
-
-        forms = soup.find_all("form")
+        forms = get_document(r).facts.forms
         total_forms = len(forms)
 
         # heurystyki na formularz kontaktowy
         contact_like = []
         for f in forms:
-            txt = f.get_text(" ", strip=True).lower()
+            txt = f.text.lower()
             if "email" in txt or "wiadomość" in txt or "message" in txt or "kontakt" in txt:
-                contact_like.append({"form_html": str(f)[:180]})
+                contact_like.append({"form_html": f.html[:180]})
 
         status = "PASS" if contact_like else "FAIL"
 
@@ -1,20 +1,28 @@
 # checks/error_page_404.py
 from urllib.parse import urljoin
-from utils import fetch, get_soup
+from utils import fetch, get_document
+from plan import Resource
 
 ERROR_HINTS = [
     "404", "nie znaleziono", "page not found", "not found", "oops", "błąd", "error"
 ]
 
-def run(root):
-    test_url = urljoin(root.rstrip("/") + "/", "nonexistent-seo-audit-check-404-page")
+def _test_url(root):
+    return urljoin(root.rstrip("/") + "/", "nonexistent-seo-audit-check-404-page")
+
+def resources(ctx):
+    return [Resource(_test_url(ctx.root))]
+
+def run(ctx):
+    root = ctx.root
+    test_url = _test_url(root)
     print(f"[error_page_404] Checking: {test_url}")
 
     try:
         r = fetch(test_url)
         status_code = r.status_code
         text = (r.text or "").lower()
-        soup = get_soup(r.text)
+        soup = get_document(r).soup
 
         # Heurystyka 1: sprawdzamy kod odpowiedzi
         if status_code != 404:
@@ -1,8 +1,7 @@
 # checks/faq.py
-import json
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import CONTACT_PAGE
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_abs(u: str) -> bool:
     try:
@@ -11,37 +10,31 @@ def _is_abs(u: str) -> bool:
     except Exception:
         return False
 
-def _target_urls(root):
+def _target_urls(ctx):
+    root, contact_page = ctx.root, ctx.config.CONTACT_PAGE
     urls = [root]  # homepage zawsze
-    if CONTACT_PAGE:
-        urls.append(CONTACT_PAGE if _is_abs(CONTACT_PAGE) else urljoin(root, CONTACT_PAGE))
+    if contact_page:
+        urls.append(contact_page if _is_abs(contact_page) else urljoin(root, contact_page))
     return urls
 
-def run(root):
-    urls = _target_urls(root)
+def resources(ctx):
+    return [Resource(u) for u in _target_urls(ctx)]
+
+def run(ctx):
+    urls = _target_urls(ctx)
     found_faq = []
     checked = []
 
     try:
         for url in urls:
             r = fetch(url)
-            soup = get_soup(r.text)
+            doc = get_document(r)
+            soup = doc.soup
             checked.append(url)
 
-            # --- 1) Szukamy schema.org FAQ ---
-            for script in soup.find_all("script", type="application/ld+json"):
-                try:
-                    data = json.loads(script.string or "{}")
-                except Exception:
-                    continue
-
-                # czasem ld+json to lista
-                if isinstance(data, list):
-                    for d in data:
-                        if isinstance(d, dict) and d.get("@type") == "FAQPage":
-                            found_faq.append({"url": url, "type": "ld+json"})
-                elif isinstance(data, dict) and data.get("@type") == "FAQPage":
-                    found_faq.append({"url": url, "type": "ld+json"})
+            # --- 1) Szukamy schema.org FAQ (też w @graph, np. WebPage + FAQPage z Yoast) ---
+            for _ in doc.structured_data.of_type("FAQPage"):
+                found_faq.append({"url": url, "type": "ld+json"})
 
             # --- 2) Szukamy elementów w DOM ---
             if soup.select("[id*='faq'], [class*='faq']"):
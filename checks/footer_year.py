@@ -1,7 +1,8 @@
 # checks/footer_year.py
 import re
 from datetime import datetime
-from utils import fetch, get_soup
+from utils import fetch, get_document
+from plan import Resource
 
 YEAR_RE = re.compile(r"(19|20)\d{2}")
 RANGE_RE = re.compile(r"(?P<start>(19|20)\d{2})\s*[-–—]\s*(?P<end>(19|20)\d{2})")
@@ -26,11 +27,15 @@ def _extract_text_candidates(soup):
     scripts = " ".join((s.get_text(" ", strip=True) or "") for s in soup.find_all("script"))
     return chunks, scripts
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def run(ctx):
+    root = ctx.root
     print(f"[footer_year] Checking: {root}")
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        soup = get_document(r).soup
 
         now_year = datetime.now().year
         texts, scripts_blob = _extract_text_candidates(soup)
@@ -1,35 +1,43 @@
-from bs4 import BeautifulSoup
-from utils import fetch, throttle, collect_urls
-from config import CRAWL_LIMIT
+from collections import namedtuple
 
-def run(root):
-    urls = collect_urls(root, limit=CRAWL_LIMIT)
+from crawl import crawl_site, page_analyzer
+
+H1 = namedtuple("H1", "count hidden")
+
+
+@page_analyzer("headings_h1", record=H1)
+def analyze(r, doc):
+    h1s = [h for h in doc.facts.headings if h.level == 1]
+    hidden = False
+    for h in h1s:
+        style = (h.style or "").lower()
+        classes = h.cls.lower()
+        if "display:none" in style or "sr-only" in classes or "visually-hidden" in classes:
+            hidden = True
+            break
+    return H1(len(h1s), hidden)
+
+
+def run(ctx):
+    pages = crawl_site(ctx)
 
     over_h1 = []
     hidden_h1 = []
 
-    for u in urls:
-        try:
-            r = fetch(u)
-            soup = BeautifulSoup(r.text, "lxml")
-            h1s = soup.find_all("h1")
-            if len(h1s) > 1:
-                over_h1.append(u)
-            for h in h1s:
-                style = (h.get("style") or "").lower()
-                classes = " ".join(h.get("class", [])).lower()
-                if "display:none" in style or "sr-only" in classes or "visually-hidden" in classes:
-                    hidden_h1.append(u)
-                    break
-        except:
+    for page in pages:
+        found = page.finding("headings_h1")
+        if found is None:
             continue
-        throttle()
+        if found.count > 1:
+            over_h1.append(page.url)
+        if found.hidden:
+            hidden_h1.append(page.url)
 
     status = "PASS" if not over_h1 and not hidden_h1 else "FAIL"
     return {
         "name": "headings_h1",
         "status": status,
-        "metrics": {"checked_pages": len(urls), "too_many_h1": len(over_h1), "hidden_h1_pages": len(hidden_h1)},
+        "metrics": {"checked_pages": len(pages), "too_many_h1": len(over_h1), "hidden_h1_pages": len(hidden_h1)},
         "samples": {"too_many_h1": over_h1[:10], "hidden_h1_pages": hidden_h1[:10]},
         "fix_hint": "Na każdej stronie powinien być dokładnie jeden widoczny H1."
     }
@@ -1,7 +1,8 @@
 # checks/home_latest_posts.py
 import re
 from urllib.parse import urljoin, urlsplit, urlunparse
-from utils import fetch, get_soup
+from utils import fetch, get_document
+from plan import Resource
 
 # Tekstowe hinty na sekcję „ostatnie wpisy”
 SECTION_HINTS = [
@@ -59,12 +60,17 @@ def _looks_like_post(path: str) -> bool:
     return False
 
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+
+def run(ctx):
+    root = ctx.root
     print(f"[home_latest_posts] Checking homepage: {root}")
 
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        soup = get_document(r).soup
 
         # 1) Sekcje po hintach i linki w nich
         section_links = []
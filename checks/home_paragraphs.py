@@ -1,7 +1,7 @@
 # checks/home_paragraphs.py
 from statistics import mean, median
-from utils import fetch, get_soup
-from config import PARA_SHORT_THRESHOLD, PARA_LONG_THRESHOLD
+from utils import fetch, get_document
+from plan import Resource
 
 def _wc(txt: str) -> int:
     return len((txt or "").split())
@@ -10,14 +10,18 @@ def _sample(txt: str, n=90) -> str:
     txt = (txt or "").replace("\n", " ").strip()
     return (txt[:n] + "…") if len(txt) > n else txt
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def run(ctx):
+    root = ctx.root
+    short_threshold, long_threshold = ctx.config.PARA_SHORT_THRESHOLD, ctx.config.PARA_LONG_THRESHOLD
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        facts = get_document(r).facts
 
         # jeśli jest <main>, licz tylko w nim — w przeciwnym razie globalnie
-        scope = soup.find("main") or soup
-        paragraphs = [p.get_text(" ", strip=True) for p in scope.find_all("p")]
+        paragraphs = [p.text for p in facts.paragraphs if p.in_main or not facts.has_main]
 
         counts = [ _wc(p) for p in paragraphs if p ]
         if not counts:
@@ -47,8 +51,8 @@ def run(root):
               f"avg={avg_words} median={med_words} min={min_words} max={max_words}")
 
         # pomocnicze kubełki długości (do szybkiego wglądu)
-        short_cnt = sum(1 for c in counts if c < PARA_SHORT_THRESHOLD)
-        long_cnt  = sum(1 for c in counts if c >= PARA_LONG_THRESHOLD)
+        short_cnt = sum(1 for c in counts if c < short_threshold)
+        long_cnt  = sum(1 for c in counts if c >= long_threshold)
 
         return {
             "name": "home_paragraphs",
@@ -62,8 +66,8 @@ def run(root):
                 "max_words": max_words,
                 "short_paragraphs_lt_threshold": short_cnt,
                 "long_paragraphs_ge_threshold": long_cnt,
-                "short_threshold": PARA_SHORT_THRESHOLD,
-                "long_threshold": PARA_LONG_THRESHOLD
+                "short_threshold": short_threshold,
+                "long_threshold": long_threshold
             },
             "samples": {
                 "shortest": [f"{cnt}w: {_sample(txt)}" for cnt, txt in pairs_sorted_short],
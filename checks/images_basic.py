@@ -1,24 +1,30 @@
-from utils import fetch, get_soup, list_images, throttle
+import imageprobe
+from utils import fetch, get_document, list_images
+from plan import Resource
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def dynamic_requests(ctx):
+    # HEAD-y obrazków znamy dopiero po sparsowaniu strony — tylko szacunek do planu
+    return ctx.config.MAX_IMG_HEAD
+
+def run(ctx):
+    root = ctx.root
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
-        imgs = list_images(soup, r.url, limit=30)
+        imgs = list_images(get_document(r).facts, r.url, limit=ctx.config.MAX_IMG_HEAD)
         largest = []
         has_webp = False
 
-        for u in imgs:
-            try:
-                h = fetch(u, method="HEAD", allow_redirects=True)
-                ctype = h.headers.get("Content-Type", "").lower()
-                clen = int(h.headers.get("Content-Length", "0") or "0")
-                if "image/webp" in ctype or u.lower().endswith(".webp"):
-                    has_webp = True
-                largest.append({"url": u, "bytes": clen, "content_type": ctype})
-            except:
+        # równolegle, HEAD albo próbka pliku (Range), wyniki wspólne dla całego audytu
+        for u, p in imageprobe.probe_many(imgs).items():
+            if p["error"] and p["status"] is None:
                 continue
-            throttle(0.05)
+            if p["format"] == "webp" or u.lower().endswith(".webp"):
+                has_webp = True
+            largest.append({"url": u, "bytes": p["bytes"], "content_type": p["content_type"],
+                            "format": p["format"], "width": p["width"], "height": p["height"]})
 
         largest = sorted(largest, key=lambda x: x["bytes"] if x["bytes"] else 0, reverse=True)[:5]
         too_big = [i for i in largest if i["bytes"] and i["bytes"] > 500_000]  # >500 KB
@@ -0,0 +1,145 @@
+# checks/images_sitewide.py
+"""
+Obrazki w całym serwisie: inwentarz z crawla (obrazek -> strony, alty, zadeklarowane wymiary,
+loading) i ranking ciężkich obrazków nie w WebP/AVIF wg wpływu: rozmiar × liczba stron.
+
+Strony czyta analizator crawla (bez dodatkowych pobrań), a każdy unikalny obrazek badamy raz
+(imageprobe: HEAD / próbka pliku) — do IMG_SITEWIDE_MAX_PROBES najczęściej używanych.
+"""
+import sys
+from collections import namedtuple
+from urllib.parse import urljoin
+
+import imageprobe
+from crawl import crawl_site, page_analyzer
+
+TOO_BIG_BYTES = 500_000              # jak images_weight_webp
+MODERN_FORMATS = ("webp", "avif")
+VECTOR_FORMATS = ("svg",)
+NEW_IMAGES_PER_PAGE = 2              # szacunek do planu: logo, ikony itp. są wspólne dla stron
+
+# obrazki strony jako równoległe krotki (zinternowane napisy — logo itp. powtarzają się na wszystkich stronach)
+PageImages = namedtuple("PageImages", "urls alts widths heights loading")
+
+
+def _intern(s):
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+@page_analyzer("images_sitewide", record=PageImages)
+def analyze(r, doc):
+    rows = {}
+    for img in doc.facts.images:
+        src = (img.src or img.data_src or img.data_lazy or "").strip()
+        if not src or src.lower().startswith("data:"):
+            continue
+        url = urljoin(r.url, src)
+        if url not in rows:
+            rows[url] = (_intern(url), _intern(img.alt), _intern(img.width), _intern(img.height), _intern(img.loading))
+    if not rows:
+        return None
+    return PageImages(*(tuple(col) for col in zip(*rows.values())))
+
+
+def dynamic_requests(ctx):
+    # badania obrazków znamy dopiero po crawlu — tylko szacunek do planu
+    cfg = ctx.config
+    guess = cfg.CRAWL_LIMIT * NEW_IMAGES_PER_PAGE
+    return min(guess, cfg.IMG_SITEWIDE_MAX_PROBES) if cfg.IMG_SITEWIDE_MAX_PROBES else guess
+
+
+def _inventory(pages):
+    """URL obrazka -> strony, warianty altów, zadeklarowane wymiary, wartości loading."""
+    inventory = {}
+    for page in pages:
+        found = page.finding("images_sitewide")
+        if not found:
+            continue
+        for url, alt, width, height, loading in zip(*found):
+            item = inventory.get(url)
+            if item is None:
+                item = inventory[url] = {"pages": [], "alts": set(), "declared": set(), "loading": set()}
+            item["pages"].append(page.url)
+            item["alts"].add(alt)
+            item["declared"].add((width, height))
+            item["loading"].add(loading or "")
+    return inventory
+
+
+def _entry(url, item, probe):
+    return {
+        "url": url,
+        "format": probe.get("format"),
+        "bytes": probe.get("bytes"),
+        "pages": len(item["pages"]),
+        "impact_bytes": (probe.get("bytes") or 0) * len(item["pages"]),
+        "width": probe.get("width"),
+        "height": probe.get("height"),
+        "declared": sorted(f"{w or '?'}x{h or '?'}" for w, h in item["declared"]),
+        "alts": sorted("<brak>" if a is None else a[:80] for a in item["alts"])[:5],
+        "loading": sorted(item["loading"]),
+        "sample_pages": item["pages"][:3],
+    }
+
+
+def run(ctx):
+    try:
+        pages = crawl_site(ctx)
+        inventory = _inventory(pages)
+        if not inventory:
+            return {
+                "name": "images_sitewide",
+                "status": "SKIP",
+                "metrics": {"checked_pages": len(pages), "unique_images": 0},
+                "samples": {},
+                "fix_hint": "Crawl nie znalazł obrazków <img> na stronach serwisu."
+            }
+
+        # najczęściej używane najpierw — przy limicie badań to one ważą najwięcej
+        ranked = sorted(inventory, key=lambda u: len(inventory[u]["pages"]), reverse=True)
+        limit = ctx.config.IMG_SITEWIDE_MAX_PROBES
+        probes = imageprobe.probe_many(ranked[:limit] if limit else ranked)
+
+        entries = [_entry(u, inventory[u], probes.get(u, {})) for u in ranked]
+        raster = [e for e in entries if e["format"] and e["format"] not in VECTOR_FORMATS]
+        legacy = [e for e in raster if e["format"] not in MODERN_FORMATS]
+        legacy_impact = sorted(legacy, key=lambda e: e["impact_bytes"], reverse=True)
+        too_big = sorted((e for e in raster if (e["bytes"] or 0) > TOO_BIG_BYTES),
+                         key=lambda e: e["bytes"], reverse=True)
+        no_alt = [e for e in entries if "<brak>" in e["alts"]]
+        no_dims = [e for e in entries if "?x?" in e["declared"]]
+        errors = [{"url": u, "error": p["error"]} for u, p in probes.items() if p.get("error")]
+
+        status = "FAIL" if too_big else "WARN" if legacy else "PASS"
+        return {
+            "name": "images_sitewide",
+            "status": status,
+            "metrics": {
+                "checked_pages": len(pages),
+                "pages_with_images": sum(1 for p in pages if p.finding("images_sitewide")),
+                "unique_images": len(inventory),
+                "image_uses": sum(len(i["pages"]) for i in inventory.values()),
+                "probed": len(probes),
+                "probe_errors": len(errors),
+                "modern_format": len(raster) - len(legacy),
+                "legacy_format": len(legacy),
+                "legacy_impact_bytes": sum(e["impact_bytes"] for e in legacy),
+                "too_big": len(too_big),
+                "missing_alt": len(no_alt),
+                "missing_dimensions": len(no_dims),
+            },
+            "samples": {
+                "legacy_by_impact": legacy_impact[:10],
+                "heaviest": too_big[:10],
+                "most_used": entries[:10],
+                "missing_alt": [{"url": e["url"], "pages": e["pages"]} for e in no_alt[:10]],
+                "missing_dimensions": [{"url": e["url"], "pages": e["pages"]} for e in no_dims[:10]],
+                "probe_errors": errors[:10],
+            },
+            "fix_hint": (
+                "Zacznij od obrazków z góry legacy_by_impact (rozmiar × liczba stron): konwertuj do WebP/AVIF "
+                "i zmniejsz te >500KB. Dodaj alt oraz width/height (CLS) obrazkom używanym w wielu miejscach."
+            )
+        }
+    except Exception as e:
+        return {"name": "images_sitewide", "status": "ERROR", "error": str(e)}
@@ -1,7 +1,8 @@
 # checks/lang_dir_in_url.py
 import re
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
+from utils import fetch, get_document
+from plan import Resource
 
 # najczęstsze kody językowe (ISO 639-1)
 LANG_CODES = [
@@ -11,13 +12,17 @@ LANG_CODES = [
 
 _lang_re = re.compile(r"/(" + "|".join(LANG_CODES) + r")(/|$)", re.I)
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def run(ctx):
+    root = ctx.root
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        facts = get_document(r).facts
 
         # zbieramy wszystkie linki wewnętrzne
-        links = [a.get("href") for a in soup.find_all("a", href=True)]
+        links = [a.href for a in facts.links]
         links = [urljoin(root, href) for href in links]
         flagged = []
         for href in links:
@@ -1,33 +1,41 @@
-from utils import fetch, extract_basic_meta, throttle
-from config import CRAWL_LIMIT
-from utils import find_sitemap_urls, iter_urls_from_sitemap, collect_urls
+from collections import namedtuple
 
-def run(root):
-    urls = collect_urls(root, limit=CRAWL_LIMIT)
-    print(f"[meta_tags] URLs to scan: {len(urls)} (limit={CRAWL_LIMIT})")
+from crawl import crawl_site, page_analyzer, text_hash
+
+# hashe (crawl.text_hash) zamiast tekstów — None = brak; długości do logu
+MetaTags = namedtuple("MetaTags", "title_hash title_len desc_hash desc_len")
+
+
+@page_analyzer("meta_tags", head_only=True, record=MetaTags)
+def analyze(r, doc):
+    _, title, desc, _ = doc.basic_meta()
+    return MetaTags(text_hash(title), len(title), text_hash(desc), len(desc))
+
+
+def run(ctx):
+    pages = crawl_site(ctx)
+    print(f"[meta_tags] URLs to scan: {len(pages)} (limit={ctx.config.CRAWL_LIMIT})")
 
     missing_title = []
     missing_desc = []
 
-    for u in urls:
-        try:
-            r = fetch(u)
-            soup, title, desc, _ = extract_basic_meta(r.text)
-            print(f"Checked {u}: title='{title}' desc='{desc}\n'")
-            if not title:
-                missing_title.append(u)
-            if not desc:
-                missing_desc.append(u)
-        except Exception:
+    for page in pages:
+        found = page.finding("meta_tags")
+        if found is None:
             continue
-        throttle()
+        u = page.url
+        print(f"Checked {u}: title={found.title_len} chars, desc={found.desc_len} chars")
+        if found.title_hash is None:
+            missing_title.append(u)
+        if found.desc_hash is None:
+            missing_desc.append(u)
 
     status = "PASS" if not missing_title and not missing_desc else "FAIL"
     return {
         "name": "meta_tags_coverage",
         "status": status,
         "metrics": {
-            "pages_scanned": len(urls),
+            "pages_scanned": len(pages),
             "missing_title": len(missing_title),
             "missing_description": len(missing_desc)
         },
@@ -1,7 +1,7 @@
 # checks/nofollow_links.py
 import re
-from utils import fetch, get_soup
-from config import NOFOLLOW_KEYWORDS, NOFOLLOW_SOCIAL_KEYWORDS
+from utils import fetch, get_document
+from plan import Resource
 
 
 def _norm(txt: str) -> str:
@@ -14,23 +14,16 @@ def _norm(txt: str) -> str:
     return t
 
 
-def _rel_tokens(el) -> set:
-    rel = el.get("rel")
-    if isinstance(rel, list):
-        toks = rel
-    elif isinstance(rel, str):
-        toks = re.split(r"\s+", rel)
-    else:
-        toks = []
-    return {t.lower().strip() for t in toks if t}
+def _rel_tokens(link) -> set:
+    return {t.lower().strip() for t in (link.rel or ()) if t}
 
 
-def _link_text_bundle(a) -> str:
+def _link_text_bundle(link) -> str:
     parts = [
-        a.get_text(" ", strip=True),
-        a.get("title", ""),
-        a.get("aria-label", ""),
-        a.get("href", ""),
+        link.text,
+        link.title or "",
+        link.aria_label or "",
+        link.href,
     ]
     return _norm(" ".join(p for p in parts if p))
 
@@ -43,23 +36,29 @@ def _matches_keywords(bundle: str, keywords: list[str]) -> bool:
     return False
 
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+
+def run(ctx):
+    root = ctx.root
+    keywords, social_keywords = ctx.config.NOFOLLOW_KEYWORDS, ctx.config.NOFOLLOW_SOCIAL_KEYWORDS
     candidates, compliant, noncomp, errors = [], [], [], []
 
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
+        facts = get_document(r).facts
 
-        for a in soup.find_all("a", href=True):
+        for a in facts.links:
             bundle = _link_text_bundle(a)
             if not bundle:
                 continue
 
             # sprawdzamy dwie listy keywordów
-            if _matches_keywords(bundle, NOFOLLOW_KEYWORDS) or _matches_keywords(bundle, NOFOLLOW_SOCIAL_KEYWORDS):
+            if _matches_keywords(bundle, keywords) or _matches_keywords(bundle, social_keywords):
                 info = {
-                    "href": a.get("href"),
-                    "text": a.get_text(" ", strip=True)[:120],
+                    "href": a.href,
+                    "text": a.text[:120],
                     "rel": " ".join(sorted(list(_rel_tokens(a)))) or "",
                 }
                 candidates.append(info)
@@ -96,6 +95,6 @@ def run(root):
         },
         "fix_hint": (
             "Dodaj `rel=\"nofollow\"` dla linków zawierających słowa: "
-            + ", ".join(NOFOLLOW_KEYWORDS + NOFOLLOW_SOCIAL_KEYWORDS)
+            + ", ".join(keywords + social_keywords)
         ),
     }
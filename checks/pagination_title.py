@@ -1,7 +1,7 @@
 # checks/pagination_title.py
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import SHOP_PAGE, BLOG_PAGE
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_abs(u: str) -> bool:
     try:
@@ -10,18 +10,27 @@ def _is_abs(u: str) -> bool:
     except Exception:
         return False
 
-def _target_url(root):
+def _target_url(ctx):
     """Zwróć pełny URL do sprawdzenia paginacji: SHOP_PAGE > BLOG_PAGE, inaczej SKIP."""
-    if SHOP_PAGE:
-        base = SHOP_PAGE if _is_abs(SHOP_PAGE) else urljoin(root, SHOP_PAGE)
+    root, shop_page, blog_page = ctx.root, ctx.config.SHOP_PAGE, ctx.config.BLOG_PAGE
+    if shop_page:
+        base = shop_page if _is_abs(shop_page) else urljoin(root, shop_page)
         return base, "shop"
-    if BLOG_PAGE:
-        base = BLOG_PAGE if _is_abs(BLOG_PAGE) else urljoin(root, BLOG_PAGE)
+    if blog_page:
+        base = blog_page if _is_abs(blog_page) else urljoin(root, blog_page)
         return base, "blog"
     return None, None
 
-def run(root):
-    url, page_type = _target_url(root)
+def _paginated_url(url):
+    # spróbujemy wymusić stronę 2 – zwykle /page/2/ działa na WP/WooCommerce
+    return url.rstrip("/") + "/page/2/"
+
+def resources(ctx):
+    url, _ = _target_url(ctx)
+    return [Resource(_paginated_url(url), head_only=True)] if url else []
+
+def run(ctx):
+    url, page_type = _target_url(ctx)
     if not url:
         return {
             "name": "pagination_title",
@@ -31,13 +40,12 @@ def run(root):
             "fix_hint": "Ustaw SHOP_PAGE lub BLOG_PAGE w config.py, aby sprawdzić tytuły stron paginacyjnych."
         }
 
-    # spróbujemy wymusić stronę 2 – zwykle /page/2/ działa na WP/WooCommerce
-    paginated_url = url.rstrip("/") + "/page/2/"
+    paginated_url = _paginated_url(url)
     print(f"[pagination_title] Checking {page_type}: {paginated_url}")
 
     try:
-        r = fetch(paginated_url)
-        soup = get_soup(r.text)
+        r = fetch(paginated_url, head_only=True)  # wystarczy <title>
+        soup = get_document(r).soup
 
         title = (soup.title.string or "").strip() if soup.title else ""
 
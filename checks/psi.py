@@ -1,119 +1,5 @@
 # checks/psi.py
-import json
-import time
-from urllib.parse import urlencode
-import requests
-from config import PSI_API_KEY, PSI_STRATEGIES
-
-PSI_ENDPOINT = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
-
-# Ustawienia sieci dla PSI (ciężkie zapytania -> dajemy większy timeout i retry)
-_PSI_TIMEOUT = 60          # sekundy
-_PSI_RETRIES = 3
-_PSI_BACKOFF = 2.0         # mnożnik czasu czekania między próbami (exponential backoff)
-
-def _http_get(url: str, params: dict):
-    """GET z retry/backoff specjalnie pod PSI."""
-    attempt = 0
-    while True:
-        attempt += 1
-        try:
-            r = requests.get(url, params=params, timeout=_PSI_TIMEOUT)
-            # retry przy 429 i 5xx
-            if r.status_code in (429, 500, 502, 503, 504):
-                if attempt < _PSI_RETRIES:
-                    wait = (_PSI_BACKOFF ** (attempt - 1))
-                    print(f"[psi] HTTP {r.status_code} -> retry {attempt}/{_PSI_RETRIES} za {wait:.1f}s")
-                    time.sleep(wait)
-                    continue
-            return r
-        except requests.exceptions.ReadTimeout as e:
-            if attempt < _PSI_RETRIES:
-                wait = (_PSI_BACKOFF ** (attempt - 1))
-                print(f"[psi] ReadTimeout -> retry {attempt}/{_PSI_RETRIES} za {wait:.1f}s")
-                time.sleep(wait)
-                continue
-            raise e
-
-def _get(url: str, strategy: str):
-    params = {"url": url, "strategy": strategy}
-    if PSI_API_KEY:
-        params["key"] = PSI_API_KEY
-    r = _http_get(PSI_ENDPOINT, params)
-    if r.status_code != 200:
-        # pokaż kawałek treści dla debugowania
-        snippet = r.text[:200] if isinstance(r.text, str) else str(r.content)[:200]
-        raise RuntimeError(f"PSI HTTP {r.status_code}: {snippet}")
-    try:
-        return r.json()
-    except json.JSONDecodeError:
-        raise RuntimeError("PSI: nieprawidłowy JSON w odpowiedzi")
-
-def _get_safe(dct, path, default=None):
-    cur = dct
-    for k in path:
-        if isinstance(cur, dict) and k in cur:
-            cur = cur[k]
-        else:
-            return default
-    return cur
-
-def _extract_scores(resp):
-    # performance score (0..1)
-    perf = _get_safe(resp, ["lighthouseResult", "categories", "performance", "score"], None)
-    # inne kategorie (opcjonalnie)
-    acc  = _get_safe(resp, ["lighthouseResult", "categories", "accessibility", "score"], None)
-    bp   = _get_safe(resp, ["lighthouseResult", "categories", "best-practices", "score"], None)
-    seo  = _get_safe(resp, ["lighthouseResult", "categories", "seo", "score"], None)
-
-    # CWV field data
-    le  = resp.get("loadingExperience") or {}
-    ole = resp.get("originLoadingExperience") or {}
-
-    def _metric(src, key_opts):
-        for key in key_opts:
-            m = _get_safe(src, ["metrics", key], {})
-            if m:
-                return {
-                    "category": m.get("category"),  # GOOD / NEEDS_IMPROVEMENT / POOR
-                    "p75": m.get("percentile"),
-                    "distributions": m.get("distributions", []),
-                }
-        return None
-
-    lcp = _metric(le, ["LARGEST_CONTENTFUL_PAINT_MS"]) or _metric(ole, ["LARGEST_CONTENTFUL_PAINT_MS"])
-    cls = _metric(le, ["CUMULATIVE_LAYOUT_SHIFT_SCORE"]) or _metric(ole, ["CUMULATIVE_LAYOUT_SHIFT_SCORE"])
-    inp = _metric(le, ["INTERACTION_TO_NEXT_PAINT", "EXPERIMENTAL_INTERACTION_TO_NEXT_PAINT"]) or \
-          _metric(ole, ["INTERACTION_TO_NEXT_PAINT", "EXPERIMENTAL_INTERACTION_TO_NEXT_PAINT"])
-
-    # Lighthouse lab metrics (opcjonalnie)
-    audits = _get_safe(resp, ["lighthouseResult", "audits"], {})
-    def _val(audit_id):
-        a = audits.get(audit_id, {})
-        return a.get("numericValue")
-    lab = {
-        "lcp_ms": _val("largest-contentful-paint"),
-        "inp_ms": _val("interactive") if _val("interactive") is not None else None,  # to nie INP (field)
-        "tbt_ms": _val("total-blocking-time"),
-        "cls": _val("cumulative-layout-shift"),
-        "si_ms": _val("speed-index"),
-        "fcp_ms": _val("first-contentful-paint"),
-    }
-
-    return {
-        "scores": {
-            "performance": perf,
-            "accessibility": acc,
-            "best_practices": bp,
-            "seo": seo,
-        },
-        "cwv_field": {
-            "lcp": lcp,
-            "inp": inp,
-            "cls": cls,
-        },
-        "lab": lab,
-    }
+import pagespeed
 
 def _strategy_status(s):
     """
@@ -139,31 +25,33 @@ def _strategy_status(s):
         return "FAIL"
     return "WARN"
 
-def run(root):
-    strategies = PSI_STRATEGIES or ["mobile", "desktop"]
-    results = {}
+def run(ctx):
+    root = ctx.root
+    strategies = ctx.config.PSI_STRATEGIES or ["mobile", "desktop"]
+    pages = {}
     errors = {}
 
     print(f"[psi] Checking PSI for: {root} (strategies: {', '.join(strategies)})")
 
-    for strat in strategies:
+    # zapytania poszły w tle na starcie audytu (etap psi_start) — tu tylko zbieramy wyniki
+    for (url, strat), fut in pagespeed.start(ctx).items():
         try:
-            resp = _get(root, strat)
-            parsed = _extract_scores(resp)
+            parsed = fut.result()
             status = _strategy_status(parsed)
-            results[strat] = {**parsed, "status": status}
-            print(f"[psi] {strat}: perf={parsed['scores']['performance']} status={status}")
+            pages.setdefault(url, {})[strat] = {**parsed, "status": status}
+            print(f"[psi] {url} {strat}: perf={parsed['scores']['performance']} status={status}")
         except Exception as e:
-            errors[strat] = str(e)
-            print(f"[psi] {strat}: ERROR {e}")
+            errors.setdefault(url, {})[strat] = str(e)
+            print(f"[psi] {url} {strat}: ERROR {e}")
+    results = pages.get(root, {})
 
-    # zagregowany status:
+    # zagregowany status (wszystkie strony):
     # - jeśli chociaż jedna strategia się uda -> najgorszy status z udanych
     # - jeśli wszystkie padły -> ERROR
     order = {"PASS": 0, "WARN": 1, "FAIL": 2}
-    if results:
-        worst = max((r["status"] for r in results.values()), key=lambda st: order.get(st, 1))
-        overall = worst
+    statuses = [r["status"] for per_url in pages.values() for r in per_url.values()]
+    if statuses:
+        overall = max(statuses, key=lambda st: order.get(st, 1))
     else:
         overall = "ERROR"
 
@@ -172,13 +60,22 @@ def run(root):
         "status": overall,
         "metrics": {
             "strategies_checked": list(results.keys()) if results else [],
-            "errors": errors,
+            "errors": errors.get(root, {}),
             "mobile_performance": results.get("mobile", {}).get("scores", {}).get("performance"),
             "desktop_performance": results.get("desktop", {}).get("scores", {}).get("performance"),
+            "urls_checked": list(pages),
+            "performance": {
+                url: {strat: r["scores"]["performance"] for strat, r in per_url.items()}
+                for url, per_url in pages.items()
+            },
+            "other_errors": {url: errs for url, errs in errors.items() if url != root},
+            "cache_hits": ctx.metrics.get("psi.cache_hits"),
+            "quota_left": pagespeed.remaining_quota(ctx.config),
         },
         "samples": {
             "mobile": results.get("mobile"),
             "desktop": results.get("desktop"),
+            "pages": {url: per_url for url, per_url in pages.items() if url != root},
         },
         "fix_hint": (
             "Skup się na CWV: LCP (≤2.5s), INP (≤200ms), CLS (≤0.1). "
@@ -1,9 +1,17 @@
 from urllib.parse import urljoin
 from utils import fetch
+from plan import Resource
 
-def run(root):
+def _candidates(root):
     # proste „główne” URL-e do sprawdzenia
-    candidates = [f"https://{root}", f"http://{root}", f"https://www.{root}"]
+    return [f"https://{root}", f"http://{root}", f"https://www.{root}"]
+
+def resources(ctx):
+    return [Resource(u, dom=False) for u in _candidates(ctx.target)]
+
+def run(ctx):
+    root = ctx.target  # domena tak jak ją podano (bez schematu)
+    candidates = _candidates(root)
 
     chains = []
     errors = 0
@@ -1,7 +1,7 @@
 # checks/related_products.py
 from urllib.parse import urljoin, urlsplit, urlunparse
-from utils import fetch, get_soup
-from config import PRODUCT_URL
+from utils import fetch, get_document
+from plan import Resource
 
 # typowe selektory linków produktowych (WooCommerce i ogólne)
 PRODUCT_LINK_SELECTORS = [
@@ -41,13 +41,18 @@ def _parent_dir(path: str) -> str:
         return "/"
     return "/" + "/".join(parts[:-1]) + "/"
 
-def _target_url(root):
-    if not PRODUCT_URL:
+def _target_url(ctx):
+    product_url = ctx.config.PRODUCT_URL
+    if not product_url:
         return None
-    return PRODUCT_URL if _is_abs(PRODUCT_URL) else urljoin(root, PRODUCT_URL)
+    return product_url if _is_abs(product_url) else urljoin(ctx.root, product_url)
 
-def run(root):
-    url = _target_url(root)
+def resources(ctx):
+    url = _target_url(ctx)
+    return [Resource(url)] if url else []
+
+def run(ctx):
+    url = _target_url(ctx)
     if not url:
         return {
             "name": "related_products",
@@ -61,7 +66,7 @@ def run(root):
 
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
+        soup = get_document(r).soup
 
         base = _clean_url(url)
         base_path = urlsplit(base).path or "/"
@@ -1,8 +1,7 @@
 # checks/schema_pages.py
-import json
 from urllib.parse import urljoin, urlsplit
-from utils import fetch, get_soup
-from config import SCHEMA_EXTRA_PATHS
+from utils import fetch, get_document
+from plan import Resource
 
 def _is_absolute(u: str) -> bool:
     try:
@@ -15,32 +14,21 @@ def _page_schema_types(url: str):
     found = []
     try:
         r = fetch(url)
-        soup = get_soup(r.text)
+        doc = get_document(r)
+        facts = doc.facts
 
-        # JSON-LD
-        for s in soup.select('script[type="application/ld+json"]'):
-            try:
-                data = json.loads(s.string)
-                items = data if isinstance(data, list) else [data]
-                for i in items:
-                    if isinstance(i, dict):
-                        t = i.get("@type")
-                        if isinstance(t, list):
-                            found.extend([str(x) for x in t])
-                        elif t:
-                            found.append(str(t))
-            except Exception:
-                continue
+        # JSON-LD (węzły najwyższego poziomu, także z @graph)
+        found.extend(doc.structured_data.root_types())
 
         # Microdata
-        for tag in soup.find_all(attrs={"itemscope": True}):
-            t = tag.get("itemtype")
-            if t:
-                found.append(str(t))
+        for item in facts.items:
+            if item.kind == "microdata" and item.type:
+                found.append(str(item.type))
 
         # RDFa
-        for tag in soup.find_all(attrs={"typeof": True}):
-            found.append(str(tag["typeof"]))
+        for item in facts.items:
+            if item.kind == "rdfa":
+                found.append(str(item.type))
 
     except Exception as e:
         return {"error": str(e), "types": []}
@@ -49,13 +37,22 @@ def _page_schema_types(url: str):
     types_unique = sorted(set(found))
     return {"error": None, "types": types_unique}
 
-def run(root):
+def _targets(ctx):
     # Zbuduj listę stron do sprawdzenia: home + dodatkowe z configa
+    root = ctx.root
     targets = [root]
-    for p in SCHEMA_EXTRA_PATHS:
+    for p in ctx.config.SCHEMA_EXTRA_PATHS:
         full = p if _is_absolute(p) else urljoin(root, p)
         if full not in targets:
             targets.append(full)
+    return targets
+
+def resources(ctx):
+    return [Resource(u) for u in _targets(ctx)]
+
+def run(ctx):
+    root = ctx.root
+    targets = _targets(ctx)
 
     results_per_page = {}
     pages_with_schema = []
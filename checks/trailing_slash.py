@@ -1,10 +1,18 @@
 from utils import fetch
 from urllib.parse import urljoin
+from plan import Resource
 
-def run(root):
-
+def _targets(root):
     root_no = urljoin(root,"/kontakt")
-    root_slash = root_no + "/"
+    return root_no, root_no + "/"
+
+def resources(ctx):
+    return [Resource(u, dom=False) for u in _targets(ctx.root)]
+
+def run(ctx):
+    root = ctx.root
+
+    root_no, root_slash = _targets(root)
     try:
         r1 = fetch(root_no, allow_redirects=True)
         r2 = fetch(root_slash, allow_redirects=True)
@@ -1,20 +1,23 @@
 # checks/webp.py
-from utils import fetch, get_soup
+from utils import fetch, get_document
+from plan import Resource
 
-def run(root):
+def resources(ctx):
+    return [Resource(ctx.root)]
+
+def run(ctx):
     """Sprawdzenie, czy na stronie głównej są obrazy w formacie WebP/AVIF."""
+    root = ctx.root
     try:
         r = fetch(root)
-        soup = get_soup(r.text)
-
-        imgs = soup.find_all("img")
+        imgs = get_document(r).facts.images
         total = len(imgs)
 
         webp_imgs = []
         non_webp_imgs = []
 
         for img in imgs:
-            src = img.get("src") or img.get("data-src") or img.get("data-lazy") or ""
+            src = img.src or img.data_src or img.data_lazy or ""
             s = src.lower()
             if s.endswith(".webp") or s.endswith(".avif"):
                 webp_imgs.append(src[:140])
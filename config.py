@@ -9,9 +9,79 @@ DEFAULT_HEADERS = {
 }
 REQUEST_TIMEOUT = 20
 
+# --- Pula połączeń HTTP (keep-alive) ---
+HTTP_POOL_HOSTS = 10   # ile hostów trzymamy jednocześnie w puli
+HTTP_POOL_SIZE  = 10   # max otwartych połączeń keep-alive na jeden host
+
+# --- Cache odpowiedzi w pamięci (na czas jednego audytu) ---
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024   # limit łącznego rozmiaru treści (LRU)
+HTML_PARSER = "lxml"   # parser drzew HTML: "lxml" (szybki, natywny) albo "bs4" (BeautifulSoup — kompatybilność); runner: --parser
+DOC_CACHE_SIZE = 32    # ile sparsowanych dokumentów (drzew HTML) trzymamy naraz (LRU)
+
+# --- Cache HTTP na dysku (między audytami, rewalidacja ETag/Last-Modified) ---
+HTTP_CACHE_ENABLED = True              # runner: --no-cache wyłącza
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# --- Równoległe uruchamianie checków ---
+CHECK_WORKERS = 8      # ile checków działa jednocześnie (1 = po kolei jak dawniej)
+BATCH_PROCESSES = 4    # batch.py: ile domen audytujemy jednocześnie (procesy)
+
+# --- Daemon (daemon.py): ciepły proces + kolejka zadań w SQLite + lokalne API HTTP/JSON ---
+DAEMON_DB = "reports/jobs.sqlite3"
+DAEMON_HOST = "127.0.0.1"    # API tylko lokalnie
+DAEMON_PORT = 8731
+DAEMON_AUDITS = 2            # ile audytów daemon prowadzi naraz (wątki, wspólne pule połączeń)
+DAEMON_MAX_QUEUED = 100      # tyle zadań może czekać; kolejne dostają 429 (back-pressure)
+
+# --- Limity per host (ratelimit.py): token bucket, Crawl-delay, Retry-After, adaptacyjna równoległość ---
+RATE_PER_HOST = 10.0          # requestów na sekundę do jednego hosta
+RATE_BURST = 5                # ile requestów może pójść „na raz” po przerwie
+RATE_START_CONCURRENCY = 2    # startowa liczba równoległych requestów na host
+RATE_MAX_CONCURRENCY = 8      # górny limit (rośnie tylko przy szybkich, poprawnych odpowiedziach)
+RATE_LATENCY_FACTOR = 3.0     # czas odpowiedzi > factor × najlepszy => zmniejszamy równoległość
+RATE_RETRIES = 2              # ile razy ponawiamy po 429/503
+RATE_MAX_RETRY_AFTER = 60     # dłuższego Retry-After nie czekamy (zwracamy odpowiedź)
+RATE_MAX_CRAWL_DELAY = 10     # górna granica Crawl-delay z robots.txt (s)
+
+# --- Pobieranie tylko <head> (checki/analizatory z head_only) ---
+HEAD_ONLY_CHUNK = 16 * 1024         # czytamy strumieniowo po tyle bajtów
+HEAD_ONLY_MAX_BYTES = 256 * 1024    # brak </head> do tego miejsca = zepsuty head -> pełne pobranie
+
+# --- Plan pobrań (manifest zasobów checków) ---
+PREFETCH_WORKERS = 8         # ile zasobów z planu pobieramy równolegle przed/obok checków
+PLAN_PAGE_BYTES = 150_000    # szacowany rozmiar strony HTML (do --dry-run)
+PLAN_HEAD_BYTES = 1_000      # szacowany rozmiar odpowiedzi HEAD
+PLAN_HEAD_ONLY_BYTES = 20_000   # szacowany rozmiar samego <head> (zasoby head_only)
+
 # --- Crawling ---
 CRAWL_LIMIT = 50       # max liczba URL-i do sprawdzenia z sitemap
+CRAWL_BACKEND = "sync"     # "sync" albo "async" (runner: --crawl-backend)
+CRAWL_INCREMENTAL = False  # pomijaj strony bez zmian, indeks w reports/<domena>/index.json (runner: --incremental)
+CRAWL_CONCURRENCY = 16     # async: ile stron pobieramy naraz (i tak w limitach ratelimit per host)
+CRAWL_PAGE_TIMEOUT = 60    # async: max czas na jedną stronę od wysłania requestu (bez czekania w limiterze), s
+CRAWL_TIMEOUT = 900        # async: max czas całego crawla, s — niepobrane strony dostają błąd
+CRAWL_MODE = "sitemap"     # "sitemap" (collect_urls) albo "links" — BFS po linkach wewnętrznych (runner: --crawl-mode)
+# --- tryb links ---
+CRAWL_MAX_DEPTH = 10       # max liczba kliknięć od strony głównej
+CRAWL_EXTRA_HOSTS = []     # inne hosty traktowane jak własne (np. ["www.example.com"])
+CRAWL_INCLUDE_PATHS = []   # tylko ścieżki z tymi prefiksami (pusta lista = wszystkie), np. ["/blog/"]
+CRAWL_EXCLUDE_PATHS = ["/wp-admin/", "/wp-json/", "/feed/", "/koszyk/", "/cart/", "/zamowienie/",
+                       "/checkout/", "/moje-konto/", "/my-account/"]
+CRAWL_SKIP_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".svg", ".ico", ".pdf", ".zip",
+                         ".css", ".js", ".xml", ".json", ".mp4", ".mp3", ".doc", ".docx", ".xls", ".xlsx"]
+CRAWL_STRIP_PARAMS = ["utm_*", "fbclid", "gclid", "msclkid", "_ga", "ref", "replytocom", "add-to-cart"]  # usuwane z query
+CRAWL_RESPECT_ROBOTS = True     # nie wchodzimy w ścieżki z Disallow w robots.txt
+CRAWL_SEEN_CAPACITY = 1_000_000  # filtr Blooma widzianych URL-i: na tyle adresów (~1.8 MB przy 0.1%)
+CRAWL_SEEN_ERROR = 0.001         # odsetek fałszywych „już widziany” (strona pominięta)
+CRAWL_FRONTIER_MAX = 200_000     # max URL-i czekających w kolejce (nadmiar odrzucamy)
 MAX_IMG_HEAD = 30      # ile obrazków badamy per strona (HEAD)
+IMG_PROBE_WORKERS = 8      # ile obrazków badamy naraz (i tak w limitach ratelimit per host)
+IMG_SNIFF_BYTES = 16_384   # gdy HEAD nie wystarcza: tyle bajtów początku pliku (Range GET) na format i wymiary
+IMG_SITEWIDE_MAX_PROBES = 500  # images_sitewide: ile unikalnych obrazków z crawla badamy (najczęściej używane; 0 = wszystkie)
+SITEMAP_WORKERS = 4        # ile sitemap z indeksu pobieramy/parsujemy równolegle
+SITEMAP_QUEUE_SIZE = 1000  # bufor wpisów na jedną sitemapę (ogranicza pamięć)
+SITEMAP_MAX_DEPTH = 3      # max zagnieżdżenie indeksów sitemap
 
 # --- Statystyki akapitów na stronie głównej ---
 PARA_SHORT_THRESHOLD = 20    # próg: bardzo krótki akapit
@@ -64,11 +134,23 @@ ALT_EXCLUDE_SELECTORS = [
 ALT_INCLUDE_SVG = True
 
 
+# --- Google Sheets (gsheet_sync) ---
+SHEET_ID = os.getenv("SHEET_ID")
+WORKSHEET_GID = os.getenv("WORKSHEET_GID")
+
+
 # --- Check: PageSpeed Insights ---
 # Opcjonalny klucz (bez klucza też działa, ale z mniejszym limitem zapytań)
 PSI_API_KEY = os.getenv("PSI_API_KEY")
 # Jakie strategie sprawdzać (mobile/desktop)
 PSI_STRATEGIES = ["mobile", "desktop"]
+PSI_ENDPOINT = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"   # do testów: lokalny serwer udający API
+PSI_SAMPLE_PAGES = 2        # ile stron z sitemapy dołożyć (oprócz głównej, BLOG_POST i PRODUCT_URL)
+PSI_CONCURRENCY = 4         # ile zapytań PSI naraz (na proces)
+PSI_RPM = 60                # budżet zapytań na minutę (wspólny dla procesów z tym samym PSI_CACHE_DIR; API z kluczem: 240/min)
+PSI_DAILY_QUOTA = 25_000    # budżet zapytań na dzień (0 = bez limitu), licznik w PSI_CACHE_DIR/quota.json
+PSI_CACHE_TTL = 24 * 3600   # ile sekund trzymamy sparsowane wyniki (0 = bez cache; runner --no-cache: nie czytamy)
+PSI_CACHE_DIR = ".psi_cache"
 
 
 # --- Dodatkowe ścieżki / sitemapy ---
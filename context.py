@@ -0,0 +1,157 @@
+# context.py
+"""
+AuditContext — stan jednego audytu: ustawienia (config.py + nadpisania per domena), cache
+odpowiedzi i sparsowanych dokumentów, crawl i liczniki. Checki dostają go w run(ctx)
+i resources(ctx); kod pomocniczy (fetch, get_document, metrics, crawl_site) bierze bieżący
+kontekst z current() — to ContextVar, więc kilka audytów może działać naraz w jednym
+procesie (wątki, zadania asyncio), każdy z własnym configiem i cache.
+
+Wspólne dla całego procesu zostają: sesja HTTP (pule keep-alive), limity per host
+(ratelimit), cache HTTP na dysku i klient Google Sheets.
+
+Nowe wątki nie dziedziczą ContextVar — zadania dla pul wątków owijamy w wrap(fn).
+"""
+import contextvars
+import importlib.util
+import os
+import threading
+import types
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import config
+
+_current = contextvars.ContextVar("audit_context", default=None)
+_default = None
+_default_lock = threading.Lock()
+
+
+class _ConfigNamespace(dict):
+    """Przestrzeń nazw dla exec(config.py): przypisania nadpisanych nazw są pomijane."""
+
+    def __init__(self, overrides):
+        super().__init__(overrides)
+        self.fixed = set(overrides)
+        self.assigned = set()
+
+    def __setitem__(self, key, value):
+        self.assigned.add(key)
+        if key not in self.fixed:
+            super().__setitem__(key, value)
+
+
+def _settings(ns) -> types.SimpleNamespace:
+    return types.SimpleNamespace(**{k: v for k, v in ns.items() if k.isupper()})
+
+
+def load_settings(overrides=None) -> types.SimpleNamespace:
+    """
+    Ustawienia audytu (nazwy z config.py). Z nadpisaniami config.py jest wykonywany
+    ponownie, więc wartości pochodne (np. SCHEMA_EXTRA_PATHS z BLOG_POST) też się zgadzają.
+    """
+    if not overrides:
+        return _settings(vars(config))
+    path = importlib.util.find_spec("config").origin
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+    ns = _ConfigNamespace(overrides)
+    exec(code, {"__name__": "config", "__file__": path, "__builtins__": __builtins__}, ns)
+    unknown = ns.fixed - ns.assigned
+    if unknown:
+        raise ValueError(f"nieznane ustawienia config.py: {', '.join(sorted(unknown))}")
+    return _settings(ns)
+
+
+class Counters:
+    """Liczniki i czasy jednego audytu (cache, parsowanie, dekodowanie) — bezpieczne dla wątków."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def incr(self, name: str, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str, default=0):
+        with self._lock:
+            return self._counters.get(name, default)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class AuditContext:
+    """
+    target – domena/URL tak jak podano (redirects_core sprawdza właśnie tę wersję),
+    root   – adres strony głównej (https://domena/), od którego liczą się checki.
+    """
+
+    def __init__(self, target, root=None, overrides=None):
+        self.target = target
+        self.root = root or target
+        self.overrides = dict(overrides or {})
+        self.config = load_settings(self.overrides)
+        self.metrics = Counters()
+        self.output_dir = os.path.join("reports", urlsplit(self.root).netloc)
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def state(self, key, factory):
+        """Stan modułu w tym audycie (cache, crawl, ...) — factory(ctx) woła się przy pierwszym użyciu."""
+        value = self._state.get(key)
+        if value is None:
+            with self._lock:
+                value = self._state.get(key)
+                if value is None:
+                    value = self._state[key] = factory(self)
+        return value
+
+    @property
+    def responses(self):
+        import http_client
+        return http_client.response_cache(self)
+
+    @property
+    def documents(self):
+        import documents
+        return documents.document_cache(self)
+
+
+def current() -> AuditContext:
+    """Kontekst bieżącego audytu; poza audytem (skrypty, REPL) — domyślny z samym config.py."""
+    global _default
+    ctx = _current.get()
+    if ctx is not None:
+        return ctx
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = AuditContext("")
+    return _default
+
+
+@contextmanager
+def activate(ctx: AuditContext):
+    """Ustawia `ctx` jako bieżący kontekst na czas bloku (w tym wątku / zadaniu asyncio)."""
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
+
+
+def wrap(fn):
+    """fn wołana w innym wątku (pula) z kontekstem, w którym ją owinięto — audyt i pozostałe
+    ContextVar (np. log zadania daemona), nie tylko AuditContext."""
+    snapshot = contextvars.copy_context()
+
+    def call(*args, **kwargs):
+        # kopia na każde wywołanie: jednego Context nie da się wejść naraz w dwóch wątkach
+        return snapshot.copy().run(fn, *args, **kwargs)
+    return call
@@ -0,0 +1,390 @@
+# crawl.py
+"""
+Wspólny crawl stron z collect_urls: każdy URL pobieramy raz na audyt, a wszystkie
+analizatory per-strona (title/description, H1, canonical, ...) liczą się na tej samej
+odpowiedzi. Nowa reguła per-strona = nowy @page_analyzer, bez dodatkowego crawla.
+
+Tryb przyrostowy (CRAWL_INCREMENTAL, runner --incremental): indeks per domena (URL -> lastmod, hash treści,
+wyniki analizatorów). Strony z niezmienionym lastmod w sitemapie nie są pobierane,
+a strony z tym samym hashem treści (np. 304 z cache dyskowego) nie są analizowane.
+
+Backend pobierania (CRAWL_BACKEND): "sync" (po kolei) albo "async" (crawl_async — równolegle, analiza
+stron w kolejności przychodzenia odpowiedzi); wynik jest ten sam i w tej samej kolejności.
+
+Skąd strony (CRAWL_MODE, runner --crawl-mode): "sitemap" — collect_urls (sitemapy + EXTRA_URLS),
+albo "links" — BFS po linkach wewnętrznych od strony głównej (frontier.py: kolejka z priorytetem
+głębokość / obecność w sitemapie, reguły zakresu, filtr Blooma widzianych URL-i), do CRAWL_LIMIT
+stron. Strony trafiają do tych samych analizatorów. W trybie links każdą stronę pobieramy
+(linki są potrzebne), więc przyrostowo pomijamy tylko analizę stron o niezmienionej treści.
+
+Pamięć: strona to PageRecord (__slots__, zinternowane URL-e), a wyniki analizatorów to
+krotka w kolejności rejestracji — analizatory zwracają małe wartości (namedtuple, hashe,
+liczby), a pełne teksty trafiają do raportu tylko jako próbki naruszeń.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urljoin, urlsplit
+
+import crawl_async
+import metrics
+from frontier import BloomFilter, Frontier, Scope
+from utils import fetch, get_document, collect_entries
+
+INDEX_VERSION = 2
+
+# nazwa -> fn(response, document) -> zwarty wynik dla strony (namedtuple / liczba / napis)
+PAGE_ANALYZERS = {}
+# nazwa -> pozycja w PageRecord.findings
+_SLOTS = {}
+# nazwa -> typ namedtuple, z którego odtwarzamy wynik zapisany w indeksie (JSON-owa lista)
+_RECORD_TYPES = {}
+# analizatory, którym wystarcza <head> (crawl pobiera same heady, gdy dotyczy to wszystkich)
+HEAD_ONLY_ANALYZERS = set()
+
+_lock = threading.Lock()
+
+BACKENDS = ("sync", "async")
+MODES = ("sitemap", "links")
+
+
+def page_analyzer(name: str, head_only: bool = False, record=None):
+    """
+    Dekorator rejestrujący analizator per-strona; head_only=True gdy czyta tylko <head>,
+    record = typ namedtuple zwracany przez analizator (do odczytu z indeksu przyrostowego).
+    """
+    def deco(fn):
+        PAGE_ANALYZERS[name] = fn
+        _SLOTS.setdefault(name, len(_SLOTS))
+        if head_only:
+            HEAD_ONLY_ANALYZERS.add(name)
+        if record is not None:
+            _RECORD_TYPES[name] = record
+        return fn
+    return deco
+
+
+def text_hash(text):
+    """Stabilny (między uruchomieniami) 64-bitowy hash tekstu; None dla pustego."""
+    if not text:
+        return None
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _intern(s):
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+class PageRecord:
+    """Strona z crawla. Wyniki analizatorów: finding(nazwa) (None = brak/błąd)."""
+
+    __slots__ = ("url", "final", "status", "error", "lastmod", "hash", "bytes", "elapsed", "findings")
+
+    def __init__(self, url, lastmod=None):
+        self.url = _intern(url)
+        self.final = None
+        self.status = None
+        self.error = None
+        self.lastmod = _intern(lastmod)  # wiele stron ma ten sam lastmod z sitemapy
+        self.hash = None      # sha1 treści (bytes)
+        self.bytes = None     # rozmiar pobranej treści
+        self.elapsed = None   # czas odpowiedzi [s]
+        self.findings = None  # krotka w kolejności _SLOTS
+
+    def finding(self, name):
+        if self.findings is None:
+            return None
+        i = _SLOTS.get(name)
+        return self.findings[i] if i is not None and i < len(self.findings) else None
+
+    def set_findings(self, values: dict):
+        findings = [None] * len(_SLOTS)
+        for name, value in values.items():
+            findings[_SLOTS[name]] = value
+        self.findings = tuple(findings)
+
+
+def head_only_crawl() -> bool:
+    return bool(PAGE_ANALYZERS) and HEAD_ONLY_ANALYZERS.issuperset(PAGE_ANALYZERS)
+
+
+def _index_path(ctx):
+    """Indeks przyrostowy audytu (JSON w reports/<domena>/) albo None, gdy tryb jest wyłączony."""
+    if not ctx.config.CRAWL_INCREMENTAL:
+        return None
+    return os.path.join(ctx.output_dir, "index.json")
+
+
+def _load_index(path):
+    if not path:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data.get("pages", {})
+
+
+def _save_index(path, pages):
+    entries = {}
+    for page in pages:
+        if page.error or not page.hash:
+            continue
+        entries[page.url] = {
+            "lastmod": page.lastmod,
+            "hash": page.hash.hex(),
+            "final": page.final,
+            "status": page.status,
+            "bytes": page.bytes,
+            "findings": {name: page.finding(name) for name in PAGE_ANALYZERS if page.finding(name) is not None},
+        }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "pages": entries}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _reuse(page, prev):
+    """Przepisuje wyniki z indeksu, jeśli są tam wszystkie aktualne analizatory."""
+    findings = prev.get("findings") or {}
+    if not all(name in findings for name in PAGE_ANALYZERS):
+        return False
+    values = {}
+    for name in PAGE_ANALYZERS:
+        value = findings[name]
+        record = _RECORD_TYPES.get(name)
+        values[name] = record(*value) if record is not None and isinstance(value, list) else _intern(value)
+    page.final = _intern(prev.get("final"))
+    page.status = prev.get("status")
+    page.bytes = prev.get("bytes")
+    page.set_findings(values)
+    page.hash = bytes.fromhex(prev["hash"])
+    return True
+
+
+def _analyze(page, prev, r, err):
+    """Wypełnia `page` na podstawie pobranej odpowiedzi (albo błędu pobrania)."""
+    if err is not None:
+        page.error = str(err)
+        return
+    content = r.content or b""
+    page.hash = hashlib.sha1(content).digest()
+
+    # 2) treść bez zmian (304 z cache dyskowego albo ten sam hash) -> bez parsowania
+    if prev and prev.get("hash") == page.hash.hex() and _reuse(page, prev):
+        metrics.incr("crawl.reused_hash")
+    else:
+        try:
+            doc = get_document(r)
+        except Exception as e:
+            page.error = str(e)
+            return
+        values = {}
+        for name, analyze in PAGE_ANALYZERS.items():
+            try:
+                values[name] = _intern(analyze(r, doc))
+            except Exception:
+                continue
+        page.set_findings(values)
+        metrics.incr("crawl.analyzed")
+    page.final = _intern(r.url)
+    page.status = r.status_code
+    page.bytes = len(content)
+    elapsed = getattr(r, "elapsed", None)
+    page.elapsed = elapsed.total_seconds() if elapsed is not None else None
+
+
+def _fetch_sync(todo, head_only, after=None):
+    for page, prev in todo:
+        try:
+            r = fetch(page.url, allow_redirects=True, head_only=head_only)
+        except Exception as e:
+            _analyze(page, prev, None, e)
+            continue
+        _analyze(page, prev, r, None)
+        if after is not None:
+            after(page, r)
+
+
+def _fetch_async(todo, head_only, after=None):
+    def handle(i, r, err):
+        page, prev = todo[i]
+        _analyze(page, prev, r, err)
+        if after is not None and r is not None:
+            after(page, r)
+
+    crawl_async.fetch_all([page.url for page, _ in todo], handle, head_only=head_only)
+
+
+def _crawl_sitemap(ctx, index, fetch_pages):
+    limit, backend = ctx.config.CRAWL_LIMIT, ctx.config.CRAWL_BACKEND
+    entries = collect_entries(ctx.root, limit=limit)
+    mode = ", head-only" if head_only_crawl() else ""
+    print(f"[crawl] URLs to scan: {len(entries)} (limit={limit}, backend={backend}{mode})")
+
+    pages, todo = [], []
+    for u, lastmod in entries:
+        page = PageRecord(u, lastmod)
+        pages.append(page)
+        prev = index.get(u) if index else None
+
+        # 1) lastmod z sitemapy bez zmian -> nie pobieramy wcale
+        if prev and lastmod and prev.get("lastmod") == lastmod and _reuse(page, prev):
+            metrics.incr("crawl.reused_lastmod")
+            continue
+        todo.append((page, prev))
+
+    fetch_pages(todo, head_only_crawl())
+    return pages
+
+
+def _robots_txt(root):
+    try:
+        r = fetch(urljoin(root, "/robots.txt"))
+    except Exception:
+        return None
+    return r.text if r.status_code == 200 else None
+
+
+def _crawl_links(ctx, index, fetch_pages):
+    cfg = ctx.config
+    limit = cfg.CRAWL_LIMIT
+    scope = Scope(ctx.root, cfg, _robots_txt(ctx.root) if cfg.CRAWL_RESPECT_ROBOTS else None)
+    try:
+        # strona główna przekierowuje np. na www. — ten host też jest „nasz” (odpowiedź i tak jest w cache)
+        scope.hosts.add(urlsplit(fetch(ctx.root).url).netloc.lower())
+    except Exception:
+        pass
+    # sitemapa: priorytet przy tej samej głębokości i lastmod do rekordów — klucze w postaci
+    # z scope.normalize (jak URL-e w kolejce), względne EXTRA_URLS względem strony głównej
+    sitemap = {}
+    for u, lastmod in collect_entries(ctx.root, limit=limit):
+        url = scope.normalize(urljoin(ctx.root, u))
+        if url is not None and sitemap.get(url) is None:
+            sitemap[url] = lastmod
+    seen = BloomFilter(cfg.CRAWL_SEEN_CAPACITY, cfg.CRAWL_SEEN_ERROR)
+    queue = Frontier(cfg.CRAWL_FRONTIER_MAX)
+    lock = threading.Lock()
+    depths = {}
+
+    def enqueue(url, depth):
+        url = scope.normalize(url)
+        if url is None or depth > cfg.CRAWL_MAX_DEPTH:
+            return
+        with lock:
+            if url not in seen and queue.push(url, depth, url in sitemap):
+                seen.add(url)
+
+    def discover(page, r):
+        final = scope.normalize(r.url)
+        if final is not None:
+            with lock:
+                seen.add(final)  # po przekierowaniu nie pobieramy celu drugi raz
+        depth = depths.pop(page.url, None)
+        if depth is None or r.status_code != 200 or "html" not in r.headers.get("Content-Type", "") or depth >= cfg.CRAWL_MAX_DEPTH:
+            return
+        try:
+            links = get_document(r).facts.links
+        except Exception:
+            return
+        for link in links:
+            if link.href:
+                enqueue(urljoin(r.url, link.href.strip()), depth + 1)
+
+    # startujemy tylko od strony głównej — sitemapa rozstrzyga kolejność przy tej samej głębokości,
+    # a strony z niej, do których nic nie linkuje, dokładamy dopiero, gdy linki się skończą
+    # (inaczej duża sitemapa wypełniłaby cały CRAWL_LIMIT i nie zobaczylibyśmy stron spoza niej)
+    enqueue(ctx.root, 0)
+    orphans_left = bool(sitemap)
+    print(f"[crawl] links: start od {ctx.root}, {len(sitemap)} URL-i z sitemap (limit={limit}, "
+          f"głębokość<={cfg.CRAWL_MAX_DEPTH}, backend={cfg.CRAWL_BACKEND})")
+
+    # async: pobieramy falami po kilka razy CRAWL_CONCURRENCY (linki z fali zasilają kolejkę)
+    wave = 1 if cfg.CRAWL_BACKEND == "sync" else max(1, cfg.CRAWL_CONCURRENCY) * 2
+    deadline = time.monotonic() + cfg.CRAWL_TIMEOUT if cfg.CRAWL_BACKEND == "async" else None
+    pages = []
+    while len(pages) < limit:
+        if deadline is not None and time.monotonic() >= deadline:
+            print(f"[crawl] links: przerwany po {cfg.CRAWL_TIMEOUT}s")
+            break
+        batch = queue.pop_batch(min(wave, limit - len(pages)))
+        if not batch and orphans_left:
+            orphans_left = False
+            for u in sitemap:
+                enqueue(u, 1)
+            metrics.incr("crawl.sitemap_orphans", len(queue))
+            batch = queue.pop_batch(min(wave, limit - len(pages)))
+        if not batch:
+            break
+        todo = []
+        for url, depth, in_sitemap in batch:
+            page = PageRecord(url, sitemap.get(url))
+            depths[page.url] = depth
+            if not in_sitemap:
+                metrics.incr("crawl.links_only")
+            pages.append(page)
+            todo.append((page, index.get(url) if index else None))
+        fetch_pages(todo, False, discover)
+
+    print(f"[crawl] links: stron={len(pages)}, spoza sitemap={metrics.get('crawl.links_only')}, "
+          f"z sitemap bez linków={metrics.get('crawl.sitemap_orphans')}, "
+          f"w kolejce={len(queue)}, odrzucone (pełna kolejka)={queue.dropped}, "
+          f"widziane URL-e={seen.count} ({seen.nbytes / 2**20:.1f} MB filtra)")
+    return pages
+
+
+def _crawl(ctx):
+    backend, mode = ctx.config.CRAWL_BACKEND, ctx.config.CRAWL_MODE
+    if backend not in BACKENDS:
+        raise ValueError(f"nieznany backend crawla: {backend}")
+    if mode not in MODES:
+        raise ValueError(f"nieznany tryb crawla: {mode}")
+    index_path = _index_path(ctx)
+    index = _load_index(index_path)
+
+    fetch_pages = _fetch_async if backend == "async" else _fetch_sync
+    if mode == "links":
+        pages = _crawl_links(ctx, index, fetch_pages)
+    else:
+        pages = _crawl_sitemap(ctx, index, fetch_pages)
+
+    if index is not None:
+        try:
+            _save_index(index_path, pages)
+        except OSError as e:
+            print(f"[crawl] nie udało się zapisać indeksu: {e}")
+        print(f"[crawl] incremental: bez pobierania={metrics.get('crawl.reused_lastmod')}, "
+              f"bez zmian treści={metrics.get('crawl.reused_hash')}, przeanalizowane={metrics.get('crawl.analyzed')}")
+    return pages
+
+
+def crawl_site(ctx):
+    """
+    Zwraca listę PageRecord (url, final, status, error, finding(analizator), ...) dla ctx.root.
+    Crawl wykonuje się raz na audyt — kolejne (także równoległe) wywołania czekają na wynik.
+    """
+    crawls = ctx.state("crawl", lambda c: {})
+    with _lock:
+        pending = crawls.get(ctx.root)
+        owner = pending is None
+        if owner:
+            pending = crawls[ctx.root] = Future()
+    if not owner:
+        return pending.result()
+    try:
+        pages = _crawl(ctx)
+    except BaseException as e:
+        with _lock:
+            crawls.pop(ctx.root, None)
+        pending.set_exception(e)
+        raise
+    pending.set_result(pages)
+    return pages
@@ -0,0 +1,111 @@
+# crawl_async.py
+"""
+Asynchroniczny silnik pobierania stron dla crawla (runner --crawl-backend async).
+
+Requesty idą przez ten sam utils.fetch (cache, ratelimit per host, cache dyskowy) w puli
+CRAWL_CONCURRENCY wątków (z kontekstem audytu, który zaczął crawl) sterowanej z pętli asyncio: ograniczona równoległość, timeout
+na stronę i na cały crawl, anulowanie niezaczętych pobrań i odpowiedzi oddawane
+w kolejności przychodzenia, żeby analiza (osobny wątek, nie pula pobrań) szła równolegle z pobieraniem.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import context
+from utils import fetch
+
+
+async def iter_responses(urls, concurrency=None, page_timeout=None, executor=None, head_only=False):
+    """
+    Async generator: (indeks, response, błąd) w kolejności ukończenia pobrań.
+
+    Czas strony liczymy od wysłania requestu (nie od czekania na wolny wątek czy miejsce w limiterze
+    hosta), a sam request ma timeout min(REQUEST_TIMEOUT, page_timeout) — pobranie porzucone po
+    timeoucie strony wkrótce zwalnia wątek i limiter, więc kolejne strony na nie nie czekają.
+    Odpowiedź z cache audytu (bez requestu) nie ma limitu strony — całość pilnuje CRAWL_TIMEOUT.
+    """
+    cfg = context.current().config
+    concurrency = concurrency or cfg.CRAWL_CONCURRENCY
+    page_timeout = page_timeout or cfg.CRAWL_PAGE_TIMEOUT
+    request_timeout = min(cfg.REQUEST_TIMEOUT, page_timeout)
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(concurrency)
+
+    def _mark(started):
+        if not started.done():
+            started.set_result(None)
+
+    def signal(started):
+        try:
+            loop.call_soon_threadsafe(_mark, started)
+        except RuntimeError:
+            pass  # pętla już zamknięta — pobranie porzucone po timeoucie crawla
+
+    @context.wrap
+    def load(u, started):
+        try:
+            return fetch(u, allow_redirects=True, head_only=head_only, timeout=request_timeout,
+                         on_request=lambda: signal(started))
+        finally:
+            signal(started)  # z cache albo błąd przed requestem
+
+    async def one(i, u):
+        async with sem:
+            try:
+                started = loop.create_future()
+                call = loop.run_in_executor(executor, load, u, started)
+                await started
+                return i, await asyncio.wait_for(call, page_timeout), None
+            except asyncio.TimeoutError:
+                return i, None, TimeoutError(f"timeout po {page_timeout}s")
+            except Exception as e:
+                return i, None, e
+
+    tasks = [asyncio.create_task(one(i, u)) for i, u in enumerate(urls)]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:
+        for t in tasks:
+            t.cancel()  # przerwany crawl (timeout/wyjątek) — reszta nie startuje
+
+
+async def _run(urls, handle, fetch_pool, handle_pool, head_only):
+    crawl_timeout = context.current().config.CRAWL_TIMEOUT
+    loop = asyncio.get_running_loop()
+    seen = set()
+    handle = context.wrap(handle)
+    pending = None
+    try:
+        async with asyncio.timeout(crawl_timeout):
+            async for i, r, err in iter_responses(urls, executor=fetch_pool, head_only=head_only):
+                seen.add(i)
+                # parsowanie/analiza w osobnym wątku — pętla dalej odbiera kolejne odpowiedzi
+                pending = loop.run_in_executor(handle_pool, handle, i, r, err)
+                await asyncio.shield(pending)
+    except TimeoutError:
+        if pending is not None:
+            # analiza w toku kończy się przed oddaniem stron checkom (timeout nie przerywa wątku)
+            await asyncio.wait([pending])
+        for i in range(len(urls)):
+            if i not in seen:
+                handle(i, None, TimeoutError(f"crawl przerwany po {crawl_timeout}s"))
+
+
+def fetch_all(urls, handle, head_only=False):
+    """
+    Pobiera `urls` równolegle i woła handle(indeks, response, błąd) dla każdej strony
+    zaraz po jej pobraniu (kolejność ukończenia, nie kolejność listy). Po powrocie żadne
+    wywołanie handle już nie trwa.
+    """
+    if not urls:
+        return
+    ctx = context.current()
+    fetch_pool = ThreadPoolExecutor(max_workers=ctx.config.CRAWL_CONCURRENCY, thread_name_prefix="crawl")
+    handle_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crawl-analyze")
+    try:
+        # asyncio.run kopiuje bieżące zmienne kontekstu do zadań pętli
+        asyncio.run(_run(urls, handle, fetch_pool, handle_pool, head_only))
+    finally:
+        handle_pool.shutdown(wait=True)
+        # nie czekamy na pobrania porzucone po timeoucie strony (kończą się po timeoucie requestu)
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
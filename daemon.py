@@ -0,0 +1,342 @@
+# daemon.py
+"""
+Daemon audytów: jeden ciepły proces (biblioteki, checki, sesja HTTP i pule połączeń, limity
+per host, cache dyskowy ładowane raz), który bierze zadania z trwałej kolejki w SQLite
+(jobqueue.py) i prowadzi naraz do DAEMON_AUDITS audytów — każdy we własnym AuditContext.
+
+Zadania przychodzą przez lokalne API HTTP/JSON albo prosto do kolejki (`daemon.py submit`,
+daemon nie musi wtedy działać). Gdy w kolejce czeka DAEMON_MAX_QUEUED zadań, kolejne są
+odrzucane (HTTP 429) — back-pressure zamiast rosnącego zaległego stosu.
+
+API (domyślnie http://127.0.0.1:8731):
+  POST   /jobs               {"domain": "...", "overrides": {NAZWA: wartość}, "options": {...}} -> 202 {id, status}
+  GET    /jobs               ?status=queued&limit=50 — ostatnie zadania
+  GET    /jobs/<id>          stan zadania (exit_code, statusy checków, ścieżki raportu i logu)
+  GET    /jobs/<id>/result   raport JSON (wyniki checków) zakończonego zadania
+  DELETE /jobs/<id>          anuluje zadanie, które jeszcze czeka
+  GET    /health             audyty w toku, liczniki kolejki, czas działania
+
+options = opcje runnera: workers, pretty, no_cache, incremental, crawl_backend, crawl_mode, parser, sheets.
+Log audytu trafia do reports/<domena>/daemon_<id>.log.
+
+Użycie:
+  python daemon.py serve [--audits 2] [--port 8731]
+  python daemon.py submit example.com [NAZWA=wartość ...] [--file domains.txt] [opcje jak w runner.py]
+  python daemon.py status [id]
+"""
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import context
+import crawl
+import parsing
+import runner
+from batch import parse_domains, parse_overrides
+from config import DAEMON_AUDITS, DAEMON_DB, DAEMON_HOST, DAEMON_MAX_QUEUED, DAEMON_PORT
+from jobqueue import JobQueue, QueueFull
+
+# co ile sekund wolny worker zagląda do kolejki (zadania dodane z innego procesu)
+POLL_SECONDS = 1.0
+
+_OPTION_TYPES = {
+    "workers": int, "pretty": bool, "no_cache": bool, "incremental": bool,
+    "crawl_backend": str, "crawl_mode": str, "parser": str, "sheets": bool,
+}
+_CHOICES = {"crawl_backend": crawl.BACKENDS, "crawl_mode": crawl.MODES, "parser": parsing.BACKENDS}
+
+# log zadania prowadzonego w tym wątku (None = konsola daemona)
+_job_log = contextvars.ContextVar("job_log", default=None)
+
+
+class _JobStdout:
+    """sys.stdout daemona: print w wątku audytu trafia do logu jego zadania, reszta na konsolę."""
+
+    def __init__(self, real):
+        self.real = real
+
+    def write(self, s):
+        return (_job_log.get() or self.real).write(s)
+
+    def flush(self):
+        (_job_log.get() or self.real).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+def validate_job(domain, overrides, options):
+    """ValueError, gdy zadanie jest niepoprawne (zanim trafi do kolejki)."""
+    if not isinstance(domain, str) or not domain.strip():
+        raise ValueError("brak domeny")
+    if not isinstance(overrides, dict) or not isinstance(options, dict):
+        raise ValueError("overrides i options muszą być obiektami JSON")
+    for key, value in options.items():
+        kind = _OPTION_TYPES.get(key)
+        if kind is None:
+            raise ValueError(f"nieznana opcja: {key}")
+        if value is not None and not isinstance(value, kind):
+            raise ValueError(f"opcja {key}: oczekiwano {kind.__name__}")
+        if key in _CHOICES and value is not None and value not in _CHOICES[key]:
+            raise ValueError(f"opcja {key}: jedna z {', '.join(_CHOICES[key])}")
+    context.load_settings(overrides)  # nieznane ustawienia / błędne wartości config.py
+
+
+class Daemon:
+    def __init__(self, queue: JobQueue, audits: int = DAEMON_AUDITS):
+        self.queue = queue
+        self.audits = max(1, audits)
+        self.running = {}  # id zadania -> (domena, start)
+        self.started = time.time()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        requeued = self.queue.recover()
+        if requeued:
+            print(f"[DAEMON] przerwane zadania wróciły do kolejki: {requeued}")
+        for i in range(self.audits):
+            t = threading.Thread(target=self._work, name=f"audit-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        """Nie bierze nowych zadań i czeka na audyty w toku."""
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join()
+
+    def submit(self, domain, overrides=None, options=None) -> int:
+        validate_job(domain, overrides or {}, options or {})
+        job_id = self.queue.submit(domain, overrides, options)
+        self._wake.set()
+        return job_id
+
+    def health(self) -> dict:
+        with self._lock:
+            running = [{"id": i, "domain": d, "seconds": round(time.time() - t0, 1)}
+                       for i, (d, t0) in sorted(self.running.items())]
+        return {
+            "audits": self.audits,
+            "running": running,
+            "queue": self.queue.counts(),
+            "max_queued": self.queue.max_queued,
+            "uptime_seconds": round(time.time() - self.started, 1),
+        }
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        job_id, domain = job["id"], job["domain"]
+        with self._lock:
+            self.running[job_id] = (domain, time.time())
+        log_path = os.path.join("reports", urlsplit(runner.ensure_root(domain)).netloc, f"daemon_{job_id}.log")
+        print(f"[DAEMON] #{job_id} {domain} -> start (log: {log_path})")
+        t0 = time.time()
+        try:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            with open(log_path, "w", encoding="utf-8") as log:
+                token = _job_log.set(log)
+                try:
+                    options = {k: v for k, v in job["options"].items() if v is not None}
+                    results, report = runner.audit(domain, overrides=job["overrides"], report_tag=f"job{job_id}",
+                                                   **options)
+                finally:
+                    _job_log.reset(token)
+            code = runner.exit_code(results)
+            self.queue.finish(job_id, exit_code=code, report=report, log=log_path,
+                              checks={r["name"]: r.get("status") for r in results})
+            print(f"[DAEMON] #{job_id} {domain} -> kod {code} ({time.time() - t0:.1f}s)")
+        except Exception as e:
+            self.queue.finish(job_id, log=log_path, error=f"{type(e).__name__}: {e}")
+            print(f"[DAEMON] #{job_id} {domain} -> błąd: {e}")
+        finally:
+            with self._lock:
+                self.running.pop(job_id, None)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SEOCheckerDaemon/1.0"
+
+    @property
+    def daemon(self) -> Daemon:
+        return self.server.daemon
+
+    def log_message(self, format, *args):
+        pass  # bez logu każdego requestu na konsoli
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_path(self):
+        """(id zadania, reszta ścieżki) dla /jobs/<id>[/...] albo (None, None)."""
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] == "jobs" and parts[1].isdigit():
+            return int(parts[1]), "/".join(parts[2:])
+        return None, None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        if path == "/health":
+            return self._send(200, self.daemon.health())
+        if path == "/jobs":
+            query = parse_qs(url.query)
+            status = query.get("status", [None])[0]
+            try:
+                limit = int(query.get("limit", ["50"])[0])
+            except ValueError:
+                return self._send(400, {"error": "limit musi być liczbą"})
+            return self._send(200, {"jobs": self.daemon.queue.list(status, limit)})
+
+        job_id, rest = self._job_path()
+        job = self.daemon.queue.get(job_id) if job_id is not None else None
+        if job is None:
+            return self._send(404, {"error": "nie ma takiego zadania"})
+        if rest == "":
+            return self._send(200, job)
+        if rest == "result":
+            if job["status"] != "done" or not job["report"]:
+                return self._send(409, {"error": f"zadanie jest w stanie {job['status']}", "status": job["status"]})
+            try:
+                with open(job["report"], encoding="utf-8") as f:
+                    results = json.load(f)
+            except (OSError, ValueError) as e:
+                return self._send(410, {"error": f"raport niedostępny: {e}"})
+            return self._send(200, {"id": job_id, "domain": job["domain"], "results": results})
+        return self._send(404, {"error": "nieznany adres"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "nieznany adres"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("oczekiwano obiektu JSON")
+            job_id = self.daemon.submit(payload.get("domain"), payload.get("overrides") or {},
+                                        payload.get("options") or {})
+        except QueueFull as e:
+            return self._send(429, {"error": str(e)}, {"Retry-After": "30"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        return self._send(202, {"id": job_id, "status": "queued"}, {"Location": f"/jobs/{job_id}"})
+
+    def do_DELETE(self):
+        job_id, rest = self._job_path()
+        if job_id is None or rest:
+            return self._send(404, {"error": "nieznany adres"})
+        if self.daemon.queue.cancel(job_id):
+            return self._send(200, {"id": job_id, "status": "cancelled"})
+        job = self.daemon.queue.get(job_id)
+        if job is None:
+            return self._send(404, {"error": "nie ma takiego zadania"})
+        return self._send(409, {"error": f"zadanie jest w stanie {job['status']}", "status": job["status"]})
+
+
+def serve(args):
+    queue = JobQueue(args.db, DAEMON_MAX_QUEUED)
+    sys.stdout = _JobStdout(sys.stdout)
+    daemon = Daemon(queue, args.audits)
+    server = ThreadingHTTPServer((args.host, args.port), _Handler)
+    server.daemon_threads = True
+    server.daemon = daemon
+    daemon.start()
+    print(f"[DAEMON] http://{args.host}:{args.port}/ — audyty naraz: {daemon.audits}, kolejka: {args.db}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[DAEMON] zatrzymywanie — czekam na audyty w toku (Ctrl+C jeszcze raz = przerwij)")
+    finally:
+        server.server_close()
+        daemon.stop()
+        queue.close()
+
+
+def submit(args):
+    jobs = parse_domains(args.file) if args.file else []
+    if args.domain:
+        jobs.append((args.domain, parse_overrides(args.overrides)))
+    if not jobs:
+        sys.exit("podaj domenę albo --file")
+    options = {
+        "workers": args.workers, "pretty": args.pretty, "no_cache": args.no_cache,
+        "incremental": args.incremental, "crawl_backend": args.crawl_backend, "crawl_mode": args.crawl_mode,
+        "parser": args.parser, "sheets": args.sheets,
+    }
+    queue = JobQueue(args.db, DAEMON_MAX_QUEUED)
+    try:
+        for domain, overrides in jobs:
+            validate_job(domain, overrides, options)
+            print(f"[DAEMON] #{queue.submit(domain, overrides, options)} {domain} -> w kolejce")
+    except QueueFull as e:
+        sys.exit(f"[DAEMON] kolejka pełna: {e}")
+    finally:
+        queue.close()
+
+
+def status(args):
+    queue = JobQueue(args.db)
+    try:
+        if args.id is not None:
+            payload = queue.get(args.id) or {"error": "nie ma takiego zadania"}
+        else:
+            payload = {"queue": queue.counts(), "jobs": queue.list(limit=args.limit)}
+    finally:
+        queue.close()
+    print(json.dumps(payload, indent=2, ensure_ascii=False))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SEO Checker — daemon audytów z kolejką zadań")
+    ap.add_argument("--db", default=DAEMON_DB, help="plik kolejki SQLite")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="uruchom daemon (API + workery)")
+    p.add_argument("--audits", type=int, default=DAEMON_AUDITS, help="ile audytów naraz")
+    p.add_argument("--host", default=DAEMON_HOST)
+    p.add_argument("--port", type=int, default=DAEMON_PORT)
+    p.set_defaults(func=serve)
+
+    p = sub.add_parser("submit", help="dodaj zadania prosto do kolejki")
+    p.add_argument("domain", nargs="?")
+    p.add_argument("overrides", nargs="*", help="NAZWA=wartość (nadpisania config.py)")
+    p.add_argument("--file", help="plik domen jak w batch.py")
+    p.add_argument("--sheets", action="store_true", help="aktualizuj Google Sheet po audycie")
+    runner.add_audit_args(p)
+    p.set_defaults(func=submit)
+
+    p = sub.add_parser("status", help="stan kolejki albo zadania")
+    p.add_argument("id", type=int, nargs="?")
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(func=status)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# documents.py
+"""
+Cache sparsowanych dokumentów HTML — ta sama odpowiedź parsowana jest raz na cały audyt
+(każdy audyt ma własny cache i parser z HTML_PARSER swojego configu).
+Drzewo jest współdzielone między checkami, więc traktujemy je jako tylko-do-odczytu
+(żadnego decompose()/extract() w checkach).
+"""
+import hashlib
+import threading
+import time
+import weakref
+
+from cachetools import LRUCache
+
+import charset
+import context
+import metrics
+from facts import extract
+from parsing import LxmlDocument, parse_html
+from structured_data import StructuredData
+
+
+def basic_meta_from_soup(soup):
+    title = (soup.title.string or "").strip() if soup.title else ""
+    desc = ""
+    md = soup.find("meta", attrs={"name": "description"})
+    if md and md.get("content"):
+        desc = md["content"].strip()
+    canonical = ""
+    lc = soup.find("link", rel=lambda v: v and "canonical" in v)
+    if lc and lc.get("href"):
+        canonical = lc["href"].strip()
+    return title, desc, canonical
+
+
+class Document:
+    """Sparsowany dokument (leniwie) + wyniki extract_basic_meta, PageFacts i indeks JSON-LD."""
+
+    def __init__(self, html, encoding=None, backend=None):
+        self._html = html  # bajty (parser sam dekoduje wg `encoding`) albo str
+        self._encoding = encoding
+        self._backend = backend
+        self._soup = None
+        self._meta = None
+        self._facts = None
+        self._structured = None
+        self._lock = threading.Lock()
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            with self._lock:
+                if self._soup is None:
+                    t0 = time.perf_counter()
+                    self._soup = parse_html(self._html, self._encoding, self._backend)
+                    if isinstance(self._soup, LxmlDocument):
+                        self._html = None  # przy bs4 bajty zostają — PageFacts liczone są na drzewie lxml
+                    metrics.incr("documents.parsed")
+                    metrics.incr("documents.parse_seconds", time.perf_counter() - t0)
+        return self._soup
+
+    @property
+    def facts(self):
+        """PageFacts (facts.py) — jedno przejście po drzewie, współdzielone przez checki."""
+        if self._facts is None:
+            soup = self.soup
+            with self._lock:
+                if self._facts is None:
+                    t0 = time.perf_counter()
+                    if isinstance(soup, LxmlDocument):
+                        root = soup.element
+                    else:
+                        root = parse_html(self._html, self._encoding, backend="lxml").element
+                    self._facts = extract(root)
+                    metrics.incr("documents.facts")
+                    metrics.incr("documents.facts_seconds", time.perf_counter() - t0)
+        return self._facts
+
+    @property
+    def structured_data(self):
+        """Indeks JSON-LD (structured_data.py) — każdy blok dekodowany raz na dokument."""
+        if self._structured is None:
+            blocks = self.facts.jsonld
+            with self._lock:
+                if self._structured is None:
+                    self._structured = StructuredData(blocks)
+        return self._structured
+
+    def basic_meta(self):
+        """To samo co utils.extract_basic_meta: (soup, title, desc, canonical)."""
+        if self._meta is None:
+            self._meta = basic_meta_from_soup(self.soup)
+        return (self.soup, *self._meta)
+
+
+class DocumentCache:
+    """LRU dokumentów po hashu treści + szybka ścieżka po tożsamości obiektu odpowiedzi."""
+
+    def __init__(self, size: int, backend=None):
+        self._lru = LRUCache(maxsize=size)
+        self._backend = backend
+        self._by_response = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, r) -> Document:
+        with self._lock:
+            doc = self._by_response.get(r)
+            if doc is not None:
+                metrics.incr("documents.hits")
+                return doc
+
+        key = hashlib.sha1(r.content or b"").hexdigest()
+        with self._lock:
+            doc = self._lru.get(key)
+            if doc is None:
+                if getattr(r, "charset_source", None) is None:
+                    charset.apply_encoding(r)
+                doc = self._lru[key] = Document(r.content or b"", r.encoding, self._backend)
+            else:
+                metrics.incr("documents.hits")
+            self._by_response[r] = doc
+        return doc
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._by_response.clear()
+
+
+def document_cache(ctx=None) -> DocumentCache:
+    """Cache dokumentów audytu `ctx` (domyślnie bieżącego)."""
+    ctx = ctx or context.current()
+    return ctx.state("documents", lambda c: DocumentCache(c.config.DOC_CACHE_SIZE, c.config.HTML_PARSER))
+
+
+def get_document(r) -> Document:
+    """Dokument dla odpowiedzi z utils.fetch (parsowany najwyżej raz)."""
+    return document_cache().get(r)
@@ -0,0 +1,158 @@
+# facts.py
+"""
+PageFacts — wszystkie sygnały per-strona z jednego przejścia po drzewie (lxml, iterwalk):
+linki, obrazki (+ <source srcset>), nagłówki, akapity, bloki JSON-LD, microdata/RDFa i formularze.
+
+Checki liczą wyniki z tego rekordu zamiast chodzić po DOM-ie; koszt strony to jedno
+przejście niezależnie od liczby checków. Teksty liczone są jak get_text() w bs4
+(script/style/template pominięte, napisy z samych spacji zwinięte), więc wyniki checków
+są takie same jak przy zapytaniach do soup.
+"""
+from collections import namedtuple
+
+from lxml import etree
+
+from parsing import LxmlNode, comment_tails
+
+# text = get_text(" ", strip=True), raw_text = get_text()
+Link = namedtuple("Link", "href text raw_text rel title aria_label")
+Image = namedtuple("Image", "src data_src data_lazy srcset alt width height cls role aria_hidden loading")
+# text = get_text(strip=True) — jak w blogpost_headings; cls = klasy złączone spacją
+Heading = namedtuple("Heading", "level text style cls")
+# in_main = akapit wewnątrz pierwszego <main>
+Paragraph = namedtuple("Paragraph", "text in_main")
+Form = namedtuple("Form", "text html")
+# microdata (itemscope: kind="microdata", type=itemtype) i RDFa (kind="rdfa", type=typeof);
+# props: pierwsza wartość itemprop/property wśród potomków (content albo tekst)
+Item = namedtuple("Item", "kind type props")
+
+PageFacts = namedtuple("PageFacts", "links images sources headings paragraphs jsonld items forms has_main")
+
+_NON_TEXT = {"script", "style", "template"}
+_PRESERVE_WS = {"pre", "textarea"}
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+def _image(el) -> Image:
+    g = el.get
+    return Image(g("src"), g("data-src"), g("data-lazy"), g("srcset"), g("alt"), g("width"), g("height"),
+                 " ".join((g("class") or "").split()), g("role"), g("aria-hidden"), g("loading"))
+
+
+def _slot(lst):
+    lst.append(None)
+    return lst, len(lst) - 1
+
+
+def _joined(strings, sep, strip):
+    if strip:
+        return sep.join(s for s in (t.strip() for t in strings) if s)
+    return sep.join(strings)
+
+
+def extract(root) -> PageFacts:
+    """Fakty strony z drzewa lxml.html (root = element <html>)."""
+    links, images, sources, headings, paragraphs, jsonld, items, forms = [], [], [], [], [], [], [], []
+    collectors = []   # otwarte elementy zbierające tekst: [el, kind, strings, extra, target]
+    open_items = []   # otwarte itemscope/typeof: (el, Item)
+    skip = pre = 0
+    main_el = None
+    in_main = False
+
+    def feed(text):
+        if not text.strip() and not pre:
+            text = "\n" if "\n" in text else " "
+        for c in collectors:
+            c[2].append(text)
+
+    for event, el in etree.iterwalk(root, events=("start", "end")):
+        tag = el.tag
+        if event == "start":
+            if tag in _NON_TEXT:
+                if tag == "script" and el.get("type") == "application/ld+json":
+                    jsonld.append(el.text)
+                skip += 1
+            elif tag in _PRESERVE_WS:
+                pre += 1
+            elif tag == "main" and main_el is None:
+                main_el, in_main = el, True
+
+            # miejsce w liście rezerwujemy na starcie — kolejność jak w find_all (dokumentu), nie zamykania
+            if tag == "a" and el.get("href") is not None:
+                collectors.append([el, "a", [], None, _slot(links)])
+            elif tag in _HEADINGS:
+                collectors.append([el, "h", [], None, _slot(headings)])
+            elif tag == "p":
+                collectors.append([el, "p", [], in_main, _slot(paragraphs)])
+            elif tag == "form":
+                collectors.append([el, "form", [], None, _slot(forms)])
+            elif tag == "img":
+                images.append(_image(el))
+            elif tag == "source" and el.get("srcset") is not None:
+                sources.append(el.get("srcset"))
+
+            if open_items:
+                # wartość należy do pierwszego (w kolejności dokumentu) elementu z daną nazwą — rezerwujemy ją od razu
+                for attr, kind in (("itemprop", "microdata"), ("property", "rdfa")):
+                    prop = el.get(attr)
+                    if prop is None:
+                        continue
+                    owners = [it for _, it in open_items if it.kind == kind and prop not in it.props]
+                    for it in owners:
+                        it.props[prop] = None
+                    if owners:
+                        collectors.append([el, "prop", [], prop, owners])
+            if el.get("itemscope") is not None:
+                item = Item("microdata", el.get("itemtype"), {})
+                items.append(item)
+                open_items.append((el, item))
+            if el.get("typeof") is not None:
+                item = Item("rdfa", el.get("typeof"), {})
+                items.append(item)
+                open_items.append((el, item))
+
+            if not skip:
+                if el.text:
+                    feed(el.text)
+                if len(el):
+                    for tail in comment_tails(el[0]):
+                        feed(tail)
+            continue
+
+        # event == "end"
+        while collectors and collectors[-1][0] is el:
+            _, kind, strings, extra, target = collectors.pop()
+            if kind == "prop":  # itemprop / property: target = itemy, do których należy wartość
+                value = el.get("content") or _joined(strings, "", True)
+                for it in target:
+                    it.props[extra] = value
+                continue
+            lst, i = target
+            if kind == "a":
+                rel = el.get("rel")
+                lst[i] = Link(el.get("href"), _joined(strings, " ", True), "".join(strings),
+                              tuple(rel.split()) if rel is not None else None,
+                              el.get("title"), el.get("aria-label"))
+            elif kind == "h":
+                lst[i] = Heading(_HEADINGS[tag], _joined(strings, "", True), el.get("style"),
+                                 " ".join((el.get("class") or "").split()))
+            elif kind == "p":
+                lst[i] = Paragraph(_joined(strings, " ", True), extra)
+            elif kind == "form":
+                lst[i] = Form(_joined(strings, " ", True), str(LxmlNode(el)))
+        while open_items and open_items[-1][0] is el:
+            open_items.pop()
+        if el is main_el:
+            in_main = False
+        if tag in _NON_TEXT:
+            skip -= 1
+        elif tag in _PRESERVE_WS:
+            pre -= 1
+        if not skip:
+            if el.tail:
+                feed(el.tail)
+            for tail in comment_tails(el.getnext()):
+                feed(tail)
+
+    headings.sort(key=lambda h: h.level)  # kolejność jak find_all("h1"), potem "h2", ...
+    return PageFacts(links, images, sources, headings, paragraphs, jsonld, items, forms, main_el is not None)
@@ -1,16 +1,13 @@
 # gsheets_simple.py
-import os,json
+import json
 import datetime as dt
 import gspread
 from google.oauth2.service_account import Credentials
-from dotenv import load_dotenv
 
-load_dotenv()
-
-SHEET_ID = os.getenv("SHEET_ID")
+import context
 
+# arkusz i zakładka: SHEET_ID / WORKSHEET_GID z configu audytu (config.py, batch: per domena)
 WORKSHEET_NAME = "Checklist checker"
-WORKSHEET_GID = os.getenv("WORKSHEET_GID")
 
 SERVICE_ACCOUNT_FILE = "service_account.json"
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
@@ -59,8 +56,9 @@ def _get_client():
     return _client
 
 def get_ws():
-    sh = _get_client().open_by_key(SHEET_ID)
-    return sh.get_worksheet_by_id(int(WORKSHEET_GID))
+    cfg = context.current().config
+    sh = _get_client().open_by_key(cfg.SHEET_ID)
+    return sh.get_worksheet_by_id(int(cfg.WORKSHEET_GID))
 
 def _a1(row: int, col: int) -> str:
     letters, c = "", col
@@ -137,7 +135,7 @@ def _set_cell_note(ws, row: int, col: int, text: str):
         "requests": [{
             "updateCells": {
                 "range": {
-                    "sheetId": int(WORKSHEET_GID),
+                    "sheetId": ws.id,
                     "startRowIndex": row-1, "endRowIndex": row,
                     "startColumnIndex": col-1, "endColumnIndex": col
                 },
@@ -0,0 +1,226 @@
+# http_cache.py
+"""
+Trwały cache HTTP na dysku (między audytami), klucz = URL.
+
+Zapisujemy treść i nagłówki odpowiedzi 200 razem z ETag/Last-Modified/Cache-Control.
+Przy kolejnym GET wysyłamy If-None-Match / If-Modified-Since i przy 304 oddajemy
+treść z dysku. Odpowiedź jeszcze świeża wg Cache-Control: max-age (i bez
+przekierowań po drodze) jest zwracana bez requestu. Rozmiar katalogu jest
+ograniczony — najdawniej używane wpisy są usuwane.
+
+Katalog cache jest wspólny dla procesu; czy audyt z niego korzysta, decyduje
+HTTP_CACHE_ENABLED w jego configu (runner: --no-cache).
+"""
+import datetime as dt
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import context
+import metrics
+from config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)", re.I)
+
+
+def _cache_control(headers) -> str:
+    return (headers.get("Cache-Control") or "").lower()
+
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # liczony leniwie przy pierwszym zapisie
+
+    def _paths(self, url: str):
+        h = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, h[:2], h)
+        return base + ".json", base + ".body"
+
+    def lookup(self, url: str):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path):
+            return None
+        return meta
+
+    def conditional_headers(self, meta) -> dict:
+        h = {}
+        if meta.get("etag"):
+            h["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            h["If-Modified-Since"] = meta["last_modified"]
+        return h
+
+    def is_fresh(self, meta) -> bool:
+        cc = (meta.get("cache_control") or "").lower()
+        if "no-cache" in cc or meta.get("redirected"):
+            return False
+        m = _MAX_AGE_RE.search(cc)
+        if not m:
+            return False
+        return time.time() - meta.get("stored_at", 0) < int(m.group(1))
+
+    def _read_body(self, url: str) -> bytes:
+        _, body_path = self._paths(url)
+        with open(body_path, "rb") as f:
+            body = f.read()
+        try:
+            os.utime(body_path)  # "ostatnio użyty" dla eviction
+        except OSError:
+            pass
+        return body
+
+    def restore(self, url: str, meta, r=None):
+        """
+        Odtwarza odpowiedź z dysku. Z `r` (304) bierzemy historię przekierowań
+        i świeże nagłówki; bez `r` budujemy odpowiedź od zera (świeży wpis).
+        """
+        body = self._read_body(url)
+        if r is None:
+            r = requests.Response()
+            r.url = meta.get("final_url") or url
+            r.reason = "OK"
+            r.elapsed = dt.timedelta(0)
+            headers = CaseInsensitiveDict(meta.get("headers") or {})
+        else:
+            headers = CaseInsensitiveDict(meta.get("headers") or {})
+            headers.update(r.headers)
+            headers["Content-Length"] = str(len(body))
+        r.status_code = meta.get("status", 200)
+        r.headers = headers
+        r._content = body
+        r._content_consumed = True
+        r.encoding = get_encoding_from_headers(headers)
+        r.from_disk_cache = True
+        return r
+
+    def store(self, url: str, r):
+        cc = _cache_control(r.headers)
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if r.status_code != 200 or "no-store" in cc:
+            return
+        if not etag and not last_modified and not _MAX_AGE_RE.search(cc):
+            return  # nie ma czym rewalidować ani jak długo trzymać
+
+        meta = {
+            "url": url,
+            "final_url": r.url,
+            "status": r.status_code,
+            "headers": dict(r.headers),
+            "etag": etag,
+            "last_modified": last_modified,
+            "cache_control": cc,
+            "redirected": bool(r.history),
+            "stored_at": time.time(),
+        }
+        meta_path, body_path = self._paths(url)
+        body = r.content or b""
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            old = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            self._atomic_write(body_path, body)
+            self._atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        except OSError:
+            return
+        metrics.incr("http_cache.stored")
+        self._account(len(body) - old)
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _entries(self):
+        for dirpath, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".body"):
+                    p = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(p)
+                    except OSError:
+                        continue
+                    yield p, st.st_size, st.st_mtime
+
+    def _account(self, delta: int):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += delta
+            if self._total <= self.max_bytes:
+                return
+            # eviction: najdawniej używane, aż zejdziemy do 90% limitu
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            target = int(self.max_bytes * 0.9)
+            total = sum(size for _, size, _ in entries)
+            for body_path, size, _ in entries:
+                if total <= target:
+                    break
+                for p in (body_path, body_path[:-len(".body")] + ".json"):
+                    try:
+                        os.unlink(p)
+                    except OSError:
+                        pass
+                total -= size
+                metrics.incr("http_cache.evicted")
+            self._total = total
+
+
+_disk_cache = DiskCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES)
+
+
+def is_enabled() -> bool:
+    return bool(context.current().config.HTTP_CACHE_ENABLED)
+
+
+def cached_get(url: str, headers: dict, send):
+    """
+    GET przez cache dyskowy. `send(extra_headers)` wykonuje prawdziwy request.
+    Nagłówki warunkowe podane przez wołającego mają pierwszeństwo — wtedy cache pomijamy.
+    """
+    if not is_enabled() or any(k.lower() in ("if-none-match", "if-modified-since", "range") for k in headers):
+        return send({})
+
+    meta = _disk_cache.lookup(url)
+    if meta and _disk_cache.is_fresh(meta):
+        try:
+            r = _disk_cache.restore(url, meta)
+            metrics.incr("http_cache.fresh")
+            return r
+        except OSError:
+            meta = None
+
+    r = send(_disk_cache.conditional_headers(meta) if meta else {})
+    if r.status_code == 304 and meta:
+        try:
+            r = _disk_cache.restore(url, meta, r)
+            metrics.incr("http_cache.revalidated")
+            return r
+        except OSError:
+            return send({})  # wpis zniknął w międzyczasie — pobierz normalnie
+    _disk_cache.store(url, r)
+    return r
@@ -0,0 +1,139 @@
+# http_client.py
+"""
+Wspólna sesja HTTP dla całego procesu (keep-alive, pule połączeń per host) i cache
+odpowiedzi — osobny dla każdego audytu (context.AuditContext).
+"""
+import threading
+from concurrent.futures import Future
+import requests
+from cachetools import LRUCache
+from requests.adapters import HTTPAdapter
+
+import context
+import metrics
+from config import HTTP_POOL_HOSTS, HTTP_POOL_SIZE
+
+_session = None
+_adapters = []
+_lock = threading.Lock()
+
+# liczniki pul, które urllib3 wyrzucił z cache (żeby statystyki nie ginęły)
+_evicted = {"opened": 0, "requests": 0}
+
+
+def _dispose_pool(pool):
+    with _lock:
+        _evicted["opened"] += pool.num_connections
+        _evicted["requests"] += pool.num_requests
+    pool.close()
+
+
+def _new_session():
+    s = requests.Session()
+    for prefix in ("https://", "http://"):
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+        adapter.poolmanager.pools.dispose_func = _dispose_pool
+        s.mount(prefix, adapter)
+        _adapters.append(adapter)
+    return s
+
+
+def get_session() -> requests.Session:
+    """Zwraca współdzieloną sesję (tworzona leniwie, bezpiecznie dla wątków)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+def connection_stats() -> dict:
+    """Ile połączeń TCP/TLS otwarto, a ile requestów poszło po już otwartych (keep-alive)."""
+    with _lock:
+        opened = _evicted["opened"]
+        total = _evicted["requests"]
+        hosts = 0
+        for adapter in _adapters:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                hosts += 1
+                opened += pool.num_connections
+                total += pool.num_requests
+    return {
+        "hosts": hosts,
+        "requests": total,
+        "opened": opened,
+        "reused": max(total - opened, 0),
+    }
+
+
+# --- Cache odpowiedzi (żyje przez jeden audyt) ---
+
+def _response_size(r) -> int:
+    # treść + przybliżony narzut na nagłówki/obiekt
+    return len(r.content or b"") + 1024
+
+
+class ResponseCache:
+    """
+    Cache odpowiedzi w pamięci: klucz = (metoda, URL, redirecty, dodatkowe nagłówki).
+    Równoległe zapytania o ten sam klucz czekają na jedno pobranie (single-flight).
+    Eviction LRU po łącznym rozmiarze treści.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._lru = LRUCache(maxsize=max_bytes, getsizeof=_response_size)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key, loader):
+        with self._lock:
+            r = self._lru.get(key)
+            if r is not None:
+                metrics.incr("response_cache.hits")
+                return r
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+
+        if not owner:
+            metrics.incr("response_cache.shared")
+            return pending.result()
+
+        metrics.incr("response_cache.misses")
+        try:
+            r = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            try:
+                self._lru[key] = r
+            except ValueError:
+                pass  # pojedyncza odpowiedź większa niż cały cache — nie trzymamy
+            self._inflight.pop(key, None)
+        pending.set_result(r)
+        return r
+
+    def peek(self, key):
+        """Odpowiedź z cache albo None — bez pobierania i bez liczenia chybień."""
+        with self._lock:
+            return self._lru.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+
+def response_cache(ctx=None) -> ResponseCache:
+    """Cache odpowiedzi audytu `ctx` (domyślnie bieżącego)."""
+    ctx = ctx or context.current()
+    return ctx.state("responses", lambda c: ResponseCache(c.config.RESPONSE_CACHE_MAX_BYTES))
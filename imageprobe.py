@@ -0,0 +1,217 @@
+# imageprobe.py
+"""
+Badanie obrazków (rozmiar, format, wymiary) bez pobierania całych plików — dla checków obrazków.
+
+  * najpierw HEAD; gdy serwer go odrzuca albo nie podaje Content-Length / typu image/* —
+    GET z Range: bytes=0-(IMG_SNIFF_BYTES-1): rozmiar z Content-Range, a format i wymiary
+    w pikselach z nagłówka pliku (PNG, JPEG, GIF, WebP, AVIF; SVG — tylko format),
+  * probe_many() bada adresy równolegle (IMG_PROBE_WORKERS; tempo per host pilnuje ratelimit),
+  * wyniki są w cache audytu per URL — logo czy baner wspólny dla wielu stron badamy raz.
+
+Wynik to dict: url, status, bytes, content_type, format, width, height, method ("HEAD"/"RANGE"),
+error. Nieznany rozmiar/wymiary = None (nie 0).
+"""
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import context
+import metrics
+import ratelimit
+from http_client import get_session
+from utils import fetch
+
+_FORMATS = {
+    "image/webp": "webp", "image/avif": "avif", "image/png": "png", "image/jpeg": "jpeg",
+    "image/jpg": "jpeg", "image/pjpeg": "jpeg", "image/gif": "gif", "image/svg+xml": "svg",
+}
+_EXTENSIONS = {"webp": "webp", "avif": "avif", "png": "png", "jpg": "jpeg", "jpeg": "jpeg", "gif": "gif", "svg": "svg"}
+_CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(\d+)", re.I)
+
+
+# --- Rozpoznawanie formatu i wymiarów z pierwszych bajtów pliku ---
+
+def _be(data, start, end):
+    return int.from_bytes(data[start:end], "big")
+
+
+def _le(data, start, end):
+    return int.from_bytes(data[start:end], "little")
+
+
+def _jpeg_size(data):
+    # segmenty aż do SOFn (wymiary); EXIF z miniaturą potrafi być przed nim — stąd IMG_SNIFF_BYTES
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # bajty wypełnienia
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # znaczniki bez długości
+            i += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return _be(data, i + 7, i + 9), _be(data, i + 5, i + 7)
+        i += 2 + _be(data, i + 2, i + 4)
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        return _le(data, 26, 28) & 0x3FFF, _le(data, 28, 30) & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = _le(data, 21, 25)
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return _le(data, 24, 27) + 1, _le(data, 27, 30) + 1
+    return None
+
+
+def _is_avif(data):
+    if data[4:8] != b"ftyp":
+        return False
+    end = min(_be(data, 0, 4), len(data))
+    brands = [data[i:i + 4] for i in range(8, end, 4) if i != 12]  # 12..16 = minor version
+    return b"avif" in brands or b"avis" in brands
+
+
+def _avif_size(data):
+    # pierwszy box ispe (image spatial extents) z meta: wersja/flagi, szerokość, wysokość
+    i = data.find(b"ispe")
+    if i < 4 or len(data) < i + 16:
+        return None
+    return _be(data, i + 8, i + 12), _be(data, i + 12, i + 16)
+
+
+def sniff(data: bytes):
+    """(format, szerokość, wysokość) z początku pliku; czego nie wiadomo -> None."""
+    size = None
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        fmt = "png"
+        if data[12:16] == b"IHDR" and len(data) >= 24:
+            size = _be(data, 16, 20), _be(data, 20, 24)
+    elif data[:3] == b"\xff\xd8\xff":
+        fmt = "jpeg"
+        size = _jpeg_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        fmt = "webp"
+        size = _webp_size(data)
+    elif _is_avif(data):
+        fmt = "avif"
+        size = _avif_size(data)
+    elif data[:6] in (b"GIF87a", b"GIF89a"):
+        fmt = "gif"
+        if len(data) >= 10:
+            size = _le(data, 6, 8), _le(data, 8, 10)
+    else:
+        head = data[:1024].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+        fmt = "svg" if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head) else None
+    width, height = size or (None, None)
+    return fmt, width, height
+
+
+def _format_from(content_type, url):
+    fmt = _FORMATS.get(content_type)
+    if fmt is None:
+        ext = url.split("?", 1)[0].rsplit(".", 1)[-1].lower()
+        fmt = _EXTENSIONS.get(ext)
+    return fmt
+
+
+# --- Zapytania ---
+
+def _range_get(url, cfg):
+    """Pierwsze IMG_SNIFF_BYTES bajtów pliku: (odpowiedź, bajty) — reszty nie czytamy."""
+    headers = {**cfg.DEFAULT_HEADERS, "Range": f"bytes=0-{cfg.IMG_SNIFF_BYTES - 1}", "Accept-Encoding": "identity"}
+    r = ratelimit.send(url, lambda: get_session().get(url, headers=headers, timeout=cfg.REQUEST_TIMEOUT,
+                                                      stream=True))
+    buf = bytearray()
+    try:
+        if r.status_code < 400:
+            for chunk in r.iter_content(8192):
+                buf += chunk
+                if len(buf) >= cfg.IMG_SNIFF_BYTES:
+                    break
+    finally:
+        r.close()  # serwer bez obsługi Range wysyła cały plik — nie czytamy go
+    return r, bytes(buf[:cfg.IMG_SNIFF_BYTES])
+
+
+def _total_bytes(r, data, cfg):
+    m = _CONTENT_RANGE.match(r.headers.get("Content-Range", ""))
+    if m:
+        return int(m.group(1))
+    clen = r.headers.get("Content-Length", "")
+    if r.status_code == 200 and clen.isdigit():
+        return int(clen)
+    if r.status_code == 200 and len(data) < cfg.IMG_SNIFF_BYTES:
+        return len(data)  # cały plik zmieścił się w próbce
+    return None
+
+
+def _probe(url):
+    cfg = context.current().config
+    info = {"url": url, "status": None, "bytes": None, "content_type": "", "format": None,
+            "width": None, "height": None, "method": "HEAD", "error": None}
+    if not url.lower().startswith(("http://", "https://")):
+        info["error"] = "nie http(s)"
+        return info
+    try:
+        metrics.incr("images.head")
+        h = fetch(url, method="HEAD", allow_redirects=True, cache=False)
+        ctype = h.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        clen = h.headers.get("Content-Length", "")
+        info.update(status=h.status_code, content_type=ctype)
+        if h.status_code in (404, 410):
+            info["error"] = f"HTTP {h.status_code}"
+            return info
+        if h.status_code < 400 and ctype.startswith("image/") and clen.isdigit() and int(clen) > 0:
+            info.update(bytes=int(clen), format=_format_from(ctype, url))
+            return info
+        # HEAD odrzucony (405/403/501...) albo bez rozmiaru/typu — próbka pliku
+        metrics.incr("images.range")
+        r, data = _range_get(url, cfg)
+        ctype = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        info.update(status=r.status_code, content_type=ctype, method="RANGE")
+        if r.status_code >= 400:
+            info["error"] = f"HTTP {r.status_code}"
+            return info
+        fmt, width, height = sniff(data)
+        info.update(bytes=_total_bytes(r, data, cfg), format=fmt or _format_from(ctype, url),
+                    width=width, height=height)
+    except Exception as e:
+        info["error"] = str(e)
+    return info
+
+
+def probe(url: str) -> dict:
+    """Wynik badania obrazka; w ramach audytu każdy URL badamy raz (równoległe wywołania czekają)."""
+    state = context.current().state("images", lambda c: {"lock": threading.Lock(), "probes": {}})
+    with state["lock"]:
+        pending = state["probes"].get(url)
+        owner = pending is None
+        if owner:
+            pending = state["probes"][url] = Future()
+    if not owner:
+        metrics.incr("images.cache_hits")
+        return pending.result()
+    try:
+        info = _probe(url)
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    pending.set_result(info)
+    return info
+
+
+def probe_many(urls, workers=None) -> dict:
+    """Bada adresy równolegle; zwraca {url: wynik} w kolejności adresów (bez powtórzeń)."""
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    workers = workers or context.current().config.IMG_PROBE_WORKERS
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls))), thread_name_prefix="img") as pool:
+        return dict(zip(urls, pool.map(context.wrap(probe), urls)))
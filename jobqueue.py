@@ -0,0 +1,141 @@
+# jobqueue.py
+"""
+Trwała kolejka audytów w SQLite (daemon.py): zadanie = domena + nadpisania config.py + opcje
+runnera. Stany: queued -> running -> done / failed, albo queued -> cancelled.
+
+Kolejka przeżywa restart daemona — zadania, które zostały w stanie running (przerwany
+proces), recover() oddaje z powrotem do kolejki. Limit oczekujących zadań (max_queued)
+daje back-pressure: submit() rzuca QueueFull, API odpowiada 429.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain    TEXT NOT NULL,
+    overrides TEXT NOT NULL,
+    options   TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    submitted REAL NOT NULL,
+    started   REAL,
+    finished  REAL,
+    exit_code INTEGER,
+    report    TEXT,
+    log       TEXT,
+    error     TEXT,
+    checks    TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+_JSON_COLUMNS = ("overrides", "options", "checks")
+
+STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """Za dużo oczekujących zadań — spróbuj później."""
+
+
+def _row(cursor, values):
+    job = {col[0]: v for col, v in zip(cursor.description, values)}
+    for key in _JSON_COLUMNS:
+        if job.get(key) is not None:
+            job[key] = json.loads(job[key])
+    return job
+
+
+class JobQueue:
+    def __init__(self, path: str, max_queued: int = 0):
+        self.path = path
+        self.max_queued = max_queued  # 0 = bez limitu
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = _row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def submit(self, domain: str, overrides=None, options=None) -> int:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self.max_queued:
+                    queued = self._db.execute("SELECT COUNT(*) AS n FROM jobs WHERE status = 'queued'").fetchone()["n"]
+                    if queued >= self.max_queued:
+                        raise QueueFull(f"w kolejce czeka już {queued} zadań (limit {self.max_queued})")
+                cur = self._db.execute(
+                    "INSERT INTO jobs (domain, overrides, options, status, submitted) VALUES (?, ?, ?, 'queued', ?)",
+                    (domain, json.dumps(overrides or {}), json.dumps(options or {}), time.time()),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return cur.lastrowid
+
+    def claim(self):
+        """Najstarsze oczekujące zadanie, od razu oznaczone jako running (albo None)."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                job = self._db.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+                if job is not None:
+                    job["status"], job["started"] = "running", time.time()
+                    self._db.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                                     (job["started"], job["id"]))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return job
+
+    def finish(self, job_id: int, exit_code=None, report=None, log=None, checks=None, error=None):
+        """Zamyka zadanie: done (jest exit_code) albo failed (error)."""
+        status = "failed" if error else "done"
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished = ?, exit_code = ?, report = ?, log = ?, error = ?, checks = ? "
+                "WHERE id = ?",
+                (status, time.time(), exit_code, report, log, error,
+                 json.dumps(checks) if checks is not None else None, job_id),
+            )
+
+    def cancel(self, job_id: int) -> bool:
+        """Anuluje zadanie, które jeszcze czeka; True gdy się udało."""
+        with self._lock:
+            cur = self._db.execute("UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+                                   (time.time(), job_id))
+            return cur.rowcount == 1
+
+    def recover(self) -> int:
+        """Zadania przerwane razem z poprzednim procesem (running) wracają do kolejki."""
+        with self._lock:
+            cur = self._db.execute("UPDATE jobs SET status = 'queued', started = NULL WHERE status = 'running'")
+            return cur.rowcount
+
+    def get(self, job_id: int):
+        with self._lock:
+            return self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def list(self, status=None, limit=50):
+        """Ostatnie zadania (najnowsze najpierw), opcjonalnie tylko w danym stanie."""
+        with self._lock:
+            if status:
+                return self._db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?",
+                                        (status, limit)).fetchall()
+            return self._db.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({r["status"]: r["n"] for r in rows})
+        return counts
@@ -0,0 +1,163 @@
+# jsonstream.py
+"""
+Strumieniowe wyciąganie wybranych fragmentów z dużego dokumentu JSON (np. raport PSI/Lighthouse,
+kilka MB ze zrzutami ekranu w data URI) — bez budowania całego dokumentu w pamięci.
+
+spec opisuje, co zachować: {"klucz": True} = cała wartość, {"klucz": {...}} = zejdź głębiej,
+"*" = dowolny klucz. Reszta jest przewijana bajt po bajcie (długie napisy bez dekodowania,
+bufor zwalniany na bieżąco), więc pamięć to rozmiar chunka + zachowane wartości.
+
+    extract(r.iter_content(64 * 1024), {"lighthouseResult": {"categories": {"*": {"score": True}}}})
+    -> {"lighthouseResult": {"categories": {"performance": {"score": 0.9}, ...}}}
+
+Wynik ma ten sam kształt co pełny dokument (tylko bez pominiętych gałęzi), więc kod czytający
+pełny JSON działa na nim bez zmian.
+"""
+import json
+import re
+
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_STRING_STOP = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+_WS = b" \t\r\n"
+# bufor przycinamy, gdy przeczytana część przekroczy tyle bajtów
+_COMPACT_AT = 64 * 1024
+
+
+class _Reader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.buf = b""
+        self.pos = 0
+        self.mark = None  # początek zachowywanej wartości — do tego miejsca nie przycinamy
+
+    def _fill(self) -> bool:
+        """Dokleja kolejny chunk; wcześniej zwalnia przeczytaną (i niezachowywaną) część bufora."""
+        for chunk in self._chunks:
+            if chunk:
+                cut = min(self.pos if self.mark is None else self.mark, len(self.buf))
+                if cut and (cut >= _COMPACT_AT or cut == len(self.buf)):
+                    self.buf, self.pos = self.buf[cut:], self.pos - cut
+                    if self.mark is not None:
+                        self.mark -= cut
+                self.buf += chunk
+                return True
+        return False
+
+    def _need(self):
+        if self.pos >= len(self.buf) and not self._fill():
+            raise ValueError("JSON: nieoczekiwany koniec danych")
+
+    def peek(self) -> int:
+        """Następny bajt poza białymi znakami (bez przesuwania)."""
+        while True:
+            self._need()
+            b = self.buf[self.pos]
+            if b not in _WS:
+                return b
+            self.pos += 1
+
+    def expect(self, char: bytes):
+        if self.peek() != char[0]:
+            raise ValueError(f"JSON: oczekiwano {char.decode()} na pozycji {self.pos}")
+        self.pos += 1
+
+    def skip_string(self):
+        """Przewija napis (pozycja na otwierającym cudzysłowie)."""
+        self.pos += 1
+        while True:
+            m = _STRING_STOP.search(self.buf, self.pos)
+            if m is None:
+                # reszta bufora to środek napisu (np. zrzut ekranu w base64) — przy _fill idzie do kosza
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("JSON: niezakończony napis")
+                continue
+            if self.buf[m.start()] == 0x22:  # "
+                self.pos = m.end()
+                return
+            self.pos = m.start() + 2  # "\" + znak po nim (może być już w następnym chunku)
+            while self.pos > len(self.buf):
+                if not self._fill():
+                    raise ValueError("JSON: niezakończony napis")
+
+    def read_string(self) -> str:
+        self.mark = self.pos
+        try:
+            self.skip_string()
+            return json.loads(self.buf[self.mark:self.pos])
+        finally:
+            self.mark = None
+
+    def skip_value(self):
+        b = self.peek()
+        if b == 0x22:  # "
+            self.skip_string()
+            return
+        if b not in (0x7B, 0x5B):  # { [
+            while True:
+                m = _SCALAR_END.search(self.buf, self.pos)
+                if m:
+                    self.pos = m.start()
+                    return
+                self.pos = len(self.buf)
+                if not self._fill():
+                    return  # liczba na samym końcu dokumentu
+        depth = 0
+        while True:
+            m = _STRUCTURAL.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("JSON: niezakończony obiekt")
+                continue
+            c = self.buf[m.start()]
+            if c == 0x22:
+                self.pos = m.start()
+                self.skip_string()
+                continue
+            self.pos = m.end()
+            depth += 1 if c in (0x7B, 0x5B) else -1
+            if depth == 0:
+                return
+
+    def read_value(self):
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            return json.loads(self.buf[self.mark:self.pos])
+        finally:
+            self.mark = None
+
+
+def _walk(reader, spec):
+    """Obiekt na bieżącej pozycji -> dict z zachowanymi kluczami (reszta przewinięta)."""
+    out = {}
+    reader.expect(b"{")
+    if reader.peek() == 0x7D:  # }
+        reader.pos += 1
+        return out
+    while True:
+        if reader.peek() != 0x22:
+            raise ValueError(f"JSON: oczekiwano klucza na pozycji {reader.pos}")
+        key = reader.read_string()
+        reader.expect(b":")
+        sub = spec.get(key, spec.get("*"))
+        if sub is True:
+            out[key] = reader.read_value()
+        elif isinstance(sub, dict) and reader.peek() == 0x7B:
+            out[key] = _walk(reader, sub)
+        else:
+            reader.skip_value()
+        b = reader.peek()
+        reader.pos += 1
+        if b == 0x7D:
+            return out
+        if b != 0x2C:  # ,
+            raise ValueError(f"JSON: oczekiwano , albo }} na pozycji {reader.pos - 1}")
+
+
+def extract(chunks, spec: dict) -> dict:
+    """Fragmenty dokumentu JSON (obiekt na najwyższym poziomie) wskazane przez `spec`; chunks = bajty."""
+    return _walk(_Reader(chunks), spec)
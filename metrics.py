@@ -0,0 +1,22 @@
+# metrics.py
+"""
+Liczniki i czasy bieżącego audytu (cache, parsowanie, dekodowanie) — bezpieczne dla wątków.
+Każdy audyt ma własne liczniki (context.AuditContext.metrics); te funkcje piszą do bieżącego.
+"""
+import context
+
+
+def incr(name: str, value=1):
+    context.current().metrics.incr(name, value)
+
+
+def get(name: str, default=0):
+    return context.current().metrics.get(name, default)
+
+
+def snapshot() -> dict:
+    return context.current().metrics.snapshot()
+
+
+def reset():
+    context.current().metrics.reset()
@@ -0,0 +1,371 @@
+# pagespeed.py
+"""
+Silnik PageSpeed Insights dla checks/psi.py: wszystkie strategie (PSI_STRATEGIES) dla kilku
+stron naraz — strona główna, BLOG_POST, PRODUCT_URL i próbka PSI_SAMPLE_PAGES stron z sitemapy.
+
+  * start(ctx) zleca zapytania w tle na początku audytu (etap "psi_start" w schedulerze),
+    więc czas PSI (do minuty na zapytanie) nakłada się na pozostałe checki,
+  * wspólna dla procesu pula PSI_CONCURRENCY wątków i budżet zapytań: PSI_RPM na minutę
+    i PSI_DAILY_QUOTA na dzień — stan w PSI_CACHE_DIR/quota.json pod blokadą pliku, więc
+    budżet dzielą wszystkie procesy (batch.py, demon) i przeżywa restart,
+  * ustawienia PSI_* bierzemy z configu audytu (nadpisania per domena działają),
+  * sparsowane wyniki (kilkadziesiąt liczb, nie cały raport Lighthouse) trafiają do cache na
+    dysku na PSI_CACHE_TTL sekund — kolejny audyt w tym czasie nie pyta API (--no-cache: pyta),
+  * odpowiedź (kilka MB: zrzuty ekranu, setki audytów) czytamy strumieniowo (jsonstream) i
+    zostawiamy z niej tylko to, czego używa extract_scores — przy kilku zapytaniach naraz
+    pamięć nie rośnie o pełne drzewa JSON,
+  * PSI_ENDPOINT z configu audytu — do testów wystarczy lokalny serwer udający API.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from urllib.parse import urljoin
+
+import requests
+
+import context
+import http_cache
+import jsonstream
+import metrics
+from http_client import get_session
+from utils import collect_urls
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Ustawienia sieci dla PSI (ciężkie zapytania -> dajemy większy timeout i retry)
+_PSI_TIMEOUT = 60          # sekundy
+_PSI_RETRIES = 3
+_PSI_BACKOFF = 2.0         # mnożnik czasu czekania między próbami (exponential backoff)
+_PSI_CHUNK = 64 * 1024     # bajty czytane naraz z odpowiedzi
+
+# audyty Lighthouse, z których extract_scores bierze metryki lab
+_LAB_AUDITS = ("largest-contentful-paint", "interactive", "total-blocking-time",
+               "cumulative-layout-shift", "speed-index", "first-contentful-paint")
+# fragmenty odpowiedzi PSI potrzebne extract_scores (reszta jest przewijana — jsonstream)
+_SPEC = {
+    "loadingExperience": {"metrics": True},
+    "originLoadingExperience": {"metrics": True},
+    "lighthouseResult": {
+        "categories": {"*": {"score": True}},
+        "audits": {a: {"numericValue": True} for a in _LAB_AUDITS},
+    },
+}
+
+
+class QuotaExceeded(RuntimeError):
+    """Dzienny budżet zapytań PSI wyczerpany."""
+
+
+class _Budget:
+    """
+    Limit zapytań na minutę (okno 60 s) i na dzień — wspólny dla wszystkich procesów z tym samym
+    PSI_CACHE_DIR (batch.py, demon): stan {day, used, recent} jest w quota.json, a odczyt i zapis
+    idą pod blokadą pliku quota.json.lock (flock; na Windows msvcrt.locking).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()  # wątki procesu — blokada pliku chroni przed innymi procesami
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, open(self.path + ".lock", "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass  # LK_LOCK poddaje się po ~10 s — czekamy dalej
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load(self, today):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        used = data.get("used", 0) if data.get("day") == today else 0
+        return used, data.get("recent", [])
+
+    def _save(self, today, used, recent):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"day": today, "used": used, "recent": recent}, f)
+        os.replace(tmp, self.path)
+
+    def acquire(self, rpm, daily):
+        """Czeka na wolne miejsce w limicie minutowym; QuotaExceeded, gdy dzienny jest wyczerpany."""
+        while True:
+            with self._locked():
+                today = date.today().isoformat()
+                used, recent = self._load(today)
+                if daily and used >= daily:
+                    raise QuotaExceeded(f"PSI: dzienny limit zapytań wyczerpany ({used}/{daily})")
+                # czas ścienny, nie monotonic — okno dzielą procesy
+                now = time.time()
+                recent = [t for t in recent if 0 <= now - t < 60]
+                if not rpm or len(recent) < rpm:
+                    recent.append(now)
+                    self._save(today, used + 1, recent)
+                    return
+                wait = 60 - (now - min(recent))
+            metrics.incr("psi.wait_seconds", wait)
+            time.sleep(wait)
+
+    def remaining(self, daily):
+        if not daily:
+            return None
+        with self._locked():
+            return max(daily - self._load(date.today().isoformat())[0], 0)
+
+
+_budgets = {}
+_pools = {}
+_shared_lock = threading.Lock()
+
+
+def _budget(cfg):
+    """Budżet dla PSI_CACHE_DIR audytu (jeden obiekt na katalog w procesie)."""
+    path = os.path.abspath(os.path.join(cfg.PSI_CACHE_DIR, "quota.json"))
+    with _shared_lock:
+        if path not in _budgets:
+            _budgets[path] = _Budget(path)
+        return _budgets[path]
+
+
+def _executor(cfg):
+    """Pula PSI_CONCURRENCY wątków — wspólna dla audytów procesu z tym samym ustawieniem."""
+    size = max(1, cfg.PSI_CONCURRENCY)
+    with _shared_lock:
+        if size not in _pools:
+            _pools[size] = ThreadPoolExecutor(max_workers=size, thread_name_prefix="psi")
+        return _pools[size]
+
+
+def remaining_quota(cfg=None):
+    """Ile zapytań zostało w dziennym budżecie (None = bez limitu)."""
+    cfg = cfg or context.current().config
+    return _budget(cfg).remaining(cfg.PSI_DAILY_QUOTA)
+
+
+# --- API ---
+
+def _http_get(url: str, params: dict, cfg=None):
+    """GET (stream) z retry/backoff specjalnie pod PSI; każda próba liczy się do budżetu."""
+    cfg = cfg or context.current().config
+    budget = _budget(cfg)
+    attempt = 0
+    while True:
+        attempt += 1
+        budget.acquire(cfg.PSI_RPM, cfg.PSI_DAILY_QUOTA)
+        metrics.incr("psi.requests")
+        try:
+            r = get_session().get(url, params=params, timeout=_PSI_TIMEOUT, stream=True)
+            # retry przy 429 i 5xx
+            if r.status_code in (429, 500, 502, 503, 504):
+                if attempt < _PSI_RETRIES:
+                    r.close()
+                    wait = (_PSI_BACKOFF ** (attempt - 1))
+                    print(f"[psi] HTTP {r.status_code} -> retry {attempt}/{_PSI_RETRIES} za {wait:.1f}s")
+                    time.sleep(wait)
+                    continue
+            return r
+        except requests.exceptions.ReadTimeout as e:
+            if attempt < _PSI_RETRIES:
+                wait = (_PSI_BACKOFF ** (attempt - 1))
+                print(f"[psi] ReadTimeout -> retry {attempt}/{_PSI_RETRIES} za {wait:.1f}s")
+                time.sleep(wait)
+                continue
+            raise e
+
+
+def _get(url: str, strategy: str, cfg):
+    params = {"url": url, "strategy": strategy}
+    if cfg.PSI_API_KEY:
+        params["key"] = cfg.PSI_API_KEY
+    r = _http_get(cfg.PSI_ENDPOINT, params, cfg)
+    with r:
+        if r.status_code != 200:
+            # pokaż kawałek treści dla debugowania
+            snippet = r.text[:200] if isinstance(r.text, str) else str(r.content)[:200]
+            raise RuntimeError(f"PSI HTTP {r.status_code}: {snippet}")
+        try:
+            return jsonstream.extract(r.iter_content(_PSI_CHUNK), _SPEC)
+        except ValueError:
+            raise RuntimeError("PSI: nieprawidłowy JSON w odpowiedzi")
+
+
+def _get_safe(dct, path, default=None):
+    cur = dct
+    for k in path:
+        if isinstance(cur, dict) and k in cur:
+            cur = cur[k]
+        else:
+            return default
+    return cur
+
+
+def extract_scores(resp):
+    """
+    Wyniki, z których korzysta check: kategorie Lighthouse, CWV z danych terenowych, metryki lab.
+    resp = pełna odpowiedź PSI albo jej fragmenty z _SPEC (nowe pola tutaj -> dopisz je też do _SPEC).
+    """
+    # performance score (0..1)
+    perf = _get_safe(resp, ["lighthouseResult", "categories", "performance", "score"], None)
+    # inne kategorie (opcjonalnie)
+    acc  = _get_safe(resp, ["lighthouseResult", "categories", "accessibility", "score"], None)
+    bp   = _get_safe(resp, ["lighthouseResult", "categories", "best-practices", "score"], None)
+    seo  = _get_safe(resp, ["lighthouseResult", "categories", "seo", "score"], None)
+
+    # CWV field data
+    le  = resp.get("loadingExperience") or {}
+    ole = resp.get("originLoadingExperience") or {}
+
+    def _metric(src, key_opts):
+        for key in key_opts:
+            m = _get_safe(src, ["metrics", key], {})
+            if m:
+                return {
+                    "category": m.get("category"),  # GOOD / NEEDS_IMPROVEMENT / POOR
+                    "p75": m.get("percentile"),
+                    "distributions": m.get("distributions", []),
+                }
+        return None
+
+    lcp = _metric(le, ["LARGEST_CONTENTFUL_PAINT_MS"]) or _metric(ole, ["LARGEST_CONTENTFUL_PAINT_MS"])
+    cls = _metric(le, ["CUMULATIVE_LAYOUT_SHIFT_SCORE"]) or _metric(ole, ["CUMULATIVE_LAYOUT_SHIFT_SCORE"])
+    inp = _metric(le, ["INTERACTION_TO_NEXT_PAINT", "EXPERIMENTAL_INTERACTION_TO_NEXT_PAINT"]) or \
+          _metric(ole, ["INTERACTION_TO_NEXT_PAINT", "EXPERIMENTAL_INTERACTION_TO_NEXT_PAINT"])
+
+    # Lighthouse lab metrics (opcjonalnie) — _LAB_AUDITS
+    audits = _get_safe(resp, ["lighthouseResult", "audits"], {})
+    def _val(audit_id):
+        a = audits.get(audit_id, {})
+        return a.get("numericValue")
+    lab = {
+        "lcp_ms": _val("largest-contentful-paint"),
+        "inp_ms": _val("interactive") if _val("interactive") is not None else None,  # to nie INP (field)
+        "tbt_ms": _val("total-blocking-time"),
+        "cls": _val("cumulative-layout-shift"),
+        "si_ms": _val("speed-index"),
+        "fcp_ms": _val("first-contentful-paint"),
+    }
+
+    return {
+        "scores": {
+            "performance": perf,
+            "accessibility": acc,
+            "best_practices": bp,
+            "seo": seo,
+        },
+        "cwv_field": {
+            "lcp": lcp,
+            "inp": inp,
+            "cls": cls,
+        },
+        "lab": lab,
+    }
+
+
+# --- Cache wyników (TTL) ---
+
+def _cache_path(cache_dir, endpoint, url, strategy):
+    key = hashlib.sha1(f"{endpoint}\n{strategy}\n{url}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+
+def _cache_get(path, ttl):
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("time", 0) >= ttl:
+        return None
+    return entry.get("result")
+
+
+def _cache_put(path, result):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"time": time.time(), "result": result}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # cache to tylko optymalizacja
+
+
+def analyze(url: str, strategy: str):
+    """Sparsowany wynik PSI dla (url, strategia) — z cache, jeśli świeży, inaczej z API."""
+    cfg = context.current().config
+    path = _cache_path(cfg.PSI_CACHE_DIR, cfg.PSI_ENDPOINT, url, strategy)
+    if cfg.PSI_CACHE_TTL and http_cache.is_enabled():
+        cached = _cache_get(path, cfg.PSI_CACHE_TTL)
+        if cached is not None:
+            metrics.incr("psi.cache_hits")
+            return cached
+    result = extract_scores(_get(url, strategy, cfg))
+    if cfg.PSI_CACHE_TTL:
+        _cache_put(path, result)
+    return result
+
+
+# --- Zlecenia audytu ---
+
+def targets(ctx):
+    """Strony do PSI: główna, BLOG_POST, PRODUCT_URL i próbka z sitemapy (bez powtórzeń)."""
+    cfg = ctx.config
+    urls = [ctx.root]
+    for path in (cfg.BLOG_POST, cfg.PRODUCT_URL):
+        if path:
+            urls.append(urljoin(ctx.root, path))
+    if cfg.PSI_SAMPLE_PAGES > 0:
+        sample = [urljoin(ctx.root, u) for u in collect_urls(ctx.root, limit=cfg.PSI_SAMPLE_PAGES + len(urls))]
+        urls += [u for u in sample if u not in urls][:cfg.PSI_SAMPLE_PAGES]
+    return list(dict.fromkeys(urls))
+
+
+def start(ctx=None):
+    """
+    Zleca w tle wszystkie zapytania PSI audytu (raz — kolejne wywołania zwracają te same zlecenia).
+    Zwraca {(url, strategia): Future} w kolejności: strony, a w nich strategie.
+    """
+    ctx = ctx or context.current()
+    state = ctx.state("psi", lambda c: {"lock": threading.Lock(), "jobs": None})
+    with state["lock"]:
+        if state["jobs"] is None:
+            with context.activate(ctx):
+                strategies = ctx.config.PSI_STRATEGIES or ["mobile", "desktop"]
+                try:
+                    urls = targets(ctx)
+                except Exception as e:
+                    print(f"[psi] nie udało się pobrać próbki stron z sitemapy: {e}")
+                    urls = [ctx.root]
+                pool = _executor(ctx.config)
+                job = context.wrap(analyze)
+                state["jobs"] = {(u, s): pool.submit(job, u, s) for u in urls for s in strategies}
+            print(f"[psi] w tle: {len(state['jobs'])} zapytań ({len(urls)} stron × {len(strategies)} strategie), "
+                  f"równolegle: {ctx.config.PSI_CONCURRENCY}, limit: {ctx.config.PSI_RPM}/min")
+    return state["jobs"]
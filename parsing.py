@@ -0,0 +1,471 @@
+# parsing.py
+"""
+Parsery HTML za wspólnym API (podzbiór BeautifulSoup, którego używają checki):
+
+  select / select_one (CSS), find / find_all (nazwa, attrs, funkcja, href=True, ...),
+  get_text(sep, strip), .string, .title, .name, .attrs, get / [] / has_attr, str(tag).
+
+Backendy:
+  "lxml" — natywne drzewo lxml.html + cienkie wrappery, CSS tłumaczony do (cache'owanego) XPath,
+  "bs4"  — BeautifulSoup na lxml (kompatybilność; pełny CSS z soupsieve).
+
+Obsługiwany CSS w "lxml": tag, *, #id, .klasa, [a], [a=v], [a~=v], [a|=v], [a^=v], [a$=v], [a*=v]
+(z flagą ` i`), :not(prosty), :first-child, :last-child, kombinatory ` `, `>`, `+`, `~` i grupy `,`.
+"""
+import re
+from functools import lru_cache
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+import context
+
+BACKENDS = ("lxml", "bs4")
+
+# atrybuty, które BeautifulSoup zwraca jako listę (jak w bs4.builder.HTMLTreeBuilder)
+_MULTI_VALUED = {"class", "rel", "rev", "accept-charset", "headers", "accesskey", "dropzone"}
+# tekst z tych elementów nie wchodzi do get_text() przodków (jak Script/Stylesheet/TemplateString w bs4)
+_NON_TEXT = {"script", "style", "template"}
+# bs4 zamienia napisy z samych białych znaków na " " / "\n" — poza tymi elementami
+_PRESERVE_WS = {"pre", "textarea"}
+# serializacja jak str(tag) w bs4: puste elementy jako <br/>, treść script/style bez escapowania
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+         "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+         "nextid", "spacer"}
+_RAW_TEXT = {"script", "style"}
+# skróty tag.<nazwa> = tag.find(nazwa) (jak w bs4) — tylko dla tych nazw
+_TAG_SHORTCUTS = frozenset({"html", "head", "title", "body", "header", "footer", "main", "nav", "article",
+                            "aside", "h1", "form"})
+
+
+def get_backend() -> str:
+    """Parser bieżącego audytu (HTML_PARSER z jego configu; runner: --parser)."""
+    return context.current().config.HTML_PARSER
+
+
+def parse_html(data, encoding=None, backend=None):
+    """Drzewo dokumentu z bajtów (z `encoding`) albo str — w API zgodnym z BeautifulSoup."""
+    backend = backend or get_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"nieznany parser HTML: {backend}")
+    if backend == "bs4":
+        return BeautifulSoup(data, "lxml", from_encoding=encoding if isinstance(data, bytes) else None)
+    if isinstance(data, bytes):
+        parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    else:
+        parser = None
+    try:
+        root = lxml.html.document_fromstring(data, parser=parser)
+    except (etree.ParserError, ValueError):
+        root = lxml.html.document_fromstring("<html></html>")  # pusty/nieparsowalny dokument
+    return LxmlDocument(root)
+
+
+# --- Backend lxml ---
+
+def _is_element(el) -> bool:
+    return isinstance(el.tag, str)
+
+
+def _attr_value(name, value):
+    if name in _MULTI_VALUED:
+        return value.split()
+    return value
+
+
+def _ws(text, el):
+    """Napis tak, jak widzi go bs4 (białe znaki zwinięte, chyba że w <pre>/<textarea>)."""
+    if not text or text.strip():
+        return text
+    for node in el.iterancestors() if el.tag not in _PRESERVE_WS else (el,):
+        if node.tag in _PRESERVE_WS:
+            return text
+    return "\n" if "\n" in text else " "
+
+
+def comment_tails(node):
+    """
+    Teksty za komentarzami/PI, od `node` do najbliższego elementu — etree.iterwalk pomija
+    komentarze, więc kod chodzący po drzewie musi dołożyć je sam.
+    """
+    while node is not None and not _is_element(node):
+        if node.tail:
+            yield node.tail
+        node = node.getnext()
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _serialize(el, out):
+    tag = el.tag
+    if not isinstance(tag, str):
+        if tag is etree.Comment:
+            out.append(f"<!--{el.text or ''}-->")
+        return
+    parts = [tag]
+    for key in sorted(el.attrib):
+        value = el.attrib[key]
+        if key in _MULTI_VALUED:
+            value = " ".join(value.split())
+        value = _escape(value)
+        if '"' in value:
+            parts.append(f"{key}='{value}'" if "'" not in value else f'{key}="{value.replace(chr(34), "&quot;")}"')
+        else:
+            parts.append(f'{key}="{value}"')
+    if tag in _VOID and not len(el) and not el.text:
+        out.append("<" + " ".join(parts) + "/>")
+        return
+    out.append("<" + " ".join(parts) + ">")
+    raw = tag in _RAW_TEXT
+    if el.text:
+        out.append(el.text if raw else _escape(_ws(el.text, el)))
+    for child in el:
+        _serialize(child, out)
+        if child.tail:
+            out.append(_escape(_ws(child.tail, el)))
+    out.append(f"</{tag}>")
+
+
+def _match_value(expected, value):
+    """Dopasowanie wartości atrybutu jak w bs4 (True/None, str, lista, funkcja, regex)."""
+    if expected is True:
+        return value is not None
+    if expected is None or expected is False:
+        return value is None
+    if isinstance(value, list):
+        # bs4: pasuje pojedyncza wartość albo cały string wielowartościowego atrybutu
+        return any(_match_value(expected, v) for v in value) or _match_value(expected, " ".join(value))
+    if callable(expected) and not hasattr(expected, "search"):
+        return bool(expected(value))
+    if value is None:
+        return False
+    if hasattr(expected, "search"):
+        return expected.search(value) is not None
+    if isinstance(expected, (list, tuple, set)):
+        return value in expected
+    return value == expected
+
+
+class LxmlNode:
+    """Element lxml.html w API BeautifulSoup.Tag (tylko to, czego używają checki)."""
+
+    __slots__ = ("_el",)
+
+    def __init__(self, el):
+        self._el = el
+
+    # --- tożsamość / reprezentacja ---
+
+    def __eq__(self, other):
+        return isinstance(other, LxmlNode) and other._el is self._el
+
+    def __hash__(self):
+        return id(self._el)
+
+    def __bool__(self):
+        return True  # jak bs4.Tag — pusty element też jest „prawdziwy”
+
+    def __str__(self):
+        out = []
+        _serialize(self._el, out)
+        return "".join(out)
+
+    __repr__ = __str__
+
+    @property
+    def element(self):
+        """Surowy element lxml (dla kodu, który chodzi po drzewie sam, np. facts.py)."""
+        return self._el
+
+    # --- atrybuty ---
+
+    @property
+    def name(self):
+        return self._el.tag
+
+    @property
+    def attrs(self):
+        return {k: _attr_value(k, v) for k, v in self._el.attrib.items()}
+
+    def get(self, key, default=None):
+        value = self._el.get(key)
+        if value is None:
+            return default
+        return _attr_value(key, value)
+
+    def __getitem__(self, key):
+        value = self._el.get(key)
+        if value is None:
+            raise KeyError(key)
+        return _attr_value(key, value)
+
+    def has_attr(self, key):
+        return key in self._el.attrib
+
+    @property
+    def parent(self):
+        p = self._el.getparent()
+        return LxmlNode(p) if p is not None else None
+
+    # --- tekst ---
+
+    def _strings(self):
+        top = self._el
+        skipping = 0
+        for event, el in etree.iterwalk(top, events=("start", "end")):
+            element = _is_element(el)
+            if event == "start":
+                if el is not top and element and el.tag in _NON_TEXT:
+                    skipping += 1
+                    continue
+                if element and not skipping:
+                    if el.text:
+                        yield _ws(el.text, el)
+                    if len(el):
+                        for tail in comment_tails(el[0]):
+                            yield _ws(tail, el)
+            else:
+                if el is top:
+                    continue
+                if element and el.tag in _NON_TEXT:
+                    skipping -= 1
+                if not skipping:
+                    if el.tail:
+                        yield _ws(el.tail, el.getparent())
+                    for tail in comment_tails(el.getnext()):
+                        yield _ws(tail, el.getparent())
+
+    def get_text(self, separator="", strip=False):
+        strings = self._strings()
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    @property
+    def string(self):
+        el = self._el
+        children = [c for c in el]
+        if not children:
+            return _ws(el.text, el)
+        if len(children) == 1 and not el.text and not children[0].tail:
+            child = children[0]
+            if not _is_element(child):
+                return child.text
+            return LxmlNode(child).string
+        return None
+
+    # --- wyszukiwanie ---
+
+    def _candidates(self, name):
+        if isinstance(name, str):
+            return self._el.iterdescendants(name)
+        return (el for el in self._el.iterdescendants() if _is_element(el))
+
+    def _children(self):
+        return (el for el in self._el if _is_element(el))
+
+    def _matches(self, el, name, attrs):
+        if name is not None and name is not True and not isinstance(name, str):
+            if callable(name):
+                if not name(LxmlNode(el)):
+                    return False
+            elif el.tag not in name:
+                return False
+        for key, expected in attrs.items():
+            value = el.get(key)
+            if not _match_value(expected, _attr_value(key, value) if value is not None else None):
+                return False
+        return True
+
+    def find_all(self, name=None, attrs=None, recursive=True, limit=None, **kwargs):
+        attrs = dict(attrs or {})
+        if "class_" in kwargs:
+            kwargs["class"] = kwargs.pop("class_")
+        attrs.update(kwargs)
+        if recursive:
+            candidates = self._candidates(name)
+        else:
+            candidates = (el for el in self._children() if not isinstance(name, str) or el.tag == name)
+        found = []
+        for el in candidates:
+            if self._matches(el, name, attrs):
+                found.append(LxmlNode(el))
+                if limit and len(found) >= limit:
+                    break
+        return found
+
+    __call__ = find_all
+
+    def find(self, name=None, attrs=None, recursive=True, **kwargs):
+        found = self.find_all(name, attrs, recursive, limit=1, **kwargs)
+        return found[0] if found else None
+
+    def select(self, selector):
+        return [LxmlNode(el) for el in _css_xpath(selector, False)(self._el)]
+
+    def select_one(self, selector):
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def __getattr__(self, name):
+        # soup.title, soup.body, ... — pierwszy potomek o tej nazwie (jak w bs4); inne nazwy to
+        # API bs4, którego nie mamy (next_sibling, parents, ...) — błąd zamiast cichego None
+        if name not in _TAG_SHORTCUTS:
+            raise AttributeError(f"{type(self).__name__} nie obsługuje .{name} (backend lxml)")
+        return self.find(name)
+
+
+class LxmlDocument(LxmlNode):
+    """Cały dokument: wyszukiwanie obejmuje też <html> (jak BeautifulSoup na poziomie soup)."""
+
+    __slots__ = ()
+
+    def _candidates(self, name):
+        if isinstance(name, str):
+            return self._el.iter(name)
+        return (el for el in self._el.iter() if _is_element(el))
+
+    def _children(self):
+        return iter((self._el,))  # jedynym dzieckiem dokumentu jest <html>
+
+    def select(self, selector):
+        return [LxmlNode(el) for el in _css_xpath(selector, True)(self._el)]
+
+    @property
+    def name(self):
+        return "[document]"
+
+    def __str__(self):
+        doctype = self._el.getroottree().docinfo.doctype
+        return (doctype + "\n" if doctype else "") + super().__str__()
+
+
+# --- CSS -> XPath ---
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s*(?P<comb>[>+~,])\s*|\s+)
+  | (?P<tag>\*|[A-Za-z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s\]]+))\s*(?P<flag>[iIsS])?\s*)?\]
+  | :(?P<pseudo>not|first-child|last-child)(?:\((?P<arg>[^)]*)\))?
+""", re.X)
+
+_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _literal(s: str) -> str:
+    if "'" not in s:
+        return f"'{s}'"
+    if '"' not in s:
+        return f'"{s}"'
+    return "concat(" + ", \"'\", ".join(f"'{p}'" for p in s.split("'")) + ")"
+
+
+def _attr_predicate(m) -> str:
+    name, op = m.group("attr"), m.group("op")
+    attr = f"@{name}"
+    if not op:
+        return attr
+    value = m.group("dq") if m.group("dq") is not None else m.group("sq") if m.group("sq") is not None else m.group("bare")
+    if (m.group("flag") or "").lower() == "i":
+        attr = f"translate({attr}, '{_UPPER}', '{_LOWER}')"
+        value = value.lower()
+    v = _literal(value)
+    if op == "=":
+        return f"{attr} = {v}"
+    if op == "~=":
+        return f"contains(concat(' ', normalize-space({attr}), ' '), concat(' ', {v}, ' '))"
+    if op == "|=":
+        return f"({attr} = {v} or starts-with({attr}, concat({v}, '-')))"
+    if not value:
+        return "false()"  # [a^=""] itd. nie pasują do niczego (CSS)
+    if op == "^=":
+        return f"starts-with({attr}, {v})"
+    if op == "$=":
+        return f"substring({attr}, string-length({attr}) - string-length({v}) + 1) = {v}"
+    return f"contains({attr}, {v})"
+
+
+def _compound(text: str, pos: int):
+    """Parsuje prosty selektor od `pos`; zwraca (tag, [predykaty], nowa pozycja)."""
+    tag, preds = "*", []
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.group("ws") is not None:
+            break
+        pos = m.end()
+        if m.group("tag"):
+            tag = m.group("tag").lower()
+        elif m.group("id"):
+            preds.append(f"@id = {_literal(m.group('id'))}")
+        elif m.group("cls"):
+            preds.append(f"contains(concat(' ', normalize-space(@class), ' '), {_literal(' ' + m.group('cls') + ' ')})")
+        elif m.group("attr"):
+            preds.append(_attr_predicate(m))
+        elif m.group("pseudo") == "first-child":
+            preds.append("not(preceding-sibling::*)")
+        elif m.group("pseudo") == "last-child":
+            preds.append("not(following-sibling::*)")
+        elif m.group("pseudo") == "not":
+            inner_tag, inner, end = _compound(m.group("arg") or "", 0)
+            if end != len(m.group("arg") or ""):
+                raise ValueError(f"nieobsługiwany selektor w :not(): {m.group('arg')}")
+            if inner_tag != "*":
+                inner.insert(0, f"self::{inner_tag}")
+            preds.append("not(" + " and ".join(inner or ["true()"]) + ")")
+    return tag, preds, pos
+
+
+def _step(tag, preds):
+    return tag + "".join(f"[{p}]" for p in preds)
+
+
+@lru_cache(maxsize=512)
+def _css_xpath(selector: str, include_self: bool):
+    """Kompiluje selektor CSS do etree.XPath (wyniki w kolejności dokumentu, bez duplikatów)."""
+    text = selector.strip()
+    first_axis = "descendant-or-self::" if include_self else "descendant::"
+    paths, path, pos, axis = [], "", 0, first_axis
+    while pos < len(text):
+        tag, preds, end = _compound(text, pos)
+        if end == pos:
+            raise ValueError(f"nieobsługiwany selektor CSS: {selector!r} (pozycja {pos})")
+        if axis == "+":
+            # sąsiad bezpośrednio po: pierwszy następny element, o ile pasuje
+            step = "following-sibling::*[1]" + "".join(f"[{p}]" for p in ([f"self::{tag}"] if tag != "*" else []) + preds)
+        else:
+            step = axis + _step(tag, preds)
+        path += ("/" if path else "") + step
+        pos = end
+        if pos >= len(text):
+            break
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            # _compound zatrzymał się na czymś, czego nie znamy (np. :hover, :nth-child(2))
+            raise ValueError(f"nieobsługiwany selektor CSS: {selector!r} (pozycja {pos})")
+        pos = m.end()
+        comb = m.group("comb")
+        if comb == ",":
+            paths.append(path)
+            path, axis = "", first_axis
+        elif comb == ">":
+            axis = "child::"
+        elif comb == "~":
+            axis = "following-sibling::"
+        elif comb == "+":
+            axis = "+"
+        else:
+            axis = "descendant::"
+    if path:
+        paths.append(path)
+    return etree.XPath(" | ".join(paths))
@@ -0,0 +1,108 @@
+# plan.py
+"""
+Deklaratywny manifest zasobów checków i faza prefetch.
+
+Moduł checka może zdefiniować `resources(ctx) -> list[Resource]` (ten sam AuditContext,
+który dostaje `run`) oraz opcjonalnie `dynamic_requests(ctx) -> int` (albo stałą
+`DYNAMIC_REQUESTS`) — szacunek requestów, których URL-e poznajemy dopiero w trakcie
+(np. HEAD obrazków; funkcja bierze limity z ctx.config, więc liczą się nadpisania audytu).
+Runner skleja z tego jeden zdeduplikowany plan, drukuje szacunek i pobiera go równolegle
+do cache odpowiedzi.
+Resource(head_only=True) = checkowi wystarcza <head> strony (fetch(..., head_only=True)).
+"""
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import context
+from utils import fetch, get_document
+
+Resource = namedtuple("Resource", "url method allow_redirects dom head_only", defaults=("GET", True, True, False))
+
+
+def _module(fn):
+    return sys.modules.get(getattr(fn, "__module__", ""), None)
+
+
+def _dynamic(mod, ctx) -> int:
+    hook = getattr(mod, "dynamic_requests", None)
+    if hook is None:
+        return getattr(mod, "DYNAMIC_REQUESTS", 0)
+    try:
+        return hook(ctx)
+    except Exception:
+        return 0
+
+
+def build_plan(ctx, checks, uses_crawl=False):
+    """
+    checks – lista (name, fn) checków audytu `ctx` (fn(ctx) jak w runnerze).
+    Zwraca dict: resources (zdeduplikowane, z listą checków), dynamic, crawl_pages.
+    """
+    merged = {}
+    dynamic = 0
+    for name, fn in checks:
+        mod = _module(fn)
+        declare = getattr(mod, "resources", None)
+        dynamic += _dynamic(mod, ctx)
+        if not declare:
+            continue
+        try:
+            declared = declare(ctx)
+        except Exception:
+            continue
+        for res in declared:
+            key = (res.method.upper(), res.url, bool(res.allow_redirects), bool(res.head_only))
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {"resource": res, "checks": [name]}
+            else:
+                entry["checks"].append(name)
+                if res.dom and not entry["resource"].dom:
+                    entry["resource"] = entry["resource"]._replace(dom=True)
+    return {
+        "resources": list(merged.values()),
+        "dynamic": dynamic,
+        "crawl_pages": ctx.config.CRAWL_LIMIT if uses_crawl else 0,
+    }
+
+
+def estimate(plan) -> dict:
+    cfg = context.current().config
+    declared = len(plan["resources"])
+    declared_bytes = sum(
+        cfg.PLAN_HEAD_BYTES if e["resource"].method.upper() == "HEAD"
+        else cfg.PLAN_HEAD_ONLY_BYTES if e["resource"].head_only else cfg.PLAN_PAGE_BYTES
+        for e in plan["resources"]
+    )
+    requests_total = declared + plan["dynamic"] + plan["crawl_pages"]
+    bytes_total = declared_bytes + plan["dynamic"] * cfg.PLAN_HEAD_BYTES + plan["crawl_pages"] * cfg.PLAN_PAGE_BYTES
+    return {"declared": declared, "requests": requests_total, "bytes": bytes_total}
+
+
+def print_plan(plan, details=False):
+    est = estimate(plan)
+    print(f"[PLAN] zadeklarowane zasoby: {est['declared']}, dynamiczne: ~{plan['dynamic']}, "
+          f"crawl: do {plan['crawl_pages']} stron")
+    print(f"[PLAN] szacunek: ~{est['requests']} requestów, ~{est['bytes'] / 1_000_000:.1f} MB")
+    if details:
+        for e in plan["resources"]:
+            r = e["resource"]
+            flags = ("DOM" if r.dom else "") + (" head-only" if r.head_only else "") + ("" if r.allow_redirects else " no-redirect")
+            print(f"  {r.method:<4} {r.url} {flags.strip()} <- {', '.join(e['checks'])}")
+
+
+def prefetch(plan, workers=None):
+    """Pobiera cały plan równolegle (i parsuje to, co wymaga DOM). Błędy zostawiamy checkom."""
+    workers = workers or context.current().config.PREFETCH_WORKERS
+    def _one(res):
+        try:
+            r = fetch(res.url, method=res.method, allow_redirects=res.allow_redirects, head_only=res.head_only)
+            if res.dom:
+                get_document(r).soup
+        except Exception:
+            pass
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(context.wrap(_one), [e["resource"] for e in plan["resources"]]))
+    print(f"[prefetch] pobrano {len(plan['resources'])} zasobów z planu")
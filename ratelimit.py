@@ -0,0 +1,242 @@
+# ratelimit.py
+"""
+Warstwa „grzeczności” wobec serwera — każdy request z utils.fetch i sitemaps przechodzi tędy.
+
+Per host:
+  * token bucket (RATE_PER_HOST req/s, RATE_BURST naraz),
+  * Crawl-delay z robots.txt (odstęp między requestami, wtedy po jednym naraz),
+  * Retry-After przy 429/503 — host wstrzymany, request ponowiony (RATE_RETRIES razy),
+  * adaptacyjna równoległość (AIMD): +1/limit za każdą szybką, poprawną odpowiedź,
+    połowa przy błędach/429/5xx, lekkie cięcie gdy czas odpowiedzi rośnie ponad
+    RATE_LATENCY_FACTOR × najlepszy zaobserwowany.
+
+Limitery są wspólne dla procesu — równoległe audyty tej samej domeny dzielą jeden limit.
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import context
+import metrics
+from config import (
+    DEFAULT_HEADERS, RATE_PER_HOST, RATE_BURST, RATE_START_CONCURRENCY, RATE_MAX_CONCURRENCY,
+    RATE_LATENCY_FACTOR, RATE_RETRIES, RATE_MAX_RETRY_AFTER, RATE_MAX_CRAWL_DELAY,
+)
+
+_OVERLOAD_STATUSES = (429, 503)
+_ERROR_STATUSES = (500, 502, 504)
+
+_hosts = {}
+_lock = threading.Lock()
+_robots_loader = None
+
+
+class HostLimiter:
+    def __init__(self, host: str):
+        self.host = host
+        self.rate = float(RATE_PER_HOST)
+        self.burst = float(RATE_BURST)
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.limit = float(RATE_START_CONCURRENCY)
+        self.max_limit = float(RATE_MAX_CONCURRENCY)
+        self.active = 0
+        self.blocked_until = 0.0
+        self.crawl_delay = None
+        self.ewma = None       # średni czas do nagłówków odpowiedzi
+        self.best = None       # najlepszy zaobserwowany czas (punkt odniesienia)
+        self.last_cut = 0.0
+        self.cond = threading.Condition()
+        self.robots_lock = threading.Lock()
+        self.robots_loaded = False
+
+    # --- wejście/wyjście requestu ---
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def acquire(self):
+        t0 = time.monotonic()
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.active >= int(self.limit):
+                    wait = None  # czekamy na zwolnienie slotu
+                elif now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.active += 1
+                    break
+                self.cond.wait(wait)
+        waited = time.monotonic() - t0
+        if waited > 0.001:
+            metrics.incr("ratelimit.wait_seconds", waited)
+
+    def release(self, latency=None, status=None, error=False):
+        now = time.monotonic()
+        with self.cond:
+            self.active -= 1
+            if error or status in _OVERLOAD_STATUSES or status in _ERROR_STATUSES:
+                self._cut(now, 0.5)
+            elif latency is not None:
+                self.ewma = latency if self.ewma is None else 0.8 * self.ewma + 0.2 * latency
+                self.best = latency if self.best is None else min(self.best, latency)
+                if self.ewma > self.best * RATE_LATENCY_FACTOR and self.ewma > 0.05:
+                    self._cut(now, 0.75)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+    def _cut(self, now, factor):
+        # najwyżej jedno cięcie na „okno” (ok. jeden czas odpowiedzi) — seria błędów z tej samej fali
+        if now - self.last_cut < max(self.ewma or 0, 0.2):
+            return
+        self.limit = max(1.0, self.limit * factor)
+        self.last_cut = now
+        metrics.incr("ratelimit.decreases")
+
+    def pause(self, seconds: float):
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.cond.notify_all()
+
+    def set_crawl_delay(self, seconds: float):
+        seconds = min(seconds, RATE_MAX_CRAWL_DELAY)
+        if seconds <= 0:
+            return
+        with self.cond:
+            self.crawl_delay = seconds
+            self.rate = min(self.rate, 1.0 / seconds)
+            self.burst = 1.0
+            self.tokens = min(self.tokens, 1.0)
+            self.limit = self.max_limit = 1.0
+            self.cond.notify_all()
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def limiter(url: str) -> HostLimiter:
+    host = _host(url)
+    context.current().state("ratelimit.hosts", lambda c: set()).add(host)  # host_stats() per audyt
+    with _lock:
+        lim = _hosts.get(host)
+        if lim is None:
+            lim = _hosts[host] = HostLimiter(host)
+    return lim
+
+
+def set_robots_loader(fn):
+    """fn(url) -> odpowiedź z robots.txt dla hosta z `url` (rejestruje utils, żeby szło przez cache)."""
+    global _robots_loader
+    _robots_loader = fn
+
+
+def parse_crawl_delay(text: str, user_agent: str = DEFAULT_HEADERS.get("User-Agent", "")):
+    """Crawl-delay z grupy pasującej do naszego UA, a jeśli brak — z grupy `*`."""
+    token = user_agent.split("/", 1)[0].lower()
+    agents, in_rules = [], False
+    ours = star = None
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = (p.strip() for p in line.split(":", 1))
+        key = key.lower()
+        if key == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+            continue
+        in_rules = True
+        if key != "crawl-delay":
+            continue
+        try:
+            delay = float(value)
+        except ValueError:
+            continue
+        if token and any(a != "*" and a in token for a in agents):
+            ours = delay
+        elif "*" in agents and star is None:
+            star = delay
+    return ours if ours is not None else star
+
+
+def _load_robots(lim: HostLimiter, url: str):
+    if lim.robots_loaded or _robots_loader is None or urlsplit(url).path == "/robots.txt":
+        return
+    with lim.robots_lock:
+        if lim.robots_loaded:
+            return
+        try:
+            r = _robots_loader(url)
+            if r.status_code == 200:
+                delay = parse_crawl_delay(r.text)
+                if delay:
+                    lim.set_crawl_delay(delay)
+        except Exception:
+            pass
+        lim.robots_loaded = True
+
+
+def retry_after(r):
+    """Sekundy z nagłówka Retry-After (liczba albo data HTTP) albo None."""
+    value = (r.headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def send(url: str, request):
+    """Wykonuje `request()` w limitach hosta z `url`; przy 429/503 czeka (Retry-After) i ponawia."""
+    lim = limiter(url)
+    _load_robots(lim, url)
+    for attempt in range(RATE_RETRIES + 1):
+        lim.acquire()
+        t0 = time.monotonic()
+        try:
+            r = request()
+        except Exception:
+            lim.release(error=True)
+            raise
+        elapsed = getattr(r, "elapsed", None)
+        lim.release(elapsed.total_seconds() if elapsed else time.monotonic() - t0, r.status_code)
+        if r.status_code not in _OVERLOAD_STATUSES or attempt == RATE_RETRIES:
+            return r
+        delay = retry_after(r)
+        if delay is None:
+            delay = 2 ** attempt
+        if delay > RATE_MAX_RETRY_AFTER:
+            return r  # serwer każe czekać dłużej niż jesteśmy gotowi — oddajemy odpowiedź checkowi
+        metrics.incr("ratelimit.retries")
+        lim.pause(delay)
+        r.close()
+    return r
+
+
+def host_stats() -> dict:
+    """Stan limiterów hostów bieżącego audytu, które odpowiedziały: host -> {limit, crawl_delay, avg_latency}."""
+    used = context.current().state("ratelimit.hosts", lambda c: set())
+    with _lock:
+        hosts = {h: lim for h, lim in _hosts.items() if h in used}
+    return {
+        h: {
+            "limit": round(lim.limit, 1),
+            "crawl_delay": lim.crawl_delay,
+            "avg_latency": round(lim.ewma, 3) if lim.ewma is not None else None,
+        }
+        for h, lim in hosts.items()
+        if lim.ewma is not None or lim.crawl_delay
+    }
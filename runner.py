@@ -2,7 +2,17 @@ import argparse, json, sys, time, os
 from urllib.parse import urlsplit, urlunsplit
 from datetime import datetime
 
-from checks import ALL_CHECKS
+from checks import ALL_CHECKS, STAGES, CHECK_DEPENDS
+import context
+import crawl
+import parsing
+import ratelimit
+import http_cache
+import metrics
+from config import CHECK_WORKERS
+from http_client import connection_stats
+from plan import build_plan, print_plan, prefetch
+from scheduler import run_tasks
 
 try:
     from gsheet_sync import batch_set_results 
@@ -33,61 +43,172 @@ def _comment_from_res(res: dict) -> str:
     )
 
 
-def main():
-    ap = argparse.ArgumentParser(description="SEO Checker MVP")
-    ap.add_argument("domain_or_url", help="np. example.com albo https://example.com/")
+def add_audit_args(ap):
+    """Opcje audytu wspólne dla runner.py i batch.py."""
     ap.add_argument("--pretty", action="store_true", help="ładny JSON na końcu")
-    args = ap.parse_args()
+    ap.add_argument("--workers", type=int, default=CHECK_WORKERS, help="ile checków równolegle (1 = po kolei)")
+    ap.add_argument("--no-cache", action="store_true", help="nie używaj cache HTTP na dysku (pobierz wszystko od nowa)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="crawl przyrostowy: pomiń strony bez zmian (indeks w reports/<domena>/index.json)")
+    ap.add_argument("--crawl-backend", choices=crawl.BACKENDS, default=None,
+                    help="silnik pobierania stron w crawlu (domyślnie CRAWL_BACKEND z config.py)")
+    ap.add_argument("--crawl-mode", choices=crawl.MODES, default=None,
+                    help="skąd strony crawla: sitemapy albo linki od strony głównej (domyślnie CRAWL_MODE z config.py)")
+    ap.add_argument("--parser", choices=parsing.BACKENDS, default=None,
+                    help="parser HTML (domyślnie HTML_PARSER z config.py)")
+
+
+def exit_code(results) -> int:
+    """0 = wszystko PASS/SKIP, 1 = WARN, 2 = FAIL, 3 = ERROR (najgorszy status wygrywa)."""
+    code = 0
+    for r in results:
+        st = r.get("status")
+        if st == "WARN" and code < 1:
+            code = 1
+        elif st == "FAIL" and code < 2:
+            code = 2
+        elif st == "ERROR" and code < 3:
+            code = 3
+    return code
+
+
+def audit(domain_or_url, workers=CHECK_WORKERS, pretty=False, no_cache=False, incremental=False,
+          crawl_backend=None, crawl_mode=None, parser=None, dry_run=False, sheets=True, overrides=None,
+          report_tag=None):
+    """
+    Jeden pełny audyt domeny (log na stdout, raport JSON w reports/<domena>/).
+    overrides = {NAZWA: wartość} nadpisania config.py tylko dla tego audytu; opcje no_cache,
+    incremental, crawl_backend, crawl_mode i parser to skróty na nadpisania odpowiednich ustawień.
+    report_tag = dopisek do nazwy pliku raportu (np. id joba demona).
+    Zwraca (wyniki checków, ścieżka raportu); przy dry_run (None, None).
+    """
+    overrides = dict(overrides or {})
+    if no_cache:
+        overrides["HTTP_CACHE_ENABLED"] = False
+    if incremental:
+        overrides["CRAWL_INCREMENTAL"] = True
+    if crawl_backend:
+        overrides["CRAWL_BACKEND"] = crawl_backend
+    if crawl_mode:
+        overrides["CRAWL_MODE"] = crawl_mode
+    if parser:
+        overrides["HTML_PARSER"] = parser
+
+    ctx = context.AuditContext(domain_or_url, root=ensure_root(domain_or_url), overrides=overrides)
+    with context.activate(ctx):
+        return _run_audit(ctx, workers, pretty, dry_run, sheets, report_tag)
+
+
+def _new_report(output_dir, domain, tag=None):
+    """
+    Tworzy pusty plik raportu <domena>_<data>[_<tag>].json i zwraca jego ścieżkę; gdy taki już jest
+    (inny audyt tej domeny skończył w tej samej minucie) — z dopiskiem -2, -3, ... Plik powstaje
+    od razu (tryb "x"), więc równoległe audyty nie dostaną tej samej ścieżki.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    base = f"{domain}_{datetime.now().strftime('%Y-%m-%d_%H-%M')}" + (f"_{tag}" if tag else "")
+    n = 1
+    while True:
+        fname = os.path.join(output_dir, base + (f"-{n}" if n > 1 else "") + ".json")
+        try:
+            with open(fname, "x", encoding="utf-8"):
+                return fname
+        except FileExistsError:
+            n += 1
 
-    nossl_root = args.domain_or_url
-    root = ensure_root(args.domain_or_url)
+
+def _run_audit(ctx, workers, pretty, dry_run, sheets, report_tag=None):
+    root = ctx.root
     print(f"[START] Audyt domeny: {root}\n")
 
-    results = []
-    total = len(ALL_CHECKS)
+    domain = urlsplit(root).netloc
+    # katalog bazowy + katalog domeny
+    output_dir = ctx.output_dir
+    conn_start = connection_stats()  # sesja HTTP jest wspólna dla procesu — liczymy przyrost
 
-    for i, (check_name, check_fn) in enumerate(ALL_CHECKS, start=1):
-        print(f"[{i}/{total}] RUN {check_name} ...", end="", flush=True)
-        t0 = time.time()
-        try:
-            if check_name == "redirects_core":
-                res = check_fn(nossl_root)
-            else:
-                res = check_fn(root)
-        except Exception as e:
-            res = {"name": check_name, "status": "ERROR", "error": str(e)}
-        dt = time.time() - t0
+    def _bind(check_fn):
+        return lambda: check_fn(ctx)
+
+    plan = build_plan(
+        ctx, ALL_CHECKS,
+        uses_crawl=any("crawl" in deps for deps in CHECK_DEPENDS.values()),
+    )
+    print_plan(plan, details=dry_run)
+    if dry_run:
+        return None, None
+    print()
 
+    total = len(ALL_CHECKS)
+    results = [None] * total
+    timings = {}
+
+    def _report(i, check_name, res, err, dt, output):
+        if err is not None:
+            res = {"name": check_name, "status": "ERROR", "error": str(err)}
         res.setdefault("name", check_name)
-        results.append(res)
+        results[i] = res
+        timings[check_name] = dt
 
         icon = STATUS_ICON.get(res.get("status", "ERROR"), "")
+        print(f"[{i + 1}/{total}] RUN {check_name} ...{output}", end="")
         print(f" -> {icon} {res.get('status')} ({dt:.2f}s)")
 
+    t_start = time.time()
+    run_tasks(
+        [(name, _bind(fn)) for name, fn in ALL_CHECKS],
+        stages=[(name, _bind(fn)) for name, fn in STAGES] + [("prefetch", lambda: prefetch(plan))],
+        depends=CHECK_DEPENDS,
+        workers=workers,
+        on_result=_report,
+    )
+    wall = time.time() - t_start
+    print(f"\n[TIME] czas audytu: {wall:.2f}s (suma czasów checków: {sum(timings.values()):.2f}s, wątki: {workers})")
+
     print("\n[RESULTS] Podsumowanie:")
     for r in results:
         icon = STATUS_ICON.get(r.get("status", ""), "")
         print(f" - {icon} {r['name']}: {r['status']}")
 
     # JSON OUTPUT
-    json_str = json.dumps(results, indent=2 if args.pretty else None, ensure_ascii=False)
+    json_str = json.dumps(results, indent=2 if pretty else None, ensure_ascii=False)
     print("\n[JSON OUTPUT]")
     print(json_str)
 
     # 🔹 Zapis do pliku z nazwą domeny + timestamp
-    domain = urlsplit(root).netloc
-    now_str = datetime.now().strftime("%Y-%m-%d_%H-%M")
-    # katalog bazowy + katalog domeny
-    output_dir = os.path.join("reports", domain)
-    os.makedirs(output_dir, exist_ok=True)
-    fname = os.path.join(output_dir, f"{domain}_{now_str}.json")
+    fname = _new_report(output_dir, domain, report_tag)
     with open(fname, "w", encoding="utf-8") as f:
         f.write(json_str)
 
     print(f"\n✅ Raport zapisany do pliku: {fname}")
 
+    conn = connection_stats()
+    requests_n = conn["requests"] - conn_start["requests"]
+    opened = conn["opened"] - conn_start["opened"]
+    print(f"[HTTP] requesty: {requests_n}, połączenia otwarte: {opened}, "
+          f"ponownie użyte: {max(requests_n - opened, 0)} (hosty: {conn['hosts']})")
+    stats = metrics.snapshot()
+    for host, hs in ratelimit.host_stats().items():
+        delay = f", crawl-delay={hs['crawl_delay']}s" if hs["crawl_delay"] else ""
+        print(f"[RATE] {host}: równoległość={hs['limit']}, śr. odpowiedź={hs['avg_latency']}s{delay}")
+    print(f"[RATE] czekanie={stats.get('ratelimit.wait_seconds', 0):.1f}s, "
+          f"ponowienia (429/503)={stats.get('ratelimit.retries', 0)}, cięcia równoległości={stats.get('ratelimit.decreases', 0)}")
+    print(f"[CACHE] odpowiedzi: pobrane={stats.get('response_cache.misses', 0)}, "
+          f"z cache={stats.get('response_cache.hits', 0)}, współdzielone={stats.get('response_cache.shared', 0)}")
+    if http_cache.is_enabled():
+        print(f"[CACHE] dysk: 304={stats.get('http_cache.revalidated', 0)}, świeże={stats.get('http_cache.fresh', 0)}, "
+              f"zapisane={stats.get('http_cache.stored', 0)}, usunięte={stats.get('http_cache.evicted', 0)}")
+    print(f"[CACHE] dokumenty: sparsowane={stats.get('documents.parsed', 0)}, "
+          f"z cache={stats.get('documents.hits', 0)}, czas parsowania={stats.get('documents.parse_seconds', 0):.2f}s, "
+          f"PageFacts={stats.get('documents.facts', 0)} ({stats.get('documents.facts_seconds', 0):.2f}s)")
+    if stats.get("head_only.partial") or stats.get("head_only.fallback"):
+        print(f"[HEAD-ONLY] pobrane same <head>: {stats.get('head_only.partial', 0)} "
+              f"({stats.get('head_only.bytes', 0) / 1024:.0f} KB), pełne pobranie (zepsuty head): {stats.get('head_only.fallback', 0)}")
+    sources = ("header", "bom", "meta", "utf8", "detected")
+    print(f"[CHARSET] " + ", ".join(f"{s}={stats.get('charset.' + s, 0)}" for s in sources)
+          + f", czas wykrywania kodowania={stats.get('charset.sniff_seconds', 0):.3f}s (dekodowanie: w czasie parsowania)")
+
     # Google sheet
-    if _HAS_SHEETS:
+    if sheets and _HAS_SHEETS:
         try:
             sheet_payload = []
             for r in results:
@@ -101,21 +222,23 @@ def main():
             print("🟢 Zaktualizowano Google Sheet (Stan/Data/Komentarz/JSON).")
         except Exception as e:
             print(f"⚪️ Pominięto aktualizację Google Sheet: {e}")
-    else:
+    elif sheets:
         print("ℹ️ Google Sheets pominięty (brak importu gsheets_simple).")
 
+    return results, fname
 
-    # exit code
-    code = 0
-    for r in results:
-        st = r.get("status")
-        if st == "WARN" and code < 1:
-            code = 1
-        elif st == "FAIL" and code < 2:
-            code = 2
-        elif st == "ERROR" and code < 3:
-            code = 3
-    sys.exit(code)
+
+def main():
+    ap = argparse.ArgumentParser(description="SEO Checker MVP")
+    ap.add_argument("domain_or_url", help="np. example.com albo https://example.com/")
+    add_audit_args(ap)
+    ap.add_argument("--dry-run", action="store_true", help="tylko pokaż plan pobrań (requesty/bajty) i zakończ")
+    args = ap.parse_args()
+
+    results, _ = audit(args.domain_or_url, workers=args.workers, pretty=args.pretty, no_cache=args.no_cache,
+                       incremental=args.incremental, crawl_backend=args.crawl_backend, crawl_mode=args.crawl_mode,
+                       parser=args.parser, dry_run=args.dry_run)
+    sys.exit(exit_code(results) if results is not None else 0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,146 @@
+# scheduler.py
+"""
+Równoległe uruchamianie checków na ograniczonej puli wątków, z zależnościami
+(np. checki crawlowe czekają na wspólny etap "crawl").
+
+Wyjście konsoli i kolejność wyników są deterministyczne: to, co check wypisze
+w trakcie działania, jest buforowane per wątek i drukowane razem z jego linią
+statusu, w kolejności ALL_CHECKS.
+
+Zadania działają w kontekście audytu, który wywołał run_tasks (context.wrap).
+"""
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import context
+
+
+class _ThreadLocalStdout:
+    """Proxy na sys.stdout: jeśli wątek ma ustawiony bufor, print trafia do niego."""
+
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def write(self, s):
+        buf = getattr(self.local, "buf", None)
+        return (buf or self.real).write(s)
+
+    def flush(self):
+        if getattr(self.local, "buf", None) is None:
+            self.real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+# jeden proxy na proces — równoległe audyty (wątki) dzielą go, ostatni przywraca sys.stdout
+_proxy = None
+_proxy_users = 0
+_proxy_lock = threading.Lock()
+
+
+def _acquire_proxy():
+    global _proxy, _proxy_users
+    with _proxy_lock:
+        if _proxy_users == 0:
+            _proxy = _ThreadLocalStdout(sys.stdout)
+            sys.stdout = _proxy
+        _proxy_users += 1
+        return _proxy
+
+
+def _release_proxy():
+    global _proxy, _proxy_users
+    with _proxy_lock:
+        _proxy_users -= 1
+        if _proxy_users == 0:
+            sys.stdout = _proxy.real
+            _proxy = None
+
+
+def _timed(proxy, fn):
+    def task():
+        proxy.local.buf = io.StringIO()
+        t0 = time.time()
+        try:
+            res = fn()
+            err = None
+        except Exception as e:
+            res, err = None, e
+        dt = time.time() - t0
+        out = proxy.local.buf.getvalue()
+        proxy.local.buf = None
+        return res, err, dt, out
+    return task
+
+
+def run_tasks(tasks, stages=(), depends=None, workers=4, on_result=None):
+    """
+    tasks   – lista (name, fn) w docelowej kolejności wyników
+    stages  – lista (name, fn) etapów wspólnych; ich wynik nie trafia do raportu
+    depends – {name: (nazwy etapów/tasków, na które trzeba poczekać)}
+    on_result(index, name, res, err, dt, output) – wołane w kolejności `tasks`
+
+    Zwraca listę (res, err, dt) w kolejności `tasks`.
+    """
+    depends = depends or {}
+    all_fns = dict(stages)
+    all_fns.update(tasks)
+    order = [name for name, _ in tasks]
+    stage_names = [name for name, _ in stages]
+
+    waiting = {name: {d for d in depends.get(name, ()) if d in all_fns} for name in all_fns}
+    dependents = {name: [] for name in all_fns}
+    for name, deps in waiting.items():
+        for d in deps:
+            dependents[d].append(name)
+
+    done = {}
+    printed_stages = set()
+    next_to_emit = 0
+
+    proxy = _acquire_proxy()
+    real_stdout = proxy.real
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            running = {}
+
+            def submit_ready(names):
+                for name in names:
+                    if not waiting[name] and name not in done and name not in running.values():
+                        running[pool.submit(context.wrap(_timed(proxy, all_fns[name])))] = name
+
+            # etapy najpierw, potem checki w kolejności raportu
+            submit_ready(stage_names + order)
+
+            while running:
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    done[name] = fut.result()
+                    for dep in dependents[name]:
+                        waiting[dep].discard(name)
+                    submit_ready(dependents[name])
+
+                # emituj wyniki w kolejności, gdy prefiks jest gotowy
+                while next_to_emit < len(order) and order[next_to_emit] in done:
+                    name = order[next_to_emit]
+                    for st in depends.get(name, ()):
+                        if st in stage_names and st in done and st not in printed_stages:
+                            printed_stages.add(st)
+                            real_stdout.write(done[st][3])
+                    if on_result:
+                        res, err, dt, out = done[name]
+                        on_result(next_to_emit, name, res, err, dt, out)
+                    next_to_emit += 1
+    finally:
+        _release_proxy()
+
+    for st in stage_names:
+        if st in done and st not in printed_stages:
+            real_stdout.write(done[st][3])
+    return [done[name][:3] for name in order]
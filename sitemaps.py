@@ -0,0 +1,186 @@
+# sitemaps.py
+"""
+Strumieniowy silnik sitemap: iterparse (elementy czyszczone na bieżąco), gzip w locie
+(.xml.gz i Content-Encoding), równoległe pobieranie sitemap-dzieci z indeksu
+i globalny budżet URL-i z wcześniejszym przerwaniem pobierania.
+
+Kolejność wyników jest deterministyczna (kolejność z indeksu), a pamięć ograniczona:
+każda sitemapa ma własną kolejkę o stałym rozmiarze, a naraz działa najwyżej
+SITEMAP_WORKERS producentów na poziom indeksu.
+"""
+import gzip
+import io
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from collections import deque
+
+import context
+import ratelimit
+from http_client import get_session
+
+_END = object()
+_BATCH = 200  # wpisy przekazujemy paczkami — mniej przełączeń między wątkami
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _RawStream(io.RawIOBase):
+    """Adapter na urllib3 response: po końcu treści zwraca b"" zamiast błędu zamkniętego pliku."""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._raw.closed:
+            return 0
+        data = self._raw.read(len(b), decode_content=True)
+        n = len(data)
+        b[:n] = data
+        return n
+
+
+def _open(url: str):
+    """Otwiera odpowiedź strumieniowo; zwraca (response, plik-do-czytania) albo (response, None)."""
+    cfg = context.current().config
+    r = ratelimit.send(url, lambda: get_session().get(url, headers=cfg.DEFAULT_HEADERS, timeout=cfg.REQUEST_TIMEOUT,
+                                                      stream=True))
+    if r.status_code != 200:
+        return r, None
+    # decode_content: Content-Encoding gzip/deflate rozpakowuje urllib3
+    stream = io.BufferedReader(_RawStream(r.raw), buffer_size=64 * 1024)
+    if stream.peek(2)[:2] == _GZIP_MAGIC:  # plik .xml.gz
+        stream = gzip.GzipFile(fileobj=stream)
+    return r, stream
+
+
+def _put(q, item, stop) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(url, q, stop):
+    """Parsuje jedną sitemapę i wrzuca do kolejki paczki ("url"|"sitemap", loc, lastmod)."""
+    r = None
+    batch = []
+    try:
+        r, stream = _open(url)
+        if stream is None:
+            return
+        root = None
+        for event, el in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = el
+                continue
+            kind = _local(el.tag)
+            if kind not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in el:
+                name = _local(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = (child.text or "").strip() or None
+            el.clear()
+            root.clear()
+            if loc:
+                batch.append((kind, loc, lastmod))
+                if len(batch) >= _BATCH:
+                    if not _put(q, batch, stop):
+                        return
+                    batch = []
+    except Exception:
+        pass
+    finally:
+        if r is not None:
+            r.close()
+        if batch:
+            _put(q, batch, stop)
+        _put(q, _END, stop)
+
+
+def _stream(urls, stop, seen, depth):
+    cfg = context.current().config
+    pending = deque()
+    todo = iter(urls)
+
+    def start_next():
+        for u in todo:
+            if u in seen:
+                continue
+            seen.add(u)
+            q = queue.Queue(maxsize=max(2, cfg.SITEMAP_QUEUE_SIZE // _BATCH))
+            threading.Thread(target=context.wrap(_produce), args=(u, q, stop), daemon=True).start()
+            pending.append(q)
+            return True
+        return False
+
+    for _ in range(max(1, cfg.SITEMAP_WORKERS)):
+        if not start_next():
+            break
+
+    while pending and not stop.is_set():
+        q = pending.popleft()
+        children = []
+        while True:
+            batch = q.get()
+            if batch is _END:
+                break
+            for kind, loc, lastmod in batch:
+                if kind == "sitemap":
+                    children.append(loc)
+                else:
+                    yield loc, lastmod
+        start_next()
+        if children and depth < cfg.SITEMAP_MAX_DEPTH:
+            yield from _stream(children, stop, seen, depth + 1)
+
+
+def iter_sitemap_entries(sitemap_urls, limit=None):
+    """
+    Generator par (loc, lastmod) ze wszystkich podanych sitemap (indeksy rozwijane rekurencyjnie).
+    `limit` to globalny budżet — po jego osiągnięciu (lub zamknięciu generatora)
+    pobieranie pozostałych sitemap jest przerywane.
+    """
+    stop = threading.Event()
+    count = 0
+    try:
+        if limit is not None and limit <= 0:
+            return
+        for loc, lastmod in _stream(list(sitemap_urls), stop, set(), 0):
+            yield loc, lastmod
+            count += 1
+            if limit is not None and count >= limit:
+                return
+    finally:
+        stop.set()
+
+
+def looks_like_sitemap(url: str) -> bool:
+    """Czyta tylko początek pliku (z dekompresją), zamiast pobierać całą sitemapę."""
+    r = None
+    try:
+        r, stream = _open(url)
+        if stream is None:
+            return False
+        head = stream.read(4096)
+        return b"<urlset" in head or b"<sitemapindex" in head
+    except Exception:
+        return False
+    finally:
+        if r is not None:
+            r.close()
+
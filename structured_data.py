@@ -0,0 +1,91 @@
+# structured_data.py
+"""
+Indeks JSON-LD dokumentu: każdy blok <script type="application/ld+json"> dekodowany raz
+(z PageFacts.jsonld), @graph i zagnieżdżone węzły spłaszczone, referencje {"@id": ...}
+rozwiązywane przez resolve(). Checki pytają o węzły po typie zamiast parsować JSON same.
+
+Typy porównujemy po nazwie krótkiej: "https://schema.org/FAQPage" i "FAQPage" to ten sam typ.
+"""
+import json
+
+
+def short_type(t) -> str:
+    t = str(t)
+    if "://" in t or t.startswith("schema:"):
+        return t.rstrip("/").rsplit("/", 1)[-1].split(":")[-1]
+    return t
+
+
+def _types(node):
+    t = node.get("@type")
+    if isinstance(t, list):
+        return [x for x in t if x]
+    return [t] if t else []
+
+
+class StructuredData:
+    """Węzły JSON-LD strony: roots (najwyższy poziom i @graph), nodes (wszystkie), indeksy po typie i @id."""
+
+    def __init__(self, blocks=()):
+        self.roots = []
+        self.nodes = []
+        self.errors = 0
+        self._by_type = {}
+        self._by_id = {}
+        for raw in blocks:
+            try:
+                data = json.loads(raw)
+            except Exception:
+                self.errors += 1
+                continue
+            self._add_roots(data)
+
+    def _add_roots(self, data):
+        if isinstance(data, list):
+            for item in data:
+                self._add_roots(item)
+        elif isinstance(data, dict):
+            if _types(data) or "@graph" not in data:  # sam kontener {"@context", "@graph"} nie jest węzłem
+                self.roots.append(data)
+            self._walk(data)  # członkowie @graph trafiają do roots przez _walk
+
+    def _walk(self, node):
+        if _types(node) or ("@id" in node and len(node) > 1):
+            self.nodes.append(node)
+            for t in _types(node):
+                self._by_type.setdefault(short_type(t), []).append(node)
+            node_id = node.get("@id")
+            if isinstance(node_id, str) and (node_id not in self._by_id or len(node) > len(self._by_id[node_id])):
+                self._by_id[node_id] = node  # pełna definicja wygrywa z samą referencją
+        for key, value in node.items():
+            if key == "@context":
+                continue
+            for child in (value if isinstance(value, list) else (value,)):
+                if isinstance(child, dict):
+                    if key == "@graph":
+                        self._add_roots(child)
+                    else:
+                        self._walk(child)
+
+    def of_type(self, *types):
+        """Węzły danego typu (dowolny z `types`), w kolejności dokumentu — także zagnieżdżone."""
+        if len(types) == 1:
+            return list(self._by_type.get(short_type(types[0]), ()))
+        wanted = {short_type(t) for t in types}
+        return [n for n in self.nodes if any(short_type(t) in wanted for t in _types(n))]
+
+    def has_type(self, t) -> bool:
+        return short_type(t) in self._by_type
+
+    def by_id(self, node_id):
+        return self._by_id.get(node_id)
+
+    def resolve(self, value):
+        """{"@id": ...} -> pełny węzeł z indeksu (jeśli jest); inne wartości bez zmian."""
+        if isinstance(value, dict) and "@id" in value and not _types(value):
+            return self._by_id.get(value["@id"], value)
+        return value
+
+    def root_types(self):
+        """Typy węzłów najwyższego poziomu (z @graph włącznie), jak zapisano je w JSON-LD."""
+        return [str(t) for node in self.roots for t in _types(node)]
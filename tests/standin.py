@@ -0,0 +1,87 @@
+# tests/standin.py
+"""
+Lokalny serwer HTTP (http.server na wolnym porcie) udający stronę / API w testach.
+
+StandInTestCase uruchamia go raz na klasę testów; `routes` = {ścieżka: funkcja(base, query)},
+funkcja zwraca (content-type, treść) albo (status, content-type, treść). Nieznana ścieżka -> 404,
+/robots.txt -> `robots` klasy (o ile nie ma go w routes).
+"""
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HTML = "text/html; charset=utf-8"
+XML = "application/xml"
+
+
+def page(title, body="", head=""):
+    return (f'<!doctype html><html><head><meta charset="utf-8"><title>{title}</title>{head}</head>'
+            f"<body>{body}</body></html>").encode()
+
+
+def urlset(base, paths, lastmod=None):
+    """Sitemapa <urlset> z adresami base + ścieżka; lastmod: napis albo {ścieżka: napis}."""
+    locs = []
+    for p in paths:
+        mod = lastmod.get(p) if isinstance(lastmod, dict) else lastmod
+        locs.append(f"<url><loc>{base}{p}</loc>" + (f"<lastmod>{mod}</lastmod>" if mod else "") + "</url>")
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{"".join(locs)}</urlset>'.encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        parts = urlsplit(self.path)
+        route = self.server.routes.get(parts.path)
+        if route is not None:
+            out = route(base, parse_qs(parts.query))
+        elif parts.path == "/robots.txt":
+            out = "text/plain", self.server.robots.encode()
+        else:
+            out = 404, "text/plain", b""
+        status, ctype, body = out if len(out) == 3 else (200, *out)
+        self.server.hits[parts.path] = self.server.hits.get(parts.path, 0) + 1
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # klient zrezygnował (timeout w teście)
+
+
+class StandInTestCase(unittest.TestCase):
+    routes = {}
+    robots = "User-agent: *\n"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.daemon_threads = True
+        cls.server.routes = cls.routes
+        cls.server.robots = cls.robots
+        cls.server.hits = {}
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.root = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def path_of(self, url):
+        """Ścieżka adresu tego serwera (http://127.0.0.1:port/a/ -> /a/)."""
+        return url[len(self.root) - 1:]
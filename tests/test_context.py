@@ -0,0 +1,44 @@
+# tests/test_context.py
+"""
+context.wrap: zadanie w puli wątków widzi kontekst audytu i pozostałe ContextVar z miejsca owinięcia
+(log zadania daemona — print z puli PSI ma trafić do daemon_<id>.log, nie na konsolę).
+
+Uruchomienie: python -m unittest discover -s tests   (albo python -m pytest tests)
+"""
+import io
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import context  # noqa: E402
+import daemon  # noqa: E402
+
+
+class WrapTest(unittest.TestCase):
+    def test_pool_sees_audit_and_job_log(self):
+        console, log = io.StringIO(), io.StringIO()
+        out = daemon._JobStdout(console)
+
+        def work(i):
+            out.write(f"[psi] {i}\n")
+            return context.current().root
+
+        ctx = context.AuditContext("https://example.com/", overrides={"HTTP_CACHE_ENABLED": False})
+        token = daemon._job_log.set(log)
+        try:
+            with context.activate(ctx), ThreadPoolExecutor(4) as pool:
+                roots = list(pool.map(context.wrap(work), range(8)))
+        finally:
+            daemon._job_log.reset(token)
+        self.assertEqual(roots, [ctx.root] * 8)
+        self.assertEqual(sorted(log.getvalue().splitlines()), [f"[psi] {i}" for i in range(8)])
+        self.assertEqual(console.getvalue(), "")
+        out.write("konsola\n")  # poza zadaniem
+        self.assertEqual(console.getvalue(), "konsola\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/test_crawl_async.py
+"""
+Backend async crawla (crawl_async) na lokalnym serwerze http.server: ten sam wynik co sync,
+timeout strony (CRAWL_PAGE_TIMEOUT) i całego crawla (CRAWL_TIMEOUT) przerywa wolne strony.
+
+Uruchomienie: python -m unittest discover -s tests   (albo python -m pytest tests)
+"""
+import time
+import unittest
+
+from standin import HTML, XML, StandInTestCase, page, urlset
+
+import checks  # noqa: F401 — rejestruje analizatory crawla (@page_analyzer)
+import context
+import crawl
+import crawl_async
+
+FAST_PAGES = [f"/p{i}/" for i in range(12)]
+SLOW_PAGES = [f"/s{i}/" for i in range(4)]
+SLOW_SECONDS = 3
+
+
+def _page(path):
+    return HTML, page(f"Strona {path}", f"<h1>{path}</h1><p>treść</p>",
+                      f'<meta name="description" content="Opis {path}"><link rel="canonical" href="{path}">')
+
+
+def _fast(path):
+    return lambda base, query: _page(path)
+
+
+def _slow(path):
+    def route(base, query):
+        time.sleep(SLOW_SECONDS)
+        return _page(path)
+    return route
+
+
+def _sitemap(paths):
+    return lambda base, query: (XML, urlset(base, paths, "2025-01-01"))
+
+
+class AsyncCrawlTest(StandInTestCase):
+    routes = {
+        "/fast.xml": _sitemap(FAST_PAGES),
+        "/slow.xml": _sitemap(FAST_PAGES[:3] + ["/slow/"]),
+        "/mixed.xml": _sitemap(SLOW_PAGES + FAST_PAGES[:8]),
+        "/slow/": _slow("/slow/"),
+        **{p: _slow(p) for p in SLOW_PAGES},
+        **{p: _fast(p) for p in FAST_PAGES},
+    }
+
+    def _crawl(self, **overrides):
+        settings = {"HTTP_CACHE_ENABLED": False, "CRAWL_INCREMENTAL": False, "CRAWL_MODE": "sitemap",
+                    "CUSTOM_SITEMAPS": ["/fast.xml"], "EXTRA_URLS": [], "CRAWL_LIMIT": 50}
+        settings.update(overrides)
+        ctx = context.AuditContext(self.root, overrides=settings)
+        with context.activate(ctx):
+            t0 = time.monotonic()
+            pages = crawl.crawl_site(ctx)
+            return pages, time.monotonic() - t0
+
+    @staticmethod
+    def _summary(pages):
+        return [(p.url, p.final, p.status, p.error, p.bytes, p.hash, p.findings) for p in pages]
+
+    def test_async_matches_sync(self):
+        sync_pages, _ = self._crawl(CRAWL_BACKEND="sync")
+        async_pages, _ = self._crawl(CRAWL_BACKEND="async", CRAWL_CONCURRENCY=4)
+        self.assertEqual(len(sync_pages), len(FAST_PAGES))
+        self.assertTrue(all(p.status == 200 and p.findings is not None for p in sync_pages))
+        self.assertEqual(self._summary(async_pages), self._summary(sync_pages))
+
+    def test_crawl_timeout_cancels_slow_pages(self):
+        pages, elapsed = self._crawl(CRAWL_BACKEND="async", CUSTOM_SITEMAPS=["/slow.xml"],
+                                     CRAWL_TIMEOUT=1, CRAWL_PAGE_TIMEOUT=30)
+        by_path = {self.path_of(p.url): p for p in pages}
+        self.assertLess(elapsed, SLOW_SECONDS)
+        self.assertIn("crawl przerwany", by_path["/slow/"].error or "")
+        self.assertIsNone(by_path["/slow/"].findings)
+        for path in FAST_PAGES[:3]:
+            self.assertEqual(by_path[path].status, 200)
+            self.assertIsNone(by_path[path].error)
+
+    def test_page_timeout(self):
+        pages, elapsed = self._crawl(CRAWL_BACKEND="async", CUSTOM_SITEMAPS=["/slow.xml"],
+                                     CRAWL_TIMEOUT=60, CRAWL_PAGE_TIMEOUT=1)
+        slow = [p for p in pages if p.url.endswith("/slow/")][0]
+        self.assertLess(elapsed, SLOW_SECONDS)
+        self.assertIn("timeout", slow.error or "")
+        self.assertEqual(sum(1 for p in pages if p.status == 200), 3)
+
+    def test_slow_pages_do_not_starve_queue(self):
+        # wolne strony zajmują wszystkie wątki — strony za nimi w kolejce nie dostają timeoutu za czekanie
+        pages, elapsed = self._crawl(CRAWL_BACKEND="async", CUSTOM_SITEMAPS=["/mixed.xml"],
+                                     CRAWL_CONCURRENCY=4, CRAWL_PAGE_TIMEOUT=1, CRAWL_TIMEOUT=60)
+        by_path = {self.path_of(p.url): p for p in pages}
+        # limiter hosta (wspólny dla procesu) mógł już ściąć równoległość — wolne strony idą wtedy po kolei
+        self.assertLess(elapsed, len(SLOW_PAGES) * SLOW_SECONDS)
+        for path in SLOW_PAGES:
+            self.assertIsNotNone(by_path[path].error, path)
+        for path in FAST_PAGES[:8]:
+            self.assertEqual(by_path[path].status, 200, by_path[path].error)
+
+    def test_crawl_timeout_waits_for_running_handle(self):
+        # timeout crawla w trakcie analizy strony: fetch_all wraca dopiero po jej zakończeniu
+        calls = []
+
+        def handle(i, r, err):
+            if r is not None:
+                time.sleep(1.5)
+            calls.append((i, r is not None))
+
+        ctx = context.AuditContext(self.root, overrides={"HTTP_CACHE_ENABLED": False, "CRAWL_TIMEOUT": 1})
+        with context.activate(ctx):
+            crawl_async.fetch_all([self.root + "p0/", self.root + "slow/"], handle)
+            after = list(calls)
+        time.sleep(1)
+        self.assertEqual(sorted(after), [(0, True), (1, False)])
+        self.assertEqual(calls, after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# tests/test_crawl_links.py
+"""
+Crawl po linkach (CRAWL_MODE = "links") na lokalnym serwerze: adresy z sitemapy i względne
+EXTRA_URLS po normalizacji (lastmod, priorytet), pierwszeństwo linków przed dużą sitemapą
+i BFS po dużym drzewie linków (bez duplikatów, utm_*, robots.txt, obce hosty).
+
+Uruchomienie: python -m unittest discover -s tests   (albo python -m pytest tests)
+"""
+import math
+import unittest
+
+from standin import HTML, XML, StandInTestCase, page, urlset
+
+import checks  # noqa: F401 — rejestruje analizatory crawla (@page_analyzer)
+import context
+import crawl
+
+# strona główna linkuje tylko /a/; /b/ i /c/ są wyłącznie w sitemapie, /extra/ w EXTRA_URLS
+PAGES = {"/": '<a href="/a/">a</a>', "/a/": '<a href="/">home</a>', "/b/": "", "/c/": "", "/extra/": ""}
+# sitemapa większa niż CRAWL_LIMIT (same strony, do których nic nie linkuje)
+BIG_SITEMAP = [f"/m{i}/" for i in range(10)]
+# drzewo binarne: /t/n/ linkuje do /t/2n/ i /t/2n+1/ (z utm_*), do /private/, obrazka i obcego hosta
+TREE_NODES = 200_000
+
+
+def _html(body):
+    return lambda base, query: (HTML, page("T", body))
+
+
+def _map(base, query):
+    # wielkie litery w schemacie i parametr utm_ — po normalizacji to te same adresy co w kolejce
+    upper = base.replace("http://", "HTTP://")
+    return XML, urlset("", [f"{upper}/b/?utm_source=x", f"{base}/c/"],
+                       {f"{upper}/b/?utm_source=x": "2025-01-02", f"{base}/c/": "2025-01-03"})
+
+
+def _tree(n):
+    links = "".join(f'<a href="/t/{c}/?utm_medium=x&amp;page=1">{c}</a>' for c in (2 * n, 2 * n + 1) if c < TREE_NODES)
+    return HTML, page(f"T{n}", links + '<a href="/private/x/">p</a><a href="/img/a.png">i</a>'
+                                      '<a href="https://other.example/">o</a>')
+
+
+class _TreeRoutes(dict):
+    """Trasy drzewa /t/<n>/ wyliczane w locie (200k węzłów bez słownika 200k funkcji)."""
+
+    def get(self, path, default=None):
+        if path.startswith("/t/") and path.count("/") == 3:
+            return lambda base, query: _tree(int(path.split("/")[2]))
+        return super().get(path, default)
+
+
+class _LinksCase(StandInTestCase):
+    def _crawl(self, **overrides):
+        settings = {"HTTP_CACHE_ENABLED": False, "CRAWL_INCREMENTAL": False, "CRAWL_MODE": "links",
+                    "CRAWL_BACKEND": "sync", "EXTRA_URLS": []}
+        settings.update(overrides)
+        ctx = context.AuditContext(self.root, overrides=settings)
+        with context.activate(ctx):
+            return crawl.crawl_site(ctx)
+
+
+class LinksCrawlTest(_LinksCase):
+    routes = {
+        "/map.xml": _map,
+        "/big.xml": lambda base, query: (XML, urlset(base, BIG_SITEMAP + ["/a/"])),
+        **{p: _html(body) for p, body in PAGES.items()},
+        **{p: _html("m") for p in BIG_SITEMAP},
+    }
+
+    def test_sitemap_and_extra_urls_are_seeded(self):
+        pages = {self.path_of(p.url): p for p in self._crawl(CUSTOM_SITEMAPS=["/map.xml"], EXTRA_URLS=["/extra/"])}
+        self.assertEqual(set(pages), set(PAGES))
+        self.assertEqual(pages["/b/"].lastmod, "2025-01-02")
+        self.assertEqual(pages["/c/"].lastmod, "2025-01-03")
+        self.assertTrue(all(p.status == 200 for p in pages.values()))
+
+    def test_links_first_when_sitemap_fills_limit(self):
+        urls = [self.path_of(p.url) for p in self._crawl(CUSTOM_SITEMAPS=["/big.xml"], CRAWL_LIMIT=5)]
+        # strona główna i strony z linków przed stronami z samej sitemapy
+        self.assertEqual(urls[:2], ["/", "/a/"])
+        self.assertEqual(len(urls), 5)
+
+
+class LinkTreeCrawlTest(_LinksCase):
+    routes = _TreeRoutes({"/": lambda base, query: _tree(1)})
+    robots = "User-agent: *\nDisallow: /private/\n"
+
+    def test_bfs_over_large_tree(self):
+        limit = 120  # RATE_PER_HOST = 10/s — ~12 s
+        pages = self._crawl(CUSTOM_SITEMAPS=["/none.xml"], CRAWL_LIMIT=limit, CRAWL_MAX_DEPTH=20)
+        paths = [self.path_of(p.url) for p in pages]
+        self.assertEqual(len(paths), limit)
+        self.assertEqual(len(set(paths)), limit)  # bez duplikatów
+        self.assertTrue(all(p.status == 200 for p in pages))
+        # utm_* usunięte, pozostałe parametry zostają; bez /private/, plików i obcych hostów
+        self.assertTrue(all(p == "/" or p.endswith("/?page=1") for p in paths))
+        self.assertFalse(any(p.startswith(("/private/", "/img/")) or "://" in p for p in paths))
+        # BFS: głębokość węzła n to floor(log2 n) — nie maleje w kolejności pobrań
+        depths = [0 if p == "/" else int(math.log2(int(p.split("/")[2]))) for p in paths]
+        self.assertEqual(depths, sorted(depths))
+        self.assertNotIn("/private/x/", self.server.hits)
+
+
+if __name__ == "__main__":
+    unittest.main()
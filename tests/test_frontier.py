@@ -0,0 +1,127 @@
+# tests/test_frontier.py
+"""
+Elementy crawla po linkach (frontier.py): Scope (normalizacja i zakres), Frontier (kolejność,
+limit rozmiaru), BloomFilter (brak fałszywych „nie widziany”, odsetek fałszywych trafień).
+
+Uruchomienie: python -m unittest discover -s tests   (albo python -m pytest tests)
+"""
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontier import BloomFilter, Frontier, Scope  # noqa: E402
+
+ROOT = "https://example.com/"
+
+
+def _cfg(**overrides):
+    cfg = {
+        "CRAWL_EXTRA_HOSTS": ["www.example.com"],
+        "CRAWL_INCLUDE_PATHS": [],
+        "CRAWL_EXCLUDE_PATHS": ["/wp-admin/", "/cart/"],
+        "CRAWL_SKIP_EXTENSIONS": [".jpg", ".pdf"],
+        "CRAWL_STRIP_PARAMS": ["utm_*", "fbclid"],
+        "DEFAULT_HEADERS": {"User-Agent": "SEOChecker"},
+    }
+    cfg.update(overrides)
+    return SimpleNamespace(**cfg)
+
+
+class ScopeTest(unittest.TestCase):
+    def test_normalize(self):
+        scope = Scope(ROOT, _cfg())
+        cases = {
+            "https://EXAMPLE.com/a/#sekcja": "https://example.com/a/",
+            "HTTPS://example.com": "https://example.com/",
+            "https://www.example.com/b/": "https://www.example.com/b/",
+            # usuwamy tylko dopasowane parametry, reszta query bez zmian (kolejność, kodowanie)
+            "https://example.com/s/?utm_source=x&q=a%20b&UTM_Medium=y&page=2&fbclid=1": "https://example.com/s/?q=a%20b&page=2",
+            "https://example.com/s/?utm_source=x": "https://example.com/s/",
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(scope.normalize(url), expected)
+
+    def test_out_of_scope(self):
+        scope = Scope(ROOT, _cfg())
+        for url in ("https://other.com/", "mailto:a@example.com", "javascript:void(0)", "/relative/",
+                    "https://example.com/wp-admin/edit.php", "https://example.com/cart/",
+                    "https://example.com/files/doc.PDF", "https://example.com/img/a.jpg", "http://[::1"):
+            with self.subTest(url=url):
+                self.assertIsNone(scope.normalize(url))
+
+    def test_include_paths(self):
+        scope = Scope(ROOT, _cfg(CRAWL_INCLUDE_PATHS=["/blog/"]))
+        self.assertEqual(scope.normalize("https://example.com/blog/wpis/"), "https://example.com/blog/wpis/")
+        self.assertIsNone(scope.normalize("https://example.com/sklep/"))
+
+    def test_robots(self):
+        robots = "User-agent: *\nDisallow: /private/\n\nUser-agent: SEOChecker\nDisallow: /nie-dla-nas/\n"
+        scope = Scope(ROOT, _cfg(), robots)
+        self.assertIsNone(scope.normalize("https://example.com/nie-dla-nas/x/"))
+        # grupa dla naszego User-Agenta zastępuje grupę "*"
+        self.assertEqual(scope.normalize("https://example.com/private/"), "https://example.com/private/")
+        self.assertIsNone(Scope(ROOT, _cfg(DEFAULT_HEADERS={"User-Agent": "Inny"}), robots)
+                          .normalize("https://example.com/private/"))
+
+
+class FrontierTest(unittest.TestCase):
+    def test_order(self):
+        q = Frontier()
+        q.push("d2", 2)
+        q.push("d1-links", 1)
+        q.push("d1-sitemap", 1, in_sitemap=True)
+        q.push("d1-links-later", 1)
+        q.push("d0", 0)
+        batch = q.pop_batch(10)
+        # głębokość, potem strony z sitemapy, potem kolejność odkrycia
+        self.assertEqual([url for url, _, _ in batch], ["d0", "d1-sitemap", "d1-links", "d1-links-later", "d2"])
+        self.assertEqual(batch[1], ("d1-sitemap", 1, True))
+        self.assertEqual(batch[2], ("d1-links", 1, False))
+        self.assertEqual(len(q), 0)
+
+    def test_pop_batch_size(self):
+        q = Frontier()
+        for i in range(5):
+            q.push(f"u{i}", 1)
+        self.assertEqual([url for url, _, _ in q.pop_batch(2)], ["u0", "u1"])
+        self.assertEqual(len(q), 3)
+
+    def test_max_size_drops(self):
+        q = Frontier(max_size=3)
+        pushed = [q.push(f"u{i}", 1) for i in range(5)]
+        self.assertEqual(pushed, [True, True, True, False, False])
+        self.assertEqual(q.dropped, 2)
+        self.assertEqual(len(q), 3)
+        q.pop_batch(1)
+        self.assertTrue(q.push("u5", 0))
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bf = BloomFilter(10_000, 0.01)
+        urls = [f"https://example.com/p/{i}/" for i in range(10_000)]
+        self.assertTrue(all(bf.add(u) for u in urls[:10]))
+        for u in urls:
+            bf.add(u)
+        self.assertTrue(all(u in bf for u in urls))
+        self.assertFalse(bf.add(urls[0]))  # już był
+
+    def test_false_positive_rate(self):
+        bf = BloomFilter(20_000, 0.01)
+        for i in range(20_000):
+            bf.add(f"https://example.com/p/{i}/")
+        others = [f"https://example.com/q/{i}/" for i in range(20_000)]
+        rate = sum(u in bf for u in others) / len(others)
+        self.assertLess(rate, 0.02)
+
+    def test_size(self):
+        # ~1.2 B na adres przy 0.1% — milion adresów mieści się w ~1.8 MB
+        self.assertLess(BloomFilter(1_000_000, 0.001).nbytes, 1.9 * 2**20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# tests/test_pagespeed.py
+"""
+PageSpeed Insights (pagespeed.py) na lokalnym serwerze udającym API: wyniki ze strumieniowego
+parsowania (_SPEC) równe extract_scores na pełnej odpowiedzi, cache wyników (TTL), czekanie
+w limicie PSI_RPM i QuotaExceeded po wyczerpaniu PSI_DAILY_QUOTA.
+
+Uruchomienie: python -m unittest discover -s tests   (albo python -m pytest tests)
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from standin import StandInTestCase
+
+import context
+import metrics
+import pagespeed
+
+
+def _response(url, strategy):
+    """Pełna odpowiedź PSI: obok pól z _SPEC zrzuty ekranu i audyty, które parser ma pominąć."""
+    shot = "data:image/jpeg;base64," + "A" * 200_000
+    audits = {f"audit-{i}": {"id": f"audit-{i}", "score": 0.5, "numericValue": i,
+                             "details": {"type": "table", "items": [{"url": f"{url}r{j}", "wastedMs": j}
+                                                                    for j in range(20)]}}
+              for i in range(100)}
+    audits.update({
+        "largest-contentful-paint": {"numericValue": 2100.5, "score": 0.9},
+        "interactive": {"numericValue": 3100},
+        "total-blocking-time": {"numericValue": 120},
+        "cumulative-layout-shift": {"numericValue": 0.05},
+        "speed-index": {"numericValue": 2500},
+        "first-contentful-paint": {"numericValue": 1200},
+        "final-screenshot": {"details": {"type": "screenshot", "data": shot}},
+    })
+    return {
+        "id": url,
+        "loadingExperience": {"metrics": {
+            "LARGEST_CONTENTFUL_PAINT_MS": {"percentile": 2300, "category": "GOOD",
+                                            "distributions": [{"min": 0, "max": 2500, "proportion": 0.8}]},
+            "CUMULATIVE_LAYOUT_SHIFT_SCORE": {"percentile": 5, "category": "GOOD", "distributions": []},
+        }},
+        "originLoadingExperience": {"metrics": {
+            "INTERACTION_TO_NEXT_PAINT": {"percentile": 180, "category": "GOOD", "distributions": []},
+        }},
+        "lighthouseResult": {
+            "requestedUrl": url,
+            "fullPageScreenshot": {"screenshot": {"data": shot, "width": 412, "height": 9000}, "nodes": {}},
+            "categories": {"performance": {"score": 0.95 if strategy == "desktop" else 0.72, "title": "Performance"},
+                           "accessibility": {"score": 0.88}, "best-practices": {"score": 1}, "seo": {"score": 0.91}},
+            "audits": audits,
+        },
+    }
+
+
+def _api(base, query):
+    return "application/json", json.dumps(_response(query["url"][0], query["strategy"][0])).encode()
+
+
+class PageSpeedTest(StandInTestCase):
+    routes = {"/runPagespeed": _api}
+
+    def setUp(self):
+        self.server.hits.clear()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _ctx(self, **overrides):
+        settings = {"PSI_ENDPOINT": self.root + "runPagespeed", "PSI_CACHE_DIR": self.cache_dir,
+                    "PSI_CACHE_TTL": 0, "PSI_RPM": 0, "PSI_DAILY_QUOTA": 0, "PSI_API_KEY": None,
+                    "PSI_SAMPLE_PAGES": 0, "BLOG_POST": "", "PRODUCT_URL": "", "HTTP_CACHE_ENABLED": True}
+        settings.update(overrides)
+        return context.AuditContext(self.root, overrides=settings)
+
+    def _quota(self):
+        with open(os.path.join(self.cache_dir, "quota.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_scores_match_full_response(self):
+        ctx = self._ctx(PSI_STRATEGIES=["mobile", "desktop"])
+        jobs = pagespeed.start(ctx)
+        self.assertEqual(list(jobs), [(self.root, "mobile"), (self.root, "desktop")])
+        for (url, strategy), job in jobs.items():
+            with self.subTest(strategy=strategy):
+                self.assertEqual(job.result(timeout=30), pagespeed.extract_scores(_response(url, strategy)))
+        self.assertEqual(self.server.hits["/runPagespeed"], 2)
+
+    def test_cache_hit(self):
+        url = self.root + "a/"
+        with context.activate(self._ctx(PSI_CACHE_TTL=3600)):
+            first = pagespeed.analyze(url, "mobile")
+            self.assertEqual(pagespeed.analyze(url, "mobile"), first)
+            self.assertEqual(self.server.hits["/runPagespeed"], 1)
+            self.assertEqual(metrics.get("psi.cache_hits"), 1)
+            # inna strategia to inny wpis
+            pagespeed.analyze(url, "desktop")
+            self.assertEqual(self.server.hits["/runPagespeed"], 2)
+
+            # wpis starszy niż TTL -> znowu API
+            path = pagespeed._cache_path(self.cache_dir, self.root + "runPagespeed", url, "mobile")
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            entry["time"] -= 7200
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            self.assertEqual(pagespeed.analyze(url, "mobile"), first)
+            self.assertEqual(self.server.hits["/runPagespeed"], 3)
+
+        # --no-cache: świeżego wpisu nie czytamy
+        with context.activate(self._ctx(PSI_CACHE_TTL=3600, HTTP_CACHE_ENABLED=False)):
+            pagespeed.analyze(url, "mobile")
+            self.assertEqual(self.server.hits["/runPagespeed"], 4)
+            self.assertEqual(metrics.get("psi.cache_hits"), 0)
+
+    def test_rpm_waits_for_window(self):
+        # minutowe okno prawie pełne: jedno zapytanie 59.2 s temu przy PSI_RPM=1 -> ~0.8 s czekania
+        with open(os.path.join(self.cache_dir, "quota.json"), "w", encoding="utf-8") as f:
+            json.dump({"day": time.strftime("%Y-%m-%d"), "used": 1, "recent": [time.time() - 59.2]}, f)
+        with context.activate(self._ctx(PSI_RPM=1)):
+            t0 = time.monotonic()
+            pagespeed.analyze(self.root, "mobile")
+            elapsed = time.monotonic() - t0
+            waited = metrics.get("psi.wait_seconds")
+        self.assertGreater(elapsed, 0.5)
+        self.assertGreater(waited, 0.5)
+        self.assertLess(waited, 1.0)
+        quota = self._quota()
+        self.assertEqual(quota["used"], 2)
+        self.assertEqual(len(quota["recent"]), 1)  # stary wpis wypadł z okna
+
+    def test_daily_quota_exceeded(self):
+        ctx = self._ctx(PSI_DAILY_QUOTA=2)
+        with context.activate(ctx):
+            pagespeed.analyze(self.root, "mobile")
+            pagespeed.analyze(self.root, "desktop")
+            self.assertEqual(pagespeed.remaining_quota(), 0)
+            with self.assertRaises(pagespeed.QuotaExceeded):
+                pagespeed.analyze(self.root + "a/", "mobile")
+        self.assertEqual(self.server.hits["/runPagespeed"], 2)  # po wyczerpaniu nie pytamy API
+        self.assertEqual(self._quota()["used"], 2)
+        # licznik jest w pliku — nowy audyt z tym samym PSI_CACHE_DIR też go widzi
+        self.assertEqual(pagespeed.remaining_quota(self._ctx(PSI_DAILY_QUOTA=3).config), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
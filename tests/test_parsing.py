@@ -0,0 +1,61 @@
+# tests/test_parsing.py
+"""
+CSS -> XPath backendu "lxml" (parsing.py): te same wyniki co soupsieve w "bs4" dla obsługiwanych
+selektorów, a nieobsługiwane kończą się czytelnym ValueError.
+
+Uruchomienie: python -m unittest discover -s tests   (albo python -m pytest tests)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsing  # noqa: E402
+
+HTML = """<html><head><title>T</title></head><body>
+<div id="main" class="wrap content"><p class="lead">a</p><p>b</p><a href="/x" rel="nofollow">x</a>
+<ul><li>1</li><li class="last">2</li></ul><img src="a.webp" alt=""><img src="b.png"></div>
+</body></html>"""
+
+
+class CssSelectTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lxml = parsing.parse_html(HTML, backend="lxml")
+        cls.bs4 = parsing.parse_html(HTML, backend="bs4")
+
+    def test_matches_bs4(self):
+        for selector in ("p", "#main > p", ".wrap .lead", "p + p", "p ~ a", "li:first-child", "li:last-child",
+                         "a[rel~=nofollow]", "img[src$='.webp']", "img:not([alt])", "p, li", "div *"):
+            with self.subTest(selector=selector):
+                self.assertEqual([str(t) for t in self.lxml.select(selector)],
+                                 [str(t) for t in self.bs4.select(selector)])
+
+    def test_unsupported_selector(self):
+        for selector in ("a:hover", "a:nth-child(2)", "p::before", "p:not(.lead:hover)"):
+            with self.subTest(selector=selector):
+                with self.assertRaisesRegex(ValueError, "nieobsługiwany selektor"):
+                    self.lxml.select(selector)
+
+
+class TagShortcutTest(unittest.TestCase):
+    def test_tag_shortcuts(self):
+        for backend in parsing.BACKENDS:
+            soup = parsing.parse_html(HTML, backend=backend)
+            with self.subTest(backend=backend):
+                self.assertEqual(soup.title.string, "T")
+                self.assertEqual(soup.body.find("p")["class"], ["lead"])
+                self.assertIsNone(soup.body.footer)
+
+    def test_unsupported_attribute(self):
+        soup = parsing.parse_html(HTML, backend="lxml")
+        for name in ("next_sibling", "parents", "strings", "li"):
+            with self.subTest(name=name):
+                with self.assertRaises(AttributeError):
+                    getattr(soup.find("p"), name)
+        self.assertFalse(hasattr(soup, "next_sibling"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,22 +1,107 @@
 import re
-import time
-import xml.etree.ElementTree as ET
 from urllib.parse import urlsplit, urlunsplit, urljoin
 
-import requests
-from bs4 import BeautifulSoup
-
-from config import DEFAULT_HEADERS, REQUEST_TIMEOUT,CUSTOM_SITEMAPS, EXTRA_URLS, CRAWL_LIMIT
+import context
+import metrics
+import charset
+import ratelimit
+from http_client import get_session, response_cache
+from http_cache import cached_get
+from documents import get_document, basic_meta_from_soup  # get_document: wspólny cache drzew dla checków
+from parsing import parse_html
+from sitemaps import iter_sitemap_entries, looks_like_sitemap
+
+_CACHEABLE_METHODS = ("GET", "HEAD")
+_HEAD_END = re.compile(rb"</head\s*>|<body[\s>]", re.I)
+
+def _read_head(r):
+    """
+    Czyta strumieniową odpowiedź do końca <head> (</head> albo <body>) i zamyka połączenie.
+    Zwraca r z r.content = sam początek dokumentu (r.partial = True) albo None, gdy head
+    się nie kończy w HEAD_ONLY_MAX_BYTES. Krótki dokument przeczytany w całości zwracamy normalnie.
+    """
+    cfg = context.current().config
+    buf = bytearray()
+    end = None
+    for chunk in r.iter_content(cfg.HEAD_ONLY_CHUNK):
+        start = max(0, len(buf) - 16)  # znacznik może być przecięty granicą chunka
+        buf += chunk
+        m = _HEAD_END.search(buf, start)
+        if m:
+            end = m.end() if m.group(0).startswith(b"</") else m.start()
+            break
+        if len(buf) >= cfg.HEAD_ONLY_MAX_BYTES:
+            r.close()
+            return None
+    else:
+        r._content, r._content_consumed = bytes(buf), True
+        r.partial = False
+        return r
+    r.close()  # reszty nie czytamy — połączenie nie wraca do puli
+    r._content, r._content_consumed = bytes(buf[:end]), True
+    r.partial = True
+    metrics.incr("head_only.partial")
+    metrics.incr("head_only.bytes", len(buf))
+    return r
 
-def fetch(url, method="GET", allow_redirects=True, headers=None):
-    h = DEFAULT_HEADERS.copy()
+def fetch(url, method="GET", allow_redirects=True, headers=None, cache=True, head_only=False, timeout=None,
+          on_request=None):
+    """
+    head_only=True (tylko GET): pobiera i zwraca tylko <head> dokumentu (r.partial = True).
+    Taka odpowiedź nie trafia do cache dyskowego; przy zepsutym <head> — pełne pobranie.
+    timeout = timeout requestu w sekundach (domyślnie REQUEST_TIMEOUT); on_request() jest wołane
+    tuż przed wysłaniem requestu, już po czekaniu w limiterze hosta (crawl async liczy od tego czas strony).
+    """
+    cfg = context.current().config
+    h = cfg.DEFAULT_HEADERS.copy()
     if headers:
         h.update(headers)
-    r = requests.request(method, url, timeout=REQUEST_TIMEOUT, allow_redirects=allow_redirects, headers=h)
-    return r
+
+    def _send(extra=None, stream=False):
+        # wspólna sesja = keep-alive i ponowne użycie połączeń (DNS/TLS) między checkami;
+        # ratelimit: tempo/równoległość per host, Crawl-delay, Retry-After
+        def request():
+            if on_request is not None:
+                on_request()
+            return get_session().request(
+                method, url, timeout=timeout or cfg.REQUEST_TIMEOUT, allow_redirects=allow_redirects,
+                headers={**h, **extra} if extra else h, stream=stream)
+        return ratelimit.send(url, request)
+
+    def _load_head():
+        # pełna odpowiedź pobrana już przez inny check jest równie dobra
+        full = response_cache().peek(_key(False))
+        if full is not None:
+            return full
+        r = _read_head(_send(stream=True))
+        if r is None:
+            metrics.incr("head_only.fallback")
+            return fetch(url, allow_redirects=allow_redirects, headers=headers, cache=cache, timeout=timeout,
+                         on_request=on_request)
+        return charset.apply_encoding(r)
+
+    def _load():
+        if head_only:
+            return _load_head()
+        if method == "GET":
+            # cache dyskowy między audytami: If-None-Match / If-Modified-Since, treść z dysku przy 304;
+            # kodowanie z nagłówka/BOM/<meta> zamiast detekcji statystycznej w r.text
+            return charset.apply_encoding(cached_get(url, h, _send))
+        return _send()
+
+    def _key(partial):
+        return (method, url, bool(allow_redirects), tuple(sorted((headers or {}).items())), partial)
+
+    method = method.upper()
+    head_only = head_only and method == "GET"
+    if not cache or method not in _CACHEABLE_METHODS:
+        return _load()
+    # ten sam URL w ramach audytu pobieramy raz (np. strona główna dla kilkunastu checków)
+    return response_cache().get_or_fetch(_key(head_only), _load)
 
 def get_soup(html):
-    return BeautifulSoup(html, "lxml")
+    # backend wg config.HTML_PARSER / runner --parser (API zgodne z BeautifulSoup)
+    return parse_html(html)
 
 def normalize_url(u: str) -> str:
     p = urlsplit(u)
@@ -33,12 +118,9 @@ def find_sitemap_urls(root: str):
     """Zwraca listę sitemap: /sitemap.xml, /sitemap_index.xml oraz robots.txt wskazanie."""
     roots = []
     for guess in ("/sitemap.xml", "/sitemap_index.xml"):
-        try:
-            r = fetch(urljoin(root, guess))
-            if r.status_code == 200 and b"<urlset" in r.content or b"<sitemapindex" in r.content:
-                roots.append(urljoin(root, guess))
-        except:
-            pass
+        # tylko początek pliku (także .gz) — całość i tak pobierze strumieniowo iter_sitemap_entries
+        if looks_like_sitemap(urljoin(root, guess)):
+            roots.append(urljoin(root, guess))
     # robots.txt
     try:
         r = fetch(urljoin(root, "/robots.txt"))
@@ -53,49 +135,26 @@ def find_sitemap_urls(root: str):
     return list(dict.fromkeys(roots))
 
 def iter_urls_from_sitemap(sm_url: str, limit: int = 200):
-    try:
-        r = fetch(sm_url)
-        if r.status_code != 200:
-            return
-        tree = ET.fromstring(r.content)
-        ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-        # sitemapindex
-        if tree.tag.endswith("sitemapindex"):
-            for sm in tree.findall("sm:sitemap/sm:loc", ns):
-                yield from iter_urls_from_sitemap(sm.text.strip(), limit)
-        else:
-            count = 0
-            for loc in tree.findall(".//sm:url/sm:loc", ns):
-                if count >= limit:
-                    break
-                yield loc.text.strip()
-                count += 1
-    except:
-        return
+    # limit jest globalny dla całego drzewa (indeks + dzieci), nie per sitemapa
+    for loc, _ in iter_sitemap_entries([sm_url], limit=limit):
+        yield loc
 
-def throttle(sec=0.2):
-    time.sleep(sec)
+# Crawl-delay czytamy z tego samego robots.txt co find_sitemap_urls (cache odpowiedzi)
+ratelimit.set_robots_loader(lambda url: fetch(urljoin(url, "/robots.txt")))
 
 def extract_basic_meta(html: str):
     soup = get_soup(html)
-    title = (soup.title.string or "").strip() if soup.title else ""
-    desc = ""
-    md = soup.find("meta", attrs={"name": "description"})
-    if md and md.get("content"):
-        desc = md["content"].strip()
-    canonical = ""
-    lc = soup.find("link", rel=lambda v: v and "canonical" in v)
-    if lc and lc.get("href"):
-        canonical = lc["href"].strip()
+    title, desc, canonical = basic_meta_from_soup(soup)
     return soup, title, desc, canonical
 
-def list_images(soup, base_url, limit=20):
+def list_images(facts, base_url, limit=20):
+    """Adresy obrazków z PageFacts (Document.facts): img[src] + pierwszy kandydat z source[srcset]."""
     urls = []
     # img + sources z picture
-    for node in soup.select("img[src]"):
-        urls.append(urljoin(base_url, node.get("src")))
-    for node in soup.select("source[srcset]"):
-        srcset = node.get("srcset", "")
+    for img in facts.images:
+        if img.src is not None:
+            urls.append(urljoin(base_url, img.src))
+    for srcset in facts.sources:
         first = srcset.split(",")[0].strip().split(" ")[0]
         if first:
             urls.append(urljoin(base_url, first))
@@ -110,29 +169,36 @@ def list_images(soup, base_url, limit=20):
             break
     return deduped
 
-def collect_urls(root: str, limit=CRAWL_LIMIT):
-    urls = []
-
-    # 1) jeśli są ustawione custom sitemapy
-    if CUSTOM_SITEMAPS:
-        for sm in CUSTOM_SITEMAPS:
-            sm = urljoin(root,sm)
-            urls.extend(list(iter_urls_from_sitemap(sm, limit=limit)))
+def collect_entries(root: str, limit=None):
+    """Jak collect_urls, ale zwraca pary (url, lastmod) — lastmod z sitemap albo None."""
+    cfg = context.current().config
+    if limit is None:
+        limit = cfg.CRAWL_LIMIT
+    # 1) jeśli są ustawione custom sitemapy, inaczej szukaj automatycznie
+    if cfg.CUSTOM_SITEMAPS:
+        sitemaps = [urljoin(root, sm) for sm in cfg.CUSTOM_SITEMAPS]
     else:
-        # szukaj automatycznie
-        for sm in find_sitemap_urls(root):
-            urls.extend(list(iter_urls_from_sitemap(sm, limit=limit)))
-
-    # 2) dodaj EXTRA_URLS (jeśli istnieją)
-    urls.extend(EXTRA_URLS)
+        sitemaps = find_sitemap_urls(root)
 
-    # 3) ogranicz liczbę i deduplikuj
+    # 2) jeden globalny budżet na wszystkie sitemapy; przerwanie = koniec pobierania
     seen, unique = set(), []
-    for u in urls:
-        if u not in seen:
-            unique.append(u)
-            seen.add(u)
+    if limit > 0:
+        for u, lastmod in iter_sitemap_entries(sitemaps):
+            if u not in seen:
+                unique.append((u, lastmod))
+                seen.add(u)
+            if len(unique) >= limit:
+                break
+
+    # 3) dodaj EXTRA_URLS (jeśli istnieją), nadal w limicie
+    for u in cfg.EXTRA_URLS:
         if len(unique) >= limit:
             break
+        if u not in seen:
+            unique.append((u, None))
+            seen.add(u)
+
+    return unique or [(root, None)]
 
-    return unique or [root]
\ No newline at end of file
+def collect_urls(root: str, limit=None):
+    return [u for u, _ in collect_entries(root, limit)]
\ No newline at end of file